@@ -0,0 +1,208 @@
+import math
+import numpy as np
+from segmentGeometry import (build_segment_table, project_onto_segments,
+                             SEG_COLUMNS, SEG_TYPE, SEG_HEADING, SEG_A0, SEG_A1, LINE)
+from swerveKinematics import SwerveKinematics, body_to_world
+
+DEFAULT_VELOCITY = 0.5  # Wheel speed used by RobotController for paths without a velocity
+MOVEMENT_SPEED = 100    # RobotController's distance per second at wheel speed 1.0
+COMPLETION_PROGRESS = 0.98
+
+
+class BatchSimulator:
+    """
+    Simulates many robots following paths at once, with the state of all robots in arrays.
+
+    Each robot follows one of the given routes with RobotController's 'stop' transition
+    logic and kinematics: segments complete at 98% progress, the wheels are set to the
+    new segment's start heading and velocity, curves steer along the tangent, and the
+    robot moves with the rigid-body twist fitted to its four wheels. One step advances
+    every robot with a handful of NumPy operations instead of a Python loop per robot.
+    """
+
+    def __init__(self, routes, route_index=None, x=None, y=None, orientation=None, speed_scale=None,
+                 timestep=1.0 / 60, robot_width=80, robot_height=80):
+        """
+        Set up the batch.
+
+        Args:
+            routes: List of routes, each a list of Path objects
+            route_index: (n,) route of each robot (defaults to one robot per route)
+            x: (n,) start x of each robot (defaults to the start of its route)
+            y: (n,) start y of each robot (defaults to the start of its route)
+            orientation: (n,) start orientation in degrees (defaults to 0)
+            speed_scale: (n,) factor applied to the path velocities of each robot (defaults to 1)
+            timestep: Fixed simulation step in seconds
+            robot_width: Width of the robot chassis (distance between wheels)
+            robot_height: Height of the robot chassis (distance between wheels)
+        """
+        self.routes = routes
+        self.timestep = timestep
+        self.kinematics = SwerveKinematics(robot_width, robot_height)
+
+        # All routes' segments stacked into one table, with each route's first row
+        tables = [build_segment_table(path_list) for path_list in routes]
+        counts = np.array([len(table) for table in tables], dtype=int)
+        self._route_offsets = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(int)
+        self._route_counts = counts
+        self._segments = np.vstack(tables) if tables else np.zeros((0, SEG_COLUMNS))
+
+        velocities = [path.velocity if path.velocity is not None else DEFAULT_VELOCITY
+                      for path_list in routes for path in path_list]
+        self._velocities = np.array(velocities, dtype=float)
+
+        # Start heading of each segment: line heading, or the tangent at the start of the curve
+        seg = self._segments
+        arc_start = np.degrees(seg[:, SEG_A0]) + np.where(seg[:, SEG_A1] >= seg[:, SEG_A0], 90.0, -90.0)
+        self._start_headings = np.mod(np.where(seg[:, SEG_TYPE] == LINE, seg[:, SEG_HEADING], arc_start), 360)
+
+        if route_index is None:
+            route_index = np.arange(len(routes))
+        self.route_index = np.asarray(route_index, dtype=int)
+        n = len(self.route_index)
+        self.count = n
+
+        starts = np.array([path_list[0].get_point(0) for path_list in routes], dtype=float).reshape(-1, 2)
+        self.x = np.array(x, dtype=float) if x is not None else starts[self.route_index, 0].copy()
+        self.y = np.array(y, dtype=float) if y is not None else starts[self.route_index, 1].copy()
+        self.orientation = np.array(orientation, dtype=float) if orientation is not None else np.zeros(n)
+        self.speed_scale = np.array(speed_scale, dtype=float) if speed_scale is not None else np.ones(n)
+
+        # Wheel commands in wheel order 1,3,5,7
+        self.wheel_angles = np.zeros((n, 4))
+        self.wheel_speeds = np.zeros((n, 4))
+
+        # Following state and results
+        self.path_index = np.zeros(n, dtype=int)
+        self.path_progress = np.zeros(n)
+        self.moving = np.zeros(n, dtype=bool)
+        self.time = 0.0
+        self.finish_time = np.full(n, np.nan)
+        self.max_cross_track_error = np.zeros(n)
+
+    def follow_paths(self):
+        """
+        Start all robots on the first segment of their routes.
+        """
+        self.path_index[:] = 0
+        self.path_progress[:] = 0
+        self.moving[:] = self._route_counts[self.route_index] > 0
+        self.time = 0.0
+        self.finish_time[:] = np.nan
+        self.max_cross_track_error[:] = 0
+        self._configure_wheels(np.nonzero(self.moving)[0])
+
+    def _configure_wheels(self, robots):
+        """
+        Point the wheels of the given robots along their current segment's start heading.
+        """
+        rows = self._route_offsets[self.route_index[robots]] + self.path_index[robots]
+        self.wheel_angles[robots] = np.mod(self._start_headings[rows] - self.orientation[robots], 360)[:, None]
+        self.wheel_speeds[robots] = np.clip(self._velocities[rows] * self.speed_scale[robots], -1, 1)[:, None]
+
+    def step(self, n=1):
+        """
+        Advance all robots by n fixed timesteps.
+
+        Args:
+            n: Number of steps
+
+        Returns:
+            Number of robots still moving
+        """
+        for _ in range(n):
+            if not self.moving.any():
+                break
+            self._step()
+        return int(self.moving.sum())
+
+    def _step(self):
+        """
+        One fixed timestep: path following update, then kinematics.
+        """
+        self.time += self.timestep
+        robots = np.nonzero(self.moving)[0]
+
+        rows = self._route_offsets[self.route_index[robots]] + self.path_index[robots]
+        seg = self._segments[rows]
+        progress, direction, error = project_onto_segments(seg, self.x[robots], self.y[robots])
+        self.path_progress[robots] = progress
+        np.maximum.at(self.max_cross_track_error, robots, np.abs(error))
+
+        # Curves steer along the tangent until the segment is completed
+        completed = progress >= COMPLETION_PROGRESS
+        steering = ~completed & (seg[:, SEG_TYPE] != LINE)
+        steered = robots[steering]
+        self.wheel_angles[steered] = np.mod(direction[steering] - self.orientation[steered], 360)[:, None]
+
+        # Advance completed robots to their next segment, or stop them at the end of the route
+        advancing = robots[completed]
+        self.path_index[advancing] += 1
+        at_end = self.path_index[advancing] >= self._route_counts[self.route_index[advancing]]
+        finished = advancing[at_end]
+        continuing = advancing[~at_end]
+        self.wheel_speeds[finished] = 0
+        self.moving[finished] = False
+        self.finish_time[finished] = self.time
+        self.path_progress[continuing] = 0
+        self._configure_wheels(continuing)
+
+        # Kinematics: body twist fitted to the wheels, rotated into the world at mid-step
+        vx, vy, omega = self.kinematics.forward(self.wheel_angles[robots],
+                                                self.wheel_speeds[robots] * MOVEMENT_SPEED)
+        half_turn = np.degrees(omega) * self.timestep / 2
+        world_vx, world_vy = body_to_world(vx, vy, self.orientation[robots] + half_turn)
+        self.x[robots] += world_vx * self.timestep
+        self.y[robots] += world_vy * self.timestep
+        self.orientation[robots] = np.mod(self.orientation[robots] + 2 * half_turn, 360)
+
+    def run(self, max_time=120.0):
+        """
+        Run until every robot has completed its route or max_time has passed.
+
+        Args:
+            max_time: Simulated time limit in seconds
+
+        Returns:
+            Dictionary of per-robot result arrays
+        """
+        self.follow_paths()
+        steps = int(math.ceil(max_time / self.timestep))
+        self.step(steps)
+
+        return {
+            "completed": ~np.isnan(self.finish_time),
+            "finish_time": self.finish_time.copy(),
+            "final_x": self.x.copy(),
+            "final_y": self.y.copy(),
+            "final_orientation": self.orientation.copy(),
+            "max_cross_track_error": self.max_cross_track_error.copy(),
+        }
+
+
+if __name__ == "__main__":
+    import time
+    from path import Path
+
+    # Monte-Carlo over start pose perturbations and speed settings on two routes
+    routes = [
+        [Path('line', start_point=(100, 100), end_point=(600, 100)),
+         Path('curve', circle_center=(600, 200), radius=100, start_angle=-math.pi / 2, end_angle=math.pi / 2),
+         Path('line', start_point=(600, 300), end_point=(100, 300))],
+        [Path('line', start_point=(100, 100), end_point=(400, 100)),
+         Path('line', start_point=(400, 100), end_point=(400, 400))],
+    ]
+    count = 10000
+    rng = np.random.default_rng(0)
+    route_index = rng.integers(0, len(routes), count)
+    simulator = BatchSimulator(routes, route_index,
+                               x=100 + rng.normal(0, 5, count), y=100 + rng.normal(0, 5, count),
+                               speed_scale=rng.uniform(0.5, 1.5, count))
+
+    start = time.perf_counter()
+    results = simulator.run()
+    elapsed = time.perf_counter() - start
+
+    print(f"{count} robots in {elapsed:.2f} s: {results['completed'].sum()} completed, "
+          f"mean finish time {np.nanmean(results['finish_time']):.2f} s, "
+          f"worst cross-track error {results['max_cross_track_error'].max():.1f}")
@@ -0,0 +1,386 @@
+import threading
+import time
+import numpy as np
+import wheelControl
+from rateScheduler import RateScheduler
+from stateSnapshot import SnapshotBuffer, PoseSnapshot
+from segmentGeometry import build_segment_table, project_onto_segments, SEG_COLUMNS
+from wheelPathGenerator import WheelPathGenerator
+from wheel_speed_calculator import WheelSpeedCalculator
+
+WHEEL_IDS = [1, 3, 5, 7]
+
+
+class RobotPlan:
+    """
+    Static path plan of one robot in a fleet: segment geometry, wheel speed table
+    and motor addressing. Following state lives in the FleetController arrays.
+    """
+
+    def __init__(self, robot_id, path_list, initial_orientation, final_orientation, base_speed,
+                 namespace, angle_motors, speed_motors, wheel_path_generator):
+        """
+        Build the plan for one robot.
+
+        Args:
+            robot_id: Unique robot identifier
+            path_list: List of Path objects to follow in sequence
+            initial_orientation: Starting orientation in degrees
+            final_orientation: Target ending orientation in degrees
+            base_speed: Base speed scaling factor (0.0 to 1.0)
+            namespace: Prefix for this robot's motor keys
+            angle_motors: Motor IDs for angle control, in wheel order 1,3,5,7
+            speed_motors: Motor IDs for speed control, in wheel order 1,3,5,7
+            wheel_path_generator: WheelPathGenerator for this robot's dimensions
+        """
+        self.robot_id = robot_id
+        self.path_list = path_list
+        self.initial_orientation = initial_orientation
+        self.final_orientation = final_orientation
+        self.base_speed = base_speed
+        self.namespace = namespace
+        self.angle_motors = list(angle_motors)
+        self.speed_motors = list(speed_motors)
+
+        self.segments = build_segment_table(path_list)
+
+        # Per-wheel speed ratio table, rows in wheel order 1,3,5,7
+        wheel_paths = wheel_path_generator.generate_wheel_paths(
+            path_list, initial_orientation, final_orientation)
+        speed_ratios = WheelSpeedCalculator(wheel_paths).calculate_speed_ratios()
+        self.speed_table = np.array([speed_ratios[wheel_id] for wheel_id in WHEEL_IDS], dtype=float)
+
+        self.pose = SnapshotBuffer(PoseSnapshot, x=0, y=0, orientation=0, timestamp=time.monotonic())
+
+        # Following state, synchronized from the fleet arrays
+        self.path_index = 0
+        self.path_progress = 0.0
+        self.active = False
+
+
+class FleetController:
+    """
+    Follows paths for many robots from a single control thread.
+
+    All robots are ticked by one RateScheduler. Each tick projects every active
+    robot onto its current segment and looks up its wheel speeds in one batch of
+    NumPy operations, then writes the motor commands of the whole fleet in a
+    single pipelined Redis round trip.
+    """
+
+    def __init__(self, robot_width, robot_height, update_frequency=100, overrun_policy='skip'):
+        """
+        Initialize the fleet controller.
+
+        Args:
+            robot_width: Default width of the robot chassis (distance between wheels)
+            robot_height: Default height of the robot chassis (distance between wheels)
+            update_frequency: How many times per second to update motor commands
+            overrun_policy: 'skip' or 'catch_up', see RateScheduler
+        """
+        self.robot_width = robot_width
+        self.robot_height = robot_height
+        self.scheduler = RateScheduler(update_frequency, overrun_policy)
+
+        self.plans = {}
+        self._lock = threading.Lock()
+        self._tables_dirty = True
+        self._plan_order = []
+
+        self.control_thread = None
+        self.stop_event = threading.Event()
+        self.is_running = False
+
+        self._wheel_path_generators = {}
+
+        print(f"FleetController initialized at {update_frequency} Hz")
+
+    def add_robot(self, robot_id, path_list, initial_orientation=0, final_orientation=0, base_speed=0.5,
+                  namespace=None, angle_motors=None, speed_motors=None, robot_width=None, robot_height=None):
+        """
+        Add a robot and its path plan to the fleet.
+
+        Args:
+            robot_id: Unique robot identifier
+            path_list: List of Path objects to follow in sequence
+            initial_orientation: Starting orientation in degrees
+            final_orientation: Target ending orientation in degrees
+            base_speed: Base speed scaling factor (0.0 to 1.0)
+            namespace: Prefix for this robot's motor keys (defaults to str(robot_id))
+            angle_motors: Motor IDs for angle control (default [1, 3, 5, 7])
+            speed_motors: Motor IDs for speed control (default [2, 4, 6, 8])
+            robot_width: Chassis width if different from the fleet default
+            robot_height: Chassis height if different from the fleet default
+
+        Returns:
+            True if added successfully, False otherwise
+        """
+        if not path_list:
+            print(f"Error: Empty path list for robot {robot_id}")
+            return False
+
+        dimensions = (robot_width or self.robot_width, robot_height or self.robot_height)
+        if dimensions not in self._wheel_path_generators:
+            self._wheel_path_generators[dimensions] = WheelPathGenerator(*dimensions)
+
+        plan = RobotPlan(
+            robot_id, path_list, initial_orientation, final_orientation, base_speed,
+            namespace if namespace is not None else str(robot_id),
+            angle_motors or [1, 3, 5, 7],
+            speed_motors or [2, 4, 6, 8],
+            self._wheel_path_generators[dimensions])
+
+        with self._lock:
+            self._sync_state_to_plans()
+            self.plans[robot_id] = plan
+            self._tables_dirty = True
+
+        return True
+
+    def remove_robot(self, robot_id):
+        """
+        Remove a robot from the fleet. Its motors are not touched.
+
+        Args:
+            robot_id: Robot identifier
+
+        Returns:
+            True if the robot was removed, False if it was unknown
+        """
+        with self._lock:
+            self._sync_state_to_plans()
+            if self.plans.pop(robot_id, None) is None:
+                return False
+            self._tables_dirty = True
+        return True
+
+    def set_position(self, robot_id, x, y, orientation):
+        """
+        Update a robot's current position and orientation.
+
+        Args:
+            robot_id: Robot identifier
+            x: Current x position
+            y: Current y position
+            orientation: Current orientation in degrees
+        """
+        self.plans[robot_id].pose.publish(x=x, y=y, orientation=orientation, timestamp=time.monotonic())
+
+    def start_following(self, robot_ids=None):
+        """
+        Start path following for some or all robots and start the control thread if needed.
+
+        Args:
+            robot_ids: Robots to start (default: all robots in the fleet)
+
+        Returns:
+            True if started successfully, False otherwise
+        """
+        if not self.plans:
+            print("Error: No robots in fleet")
+            return False
+
+        with self._lock:
+            self._sync_state_to_plans()
+            for robot_id in (robot_ids if robot_ids is not None else list(self.plans)):
+                plan = self.plans[robot_id]
+                plan.path_index = 0
+                plan.path_progress = 0.0
+                plan.active = True
+            self._tables_dirty = True
+
+        if not self.is_running:
+            self.is_running = True
+            self.stop_event.clear()
+            self.control_thread = threading.Thread(target=self._control_loop)
+            self.control_thread.daemon = True
+            self.control_thread.start()
+
+        print(f"Started path following for {len(robot_ids) if robot_ids is not None else len(self.plans)} robots")
+        return True
+
+    def stop_following(self):
+        """
+        Stop the control thread and halt the speed motors of every robot.
+
+        Returns:
+            True if stopped successfully, False otherwise
+        """
+        if not self.is_running:
+            return False
+
+        self.stop_event.set()
+        if self.control_thread and self.control_thread is not threading.current_thread():
+            self.control_thread.join(timeout=2.0)
+
+        with self._lock:
+            self._sync_state_to_plans()
+            for plan in self.plans.values():
+                plan.active = False
+            self._tables_dirty = True
+
+            frames = [(plan.namespace, {}, {motor_id: 0 for motor_id in plan.speed_motors})
+                      for plan in self.plans.values()]
+
+        try:
+            wheelControl.send_motor_frames(frames)
+        except Exception as e:
+            print(f"Error stopping fleet motors: {e}")
+
+        self.is_running = False
+        print("Stopped fleet path following")
+        return True
+
+    def _control_loop(self):
+        """
+        Main control loop that ticks the whole fleet from one thread.
+        """
+        print("Fleet control loop started")
+        self.scheduler.run(self._control_tick, self.stop_event)
+        print("Fleet control loop ended")
+
+    def _control_tick(self):
+        """
+        Run one control iteration for every active robot.
+
+        Returns:
+            True to keep the loop running
+        """
+        try:
+            with self._lock:
+                if self._tables_dirty:
+                    self._rebuild_tables()
+                frames = self._compute_frames()
+
+            if frames:
+                wheelControl.send_motor_frames(frames)
+
+        except Exception as e:
+            print(f"Error in fleet control loop: {e}")
+
+        return True
+
+    def _rebuild_tables(self):
+        """
+        Stack the segment and speed tables of all robots into fleet-wide arrays.
+        Must be called with the lock held, after syncing state to the plans.
+        """
+        plans = list(self.plans.values())
+        self._plan_order = plans
+        count = len(plans)
+
+        segment_counts = np.array([len(plan.segments) for plan in plans], dtype=int)
+        self._segment_offsets = np.concatenate(([0], np.cumsum(segment_counts)[:-1])).astype(int) if count else np.zeros(0, dtype=int)
+        self._segment_counts = segment_counts
+        self._segments = np.vstack([plan.segments for plan in plans]) if count else np.zeros((0, SEG_COLUMNS))
+
+        # Speed tables padded to a common length
+        self._speed_lengths = np.array([plan.speed_table.shape[1] for plan in plans], dtype=int)
+        max_length = int(self._speed_lengths.max()) if count else 0
+        self._speed_tables = np.zeros((count, len(WHEEL_IDS), max(max_length, 1)))
+        for i, plan in enumerate(plans):
+            self._speed_tables[i, :, :plan.speed_table.shape[1]] = plan.speed_table
+
+        self._base_speeds = np.array([plan.base_speed for plan in plans], dtype=float)
+        self._path_index = np.array([plan.path_index for plan in plans], dtype=int)
+        self._progress = np.array([plan.path_progress for plan in plans], dtype=float)
+        self._active = np.array([plan.active for plan in plans], dtype=bool)
+
+        self._tables_dirty = False
+
+    def _sync_state_to_plans(self):
+        """
+        Copy the following state from the fleet arrays back into the plans.
+        Must be called with the lock held.
+        """
+        if self._tables_dirty:
+            return
+        for i, plan in enumerate(self._plan_order):
+            plan.path_index = int(self._path_index[i])
+            plan.path_progress = float(self._progress[i])
+            plan.active = bool(self._active[i])
+
+    def _compute_frames(self):
+        """
+        Project all active robots onto their paths and build their motor frames.
+        Must be called with the lock held.
+
+        Returns:
+            List of (namespace, angles, speeds) motor frames
+        """
+        robots = np.nonzero(self._active)[0]
+        if len(robots) == 0:
+            return []
+
+        plans = self._plan_order
+        poses = [plans[i].pose.read() for i in robots]
+        x = np.array([pose.x for pose in poses], dtype=float)
+        y = np.array([pose.y for pose in poses], dtype=float)
+        orientation = np.array([pose.orientation for pose in poses], dtype=float)
+
+        seg = self._segments[self._segment_offsets[robots] + self._path_index[robots]]
+        progress, direction, _ = project_onto_segments(seg, x, y)
+        wheel_angles = np.mod(direction - orientation, 360)
+
+        # Wheel speeds from each robot's speed table at its progress along the whole route,
+        # each segment taking an equal share of the table
+        lengths = self._speed_lengths[robots]
+        route_progress = (self._path_index[robots] + progress) / self._segment_counts[robots]
+        sample = np.minimum((route_progress * lengths).astype(int), lengths - 1)
+        speeds = self._speed_tables[robots[:, None], np.arange(len(WHEEL_IDS))[None, :], sample[:, None]]
+        # Each robot's fastest wheel runs at its base speed
+        max_abs = np.abs(speeds).max(axis=1)
+        scale = np.divide(self._base_speeds[robots], max_abs, out=np.zeros_like(max_abs), where=max_abs > 0)
+        speeds *= scale[:, None]
+
+        # Segment completion and advancement
+        completed = progress >= 0.98
+        self._progress[robots] = np.where(completed, 0.0, progress)
+        self._path_index[robots] += completed
+        finished = self._path_index[robots] >= self._segment_counts[robots]
+        self._active[robots[finished]] = False
+
+        frames = []
+        wheel_angles = wheel_angles.tolist()
+        speeds = speeds.tolist()
+        for k, i in enumerate(robots.tolist()):
+            plan = plans[i]
+            if finished[k]:
+                print(f"Robot {plan.robot_id} reached end of path list")
+                frames.append((plan.namespace, {}, {motor_id: 0 for motor_id in plan.speed_motors}))
+            elif not completed[k]:
+                angle = wheel_angles[k]
+                frames.append((plan.namespace,
+                               {motor_id: angle for motor_id in plan.angle_motors},
+                               dict(zip(plan.speed_motors, speeds[k]))))
+
+        return frames
+
+    def get_status(self):
+        """
+        Get the current status of every robot in the fleet.
+
+        Returns:
+            Dictionary with fleet loop timing and per-robot status
+        """
+        robots = {}
+        with self._lock:
+            self._sync_state_to_plans()
+            for robot_id, plan in self.plans.items():
+                pose = plan.pose.read()
+                robots[robot_id] = {
+                    "is_following": plan.active,
+                    "current_position": (pose.x, pose.y),
+                    "current_orientation": pose.orientation,
+                    "current_path_index": plan.path_index,
+                    "path_progress": plan.path_progress,
+                    "total_paths": len(plan.path_list),
+                    "namespace": plan.namespace,
+                }
+
+        return {
+            "is_running": self.is_running,
+            "robot_count": len(robots),
+            "loop_timing": self.scheduler.get_stats(),
+            "robots": robots,
+        }
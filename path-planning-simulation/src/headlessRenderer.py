@@ -0,0 +1,186 @@
+import os
+# Render without a window; must be set before pygame is initialized
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import math
+import sys
+import time
+import pygame
+from robot import Robot
+from robotController import RobotController
+from routeGenerator import generate_u_shaped_path, load_routes, WIDTH, HEIGHT
+from sceneRenderer import SceneRenderer, draw_polyline
+
+WHITE = (255, 255, 255)
+GRAY = (200, 200, 200)
+BLACK = (0, 0, 0)
+PURPLE = (128, 0, 128)
+SEGMENT_COLORS = [(100, 100, 255), (50, 150, 255), (0, 200, 150),
+                  (100, 255, 100), (150, 255, 50), (200, 200, 0)]
+
+
+class PngSequenceWriter:
+    """
+    Writes frames as a numbered PNG sequence (frame_000000.png, frame_000001.png, ...).
+    """
+
+    def __init__(self, directory):
+        """
+        Args:
+            directory: Output directory, created if needed
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.frames = 0
+
+    def write(self, surface):
+        pygame.image.save(surface, os.path.join(self.directory, f"frame_{self.frames:06d}.png"))
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+class RawVideoWriter:
+    """
+    Writes frames as raw RGB24 bytes, e.g. for piping into an encoder:
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 800x600 -r 30 -i - out.mp4
+    """
+
+    def __init__(self, stream, close_stream=False):
+        """
+        Args:
+            stream: Binary stream to write to (a file or sys.stdout.buffer)
+            close_stream: Close the stream when the writer is closed
+        """
+        self.stream = stream
+        self.close_stream = close_stream
+        self.frames = 0
+
+    def write(self, surface):
+        self.stream.write(pygame.image.tobytes(surface, 'RGB'))
+        self.frames += 1
+
+    def close(self):
+        self.stream.flush()
+        if self.close_stream:
+            self.stream.close()
+
+
+def draw_route(surface, path_list, samples=100):
+    """
+    Draw a route with a color per segment and its segment end points.
+
+    Args:
+        surface: Pygame surface to draw on
+        path_list: List of Path objects
+        samples: Points sampled per segment
+    """
+    for i, path in enumerate(path_list):
+        points = path.generate_path(samples)
+        draw_polyline(surface, SEGMENT_COLORS[i % len(SEGMENT_COLORS)], points, 2)
+        pygame.draw.circle(surface, PURPLE, points[0], 5)
+        pygame.draw.circle(surface, PURPLE, points[-1], 5)
+
+
+def render_run(path_list, writer, size=(WIDTH, HEIGHT), fps=30, sim_rate=500, robot_size=80,
+               max_time=120.0):
+    """
+    Simulate a route with RobotController at a fixed timestep and render it offscreen.
+
+    The simulation advances sim_rate / fps steps between frames, independent of the wall
+    clock, so a run renders as fast as the CPU allows and always gives the same frames.
+    When the rates do not divide evenly, the fractional steps are accumulated so that
+    frame k always shows simulated time k / fps.
+
+    Args:
+        path_list: List of Path objects to follow
+        writer: Frame writer (PngSequenceWriter or RawVideoWriter)
+        size: Frame size in pixels
+        fps: Frames per simulated second
+        sim_rate: Simulation steps per simulated second
+        robot_size: Robot width and height
+        max_time: Simulated time limit in seconds
+
+    Returns:
+        Dictionary with the number of frames, simulated time and whether the route was completed
+    """
+    start_x, start_y = path_list[0].get_point(0)
+    robot = Robot(start_x, start_y, robot_size, robot_size, 15, 8, GRAY, BLACK)
+    robot.prewarm_wheel_sprites()
+    controller = RobotController(robot, fixed_timestep=1.0 / sim_rate)
+    controller.set_paths(path_list)
+    controller.follow_paths()
+
+    surface = pygame.Surface(size)
+    renderer = SceneRenderer(surface, lambda background: draw_route(background, path_list), WHITE)
+    steps_per_frame = sim_rate / fps
+    max_frames = int(math.ceil(max_time * fps))
+    accumulator = 0.0
+
+    for _ in range(max_frames):
+        renderer.render(lambda screen: [robot.draw(screen)])
+        writer.write(surface)
+        if not controller.moving:
+            break
+        # Carry the fractional step over to the next frame; the small tolerance keeps
+        # rounding in the sum from dropping a whole step
+        accumulator += steps_per_frame
+        steps = int(accumulator + 1e-9)
+        accumulator -= steps
+        controller.step(steps)
+
+    return {"frames": writer.frames, "simulated_time": controller.sim_time, "completed": not controller.moving}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render path following runs offscreen to PNG frames or raw RGB video")
+    parser.add_argument("--route-file", help="JSON route file (see routeGenerator.load_routes); "
+                                             "defaults to the U-shaped demo route")
+    parser.add_argument("--output", default="frames",
+                        help="Output directory, or '-' to stream raw RGB frames of all runs to stdout")
+    parser.add_argument("--format", choices=('png', 'raw'), default='png',
+                        help="'png' writes a numbered PNG sequence per run, 'raw' an RGB24 stream per run")
+    parser.add_argument("--fps", type=float, default=30.0, help="Frames per simulated second")
+    parser.add_argument("--rate", type=float, default=500.0, help="Simulation steps per simulated second")
+    parser.add_argument("--robot-size", type=float, default=80.0, help="Robot width/height")
+    parser.add_argument("--max-time", type=float, default=120.0, help="Simulated time limit per run in seconds")
+    args = parser.parse_args(argv)
+
+    if args.route_file:
+        routes = load_routes(args.route_file)
+    else:
+        routes = [generate_u_shaped_path(WIDTH // 2, HEIGHT // 2)[0]]
+
+    # Progress goes to stderr so stdout can carry the video stream
+    log = sys.stderr
+    pygame.init()
+    start = time.perf_counter()
+    total_frames = 0
+    for index, route in enumerate(routes):
+        if args.output == '-':
+            writer = RawVideoWriter(sys.stdout.buffer)
+        elif args.format == 'raw':
+            os.makedirs(args.output, exist_ok=True)
+            writer = RawVideoWriter(open(os.path.join(args.output, f"route_{index:03d}.rgb"), 'wb'), close_stream=True)
+        else:
+            writer = PngSequenceWriter(os.path.join(args.output, f"route_{index:03d}"))
+
+        try:
+            result = render_run(route, writer, fps=args.fps, sim_rate=args.rate,
+                                robot_size=args.robot_size, max_time=args.max_time)
+        finally:
+            writer.close()
+        total_frames += result["frames"]
+        print(f"Route {index}: {result['frames']} frames, {result['simulated_time']:.2f} s simulated, "
+              f"{'completed' if result['completed'] else 'not completed'}", file=log)
+
+    elapsed = time.perf_counter() - start
+    print(f"Rendered {total_frames} frames ({WIDTH}x{HEIGHT}) in {elapsed:.2f} s", file=log)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
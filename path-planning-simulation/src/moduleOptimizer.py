@@ -0,0 +1,93 @@
+import math
+from routeTable import wrap_angle
+
+
+def optimize_module_angle(angle, speed, current_angle):
+    """
+    Choose between driving a module at angle or at angle + 180° with reversed speed,
+    whichever needs less steering travel from the current module angle.
+
+    Args:
+        angle: Requested wheel angle in degrees
+        speed: Requested wheel speed
+        current_angle: Current module angle in degrees
+
+    Returns:
+        Tuple (angle, speed) with the angle in degrees (0-360)
+    """
+    if abs(wrap_angle(angle - current_angle)) > 90:
+        return (angle + 180) % 360, -speed
+    return angle % 360, speed
+
+
+def step_toward_angle(current_angle, target_angle, max_step):
+    """
+    Turn an angle toward a target by at most max_step degrees, the short way round.
+
+    Args:
+        current_angle: Current angle in degrees
+        target_angle: Target angle in degrees
+        max_step: Largest allowed change in degrees (None for no limit)
+
+    Returns:
+        New angle in degrees (0-360)
+    """
+    delta = wrap_angle(target_angle - current_angle)
+    if max_step is not None:
+        delta = max(-max_step, min(max_step, delta))
+    return (current_angle + delta) % 360
+
+
+class ModuleOptimizer:
+    """
+    Motor command stage for swerve modules.
+
+    Each requested (angle, speed) pair is flipped to angle + 180° with reversed speed
+    when that is closer to the module's current angle, and the steering command is
+    rate limited to max_steering_speed. Instead of waiting for the steering to finish,
+    the speed is scaled by the cosine of the remaining steering error, so a wheel
+    drives as much as its current angle allows.
+    """
+
+    def __init__(self, max_steering_speed=None, wheel_count=4):
+        """
+        Args:
+            max_steering_speed: Steering motor speed limit in degrees per second (None for no limit)
+            wheel_count: Number of modules
+        """
+        if max_steering_speed is not None and max_steering_speed <= 0:
+            raise ValueError("max_steering_speed must be positive")
+        self.max_steering_speed = max_steering_speed
+        self.angles = [0.0] * wheel_count  # Last steering command of each module
+
+    def reset(self, angles):
+        """
+        Set the current module angles, e.g. from the motors' measured positions.
+
+        Args:
+            angles: Module angles in degrees, one per module
+        """
+        self.angles = [angle % 360 for angle in angles]
+
+    def command(self, index, angle, speed, dt):
+        """
+        Turn one module's requested angle and speed into the commands to send.
+
+        Args:
+            index: Module index
+            angle: Requested wheel angle in degrees
+            speed: Requested wheel speed
+            dt: Time since the previous command in seconds
+
+        Returns:
+            Tuple (angle, speed) to send to the module's steering and speed motors
+        """
+        current = self.angles[index]
+        target, speed = optimize_module_angle(angle, speed, current)
+
+        max_step = self.max_steering_speed * dt if self.max_steering_speed is not None else None
+        commanded = step_toward_angle(current, target, max_step)
+        self.angles[index] = commanded
+
+        # Drive only the part of the speed that the current angle delivers
+        return commanded, speed * math.cos(math.radians(wrap_angle(target - commanded)))
@@ -1,10 +1,21 @@
 import math
 import time
+import numpy as np
 import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 import wheelControl
+from rateScheduler import RateScheduler
+from stateSnapshot import SnapshotBuffer, PoseSnapshot, PathSnapshot
+from stageProfiler import StageProfiler
+from routeTable import wrap_angle, cross_track_correction
+from pathPlan import PathPlan, build_plan
 from wheelPathGenerator import WheelPathGenerator
-from wheel_speed_calculator import WheelSpeedCalculator
+from velocityPlanner import VelocityPlanner
+from posePredictor import PosePredictor
+from swerveKinematics import SwerveKinematics
+from moduleOptimizer import ModuleOptimizer
+from segmentEvents import SegmentEventScheduler
 
 class PathHandler:
     """
@@ -12,7 +23,18 @@ class PathHandler:
     Controls the robot to follow paths defined by Path objects.
     """
     
-    def __init__(self, robot_width, robot_height, motor_update_frequency=10):
+    SWAP_POINTS = ('immediate', 'next_segment')
+    
+    # Largest steering correction away from the path tangent in degrees (lookahead tracking)
+    MAX_TRACKING_CORRECTION = 60.0
+    
+    def __init__(self, robot_width, robot_height, motor_update_frequency=100, overrun_policy='skip',
+                 angle_motors=None, speed_motors=None, motor_namespace=None,
+                 tracking_mode='tangent', lookahead_distance=None, cross_track_gain=0.0, heading_gain=1.0,
+                 max_wheel_speed=None, max_wheel_accel=None,
+                 transition_mode='stop', blend_distance=None, switch_distance=None,
+                 pose_prediction=None, actuation_latency=0.0, orientation_gain=1.0, max_steering_speed=None,
+                 clock=time.monotonic, motor_backend=None, telemetry=None):
         """
         Initialize the path handler.
         
@@ -20,20 +42,104 @@ class PathHandler:
             robot_width: Width of the robot chassis (distance between wheels)
             robot_height: Height of the robot chassis (distance between wheels)
             motor_update_frequency: How many times per second to update motor commands
+            overrun_policy: What to do when a control tick overruns its deadline
+                            ('skip' or 'catch_up', see RateScheduler)
+            angle_motors: Motor IDs for angle control, in wheel order 1,3,5,7 (default [1, 3, 5, 7])
+            speed_motors: Motor IDs for speed control, in wheel order 1,3,5,7 (default [2, 4, 6, 8])
+            motor_namespace: Optional prefix for this robot's motor keys, e.g. 'robot7'
+            tracking_mode: 'tangent' steers along the path tangent at the current projection,
+                           'lookahead' steers toward a point lookahead_distance ahead on the route
+            lookahead_distance: Look-ahead distance along the route (defaults to robot_width)
+            cross_track_gain: Extra steering (degrees per unit of cross-track error) back toward the path
+            heading_gain: Fraction of the heading error toward the look-ahead point that is applied
+            max_wheel_speed: Wheel speed (distance/s) at motor command 1.0, scalar or dict per wheel ID.
+                             Together with max_wheel_accel, enables the time-optimal velocity planner.
+            max_wheel_accel: Maximum wheel acceleration (distance/s²), scalar or dict per wheel ID
+            transition_mode: 'stop' switches segments at 98% progress and skips that tick,
+                             'blend' switches on remaining arc length and keeps driving through junctions
+            blend_distance: Distance on each side of a junction over which the wheels are steered from
+                            one segment's heading to the next (blend mode, defaults to robot_width)
+            switch_distance: Remaining arc length at which blend mode switches to the next segment
+                             (defaults to 5% of robot_width)
+            pose_prediction: None to use the last tracked pose as is, or a PosePredictor model
+                             ('constant_velocity' or 'constant_turn_rate') to extrapolate it
+            actuation_latency: Seconds between sending a command and the motors acting on it;
+                               the pose is predicted for now plus this latency
+            orientation_gain: Fraction of the orientation error corrected per robot width travelled,
+                              on top of the planned rotation
+            max_steering_speed: Steering motor speed limit in degrees per second; steering commands
+                                are ramped at this rate (None sends the target angles directly)
+            clock: Function returning the current time in seconds, used for pose and path state
+                   timestamps and pose prediction (default time.monotonic)
+            motor_backend: Object with set_wheel_angle/set_wheel_speed(wheel_id, value, namespace)
+                           receiving the motor commands (default the wheelControl module)
+            telemetry: Optional TelemetryRecorder receiving one record per control tick
         """
+        if tracking_mode not in ('tangent', 'lookahead'):
+            raise ValueError(f"Unknown tracking mode: {tracking_mode}")
+        if transition_mode not in ('stop', 'blend'):
+            raise ValueError(f"Unknown transition mode: {transition_mode}")
+
         self.robot_width = robot_width
         self.robot_height = robot_height
         self.update_interval = 1.0 / motor_update_frequency
+        self.clock = clock
+        
+        # Deadline-based scheduler pacing the control loop
+        self.scheduler = RateScheduler(motor_update_frequency, overrun_policy)
+        
+        # Per-stage hot path timing (disabled until enable_profiling is called)
+        self.profiler = StageProfiler()
         
         # Path following state
-        self.path_list = []
         self.current_path_index = 0
         self.path_progress = 0  # 0 to 1 progress along current path
         
+        # Tracking controller settings
+        self.tracking_mode = tracking_mode
+        self.lookahead_distance = lookahead_distance if lookahead_distance is not None else robot_width
+        self.cross_track_gain = cross_track_gain
+        self.heading_gain = heading_gain
+        
+        # Rigid-body wheel model: turns the desired body motion into per-wheel angles and speeds
+        self.kinematics = SwerveKinematics(robot_width, robot_height)
+        self.orientation_gain = orientation_gain
+        self._wheel_speed_shares = [1.0] * 4  # Wheel speeds relative to the fastest wheel
+        
+        # Module flips (angle + 180° with reversed speed) and steering rate limits
+        self.module_optimizer = ModuleOptimizer(max_steering_speed)
+        self._measured_angles = None  # Module angles reported by set_module_angles
+        self.cross_track_error = 0.0
+        
+        # Segment transition settings
+        self.transition_mode = transition_mode
+        self.blend_distance = blend_distance if blend_distance is not None else robot_width
+        self.switch_distance = switch_distance if switch_distance is not None else 0.05 * robot_width
+        
+        # Predicted segment ends: the switch test only runs near them, and listeners are notified
+        self.segment_events = SegmentEventScheduler()
+        self._segment_events_key = None  # (plan, base_speed) the prediction was made for
+        
+        # Pose prediction between tracking updates (runs on the control thread only)
+        self.pose_predictor = PosePredictor(pose_prediction) if pose_prediction else None
+        self.actuation_latency = actuation_latency
+        self._predicted_sequence = -1
+        
         # Execution state
         self.is_following = False
-        self.current_position = (0, 0)  # (x, y) - must be updated by external position tracking
-        self.current_orientation = 0     # degrees - must be updated by external orientation tracking
+        self.base_speed = 0.5
+        
+        # Last commands sent, in motor order, updated in place for telemetry
+        self.telemetry = telemetry
+        self.commanded_angles = [0.0] * 4
+        self.commanded_speeds = [0.0] * 4
+        self._last_pose = None
+        
+        # Pose published by external position tracking, path state published by the control loop.
+        # Both are swapped in as whole snapshots so readers never see a half-updated state.
+        self._pose = SnapshotBuffer(PoseSnapshot, x=0, y=0, orientation=0, timestamp=clock())
+        self._path_state = SnapshotBuffer(PathSnapshot, path_index=0, path_progress=0,
+                                          timestamp=clock())
         
         # Controller thread
         self.control_thread = None
@@ -42,29 +148,153 @@ class PathHandler:
         # Wheel path generation and speed calculation
         self.wheel_path_generator = WheelPathGenerator(robot_width, robot_height)
         
-        # Motor IDs
-        self.angle_motors = [1, 3, 5, 7]  # Motor IDs for angle control
-        self.speed_motors = [2, 4, 6, 8]  # Motor IDs for speed control
+        # Velocity planning against wheel limits (used when both limits are set)
+        self.velocity_planner = None
+        if max_wheel_speed is not None and max_wheel_accel is not None:
+            self.velocity_planner = VelocityPlanner(max_wheel_speed, max_wheel_accel)
+        
+        # The active plan (segments, route, wheel paths, speeds) is replaced as a whole.
+        # Plans built in the background wait in _pending_plan until the control thread swaps them in.
+        self.plan = PathPlan([], 0, 0, self.wheel_path_generator)
+        self._pending_plan = None
+        self._plan_lock = threading.Lock()
+        self._plan_generation = 0
+        self._replan_executor = None
+        
+        # Motor IDs and the backend the commands are sent to
+        self.motor_backend = motor_backend if motor_backend is not None else wheelControl
+        self.angle_motors = list(angle_motors or [1, 3, 5, 7])  # Motor IDs for angle control
+        self.speed_motors = list(speed_motors or [2, 4, 6, 8])  # Motor IDs for speed control
+        self.motor_namespace = motor_namespace
+        
         
         print("PathHandler initialized with robot dimensions:", robot_width, "x", robot_height)
         
-    def set_position(self, x, y, orientation):
+    @property
+    def path_list(self):
+        """Paths of the active plan."""
+        return self.plan.path_list
+    
+    @property
+    def segments(self):
+        """CompiledSegment records of the active plan, one per path."""
+        return self.plan.segments
+    
+    @property
+    def route(self):
+        """Arc-length table of the active plan's route."""
+        return self.plan.route
+    
+    @property
+    def initial_orientation(self):
+        """Starting orientation of the active plan in degrees."""
+        return self.plan.initial_orientation
+    
+    @property
+    def final_orientation(self):
+        """Target ending orientation of the active plan in degrees."""
+        return self.plan.final_orientation
+    
+    @property
+    def wheel_paths(self):
+        """Sampled wheel paths of the active plan."""
+        return self.plan.wheel_paths
+    
+    @property
+    def steering_table(self):
+        """Per-wheel SteeringTable of the active plan."""
+        return self.plan.steering_table
+    
+    @property
+    def speed_calculator(self):
+        """WheelSpeedCalculator of the active plan."""
+        return self.plan.speed_calculator
+    
+    @property
+    def wheel_speed_ratios(self):
+        """Wheel speed ratios of the active plan."""
+        return self.plan.wheel_speed_ratios
+    
+    @property
+    def velocity_profile(self):
+        """VelocityProfile of the active plan (None without wheel limits)."""
+        return self.plan.velocity_profile
+    
+    @property
+    def current_position(self):
+        """Current (x, y) position from the latest pose snapshot."""
+        pose = self._pose.read()
+        return (pose.x, pose.y)
+    
+    @property
+    def current_orientation(self):
+        """Current orientation in degrees from the latest pose snapshot."""
+        return self._pose.read().orientation
+        
+    def set_position(self, x, y, orientation, timestamp=None):
         """
         Update the robot's current position and orientation.
         This method should be called regularly by the position tracking system.
+        Position and orientation are published together as a single snapshot.
         
         Args:
             x: Current x position
             y: Current y position
             orientation: Current orientation in degrees
+            timestamp: Time on the handler's clock at which the pose was measured (defaults to now)
         """
-        self.current_position = (x, y)
-        self.current_orientation = orientation
+        if timestamp is None:
+            timestamp = self.clock()
+        self._pose.publish(x=x, y=y, orientation=orientation, timestamp=timestamp)
+        
+    def get_pose(self):
+        """
+        Get a consistent snapshot of the robot pose.
+        
+        Returns:
+            PoseSnapshot with x, y, orientation, timestamp and sequence number
+        """
+        return self._pose.read()
+        
+    def wait_for_pose_update(self, after_sequence=None, timeout=None):
+        """
+        Block until set_position publishes a pose newer than after_sequence.
+        
+        Args:
+            after_sequence: Sequence number of the last pose seen (defaults to the current one)
+            timeout: Maximum time to wait in seconds (None waits forever)
+            
+        Returns:
+            The new PoseSnapshot, or None if the timeout expired
+        """
+        return self._pose.wait_for_update(after_sequence, timeout)
+        
+    def set_module_angles(self, angles):
+        """
+        Update the measured steering angles of the modules, e.g. from motor encoders.
+        The module optimizer starts from these angles when following starts or a new
+        plan is swapped in; without them it starts from the last commanded angles.
+        
+        Args:
+            angles: Module angles in degrees, in wheel order 1,3,5,7
+        """
+        self._measured_angles = tuple(angles)
+        
+    def _reset_module_optimizer(self):
+        """
+        Start the module optimizer from the measured module angles, or from the
+        last commanded ones when none have been reported.
+        """
+        angles = self._measured_angles
+        self.module_optimizer.reset(angles if angles is not None else self.commanded_angles)
         
     def set_paths(self, path_list, initial_orientation=0, final_orientation=0):
         """
         Set the list of paths to follow.
         
+        While following, the new plan is swapped in at the next control tick with
+        the progress re-projected onto it, as replan(swap_at='immediate') does.
+        
         Args:
             path_list: List of Path objects to follow in sequence
             initial_orientation: Starting orientation in degrees
@@ -74,23 +304,150 @@ class PathHandler:
             print("Error: Empty path list")
             return False
             
-        self.path_list = path_list
-        self.initial_orientation = initial_orientation
-        self.final_orientation = final_orientation
-        self.current_path_index = 0
-        self.path_progress = 0
-        
-        # Generate wheel paths for speed calculation
-        self.wheel_paths = self.wheel_path_generator.generate_wheel_paths(
-            path_list, initial_orientation, final_orientation)
+        plan = PathPlan(path_list, initial_orientation, final_orientation,
+                        self.wheel_path_generator, self.velocity_planner)
         
-        # Calculate wheel speeds
-        self.speed_calculator = WheelSpeedCalculator(self.wheel_paths)
-        self.wheel_speed_ratios = self.speed_calculator.calculate_speed_ratios()
+        if self.is_following:
+            self._queue_plan(plan, 'immediate', None, self._next_plan_generation())
+        else:
+            self._next_plan_generation()
+            self._apply_plan(plan)
+            if self.pose_predictor is not None:
+                self.pose_predictor.reset()
+                self._predicted_sequence = -1
         
+        if plan.velocity_profile is not None:
+            print(f"Velocity profile planned: {plan.velocity_profile.total_time:.2f} s at full base speed")
         print(f"Paths set: {len(path_list)} segments, orientation {initial_orientation}° → {final_orientation}°")
         return True
         
+    def replan(self, path_list, initial_orientation=0, final_orientation=0, swap_at='immediate',
+               callback=None, executor=None):
+        """
+        Build a new plan in the background and swap it in without stopping the control loop.
+        
+        Args:
+            path_list: List of Path objects to follow in sequence
+            initial_orientation: Starting orientation in degrees
+            final_orientation: Target ending orientation in degrees
+            swap_at: 'immediate' swaps at the next control tick and re-projects the current
+                     position onto the new route, 'next_segment' swaps when the current
+                     segment is completed and starts the new route from its beginning
+            callback: Optional function called with the PathPlan once it is active
+            executor: concurrent.futures executor to build the plan on (defaults to a
+                      single worker thread; a ProcessPoolExecutor also works)
+        
+        Returns:
+            Future resolving to the built PathPlan, or None if the path list is empty
+        """
+        if swap_at not in self.SWAP_POINTS:
+            raise ValueError(f"Unknown swap point: {swap_at}")
+        if not path_list:
+            print("Error: Empty path list")
+            return None
+            
+        if executor is None:
+            if self._replan_executor is None:
+                self._replan_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replan")
+            executor = self._replan_executor
+        
+        max_wheel_speed = max_wheel_accel = None
+        if self.velocity_planner is not None:
+            max_wheel_speed = self.velocity_planner.max_wheel_speed
+            max_wheel_accel = self.velocity_planner.max_wheel_accel
+        
+        generation = self._next_plan_generation()
+        future = executor.submit(build_plan, list(path_list), initial_orientation, final_orientation,
+                                 self.robot_width, self.robot_height, max_wheel_speed, max_wheel_accel)
+        future.add_done_callback(lambda done: self._on_plan_built(done, swap_at, callback, generation))
+        return future
+        
+    def _next_plan_generation(self):
+        """Number the next requested plan, so older plans finishing late are dropped."""
+        with self._plan_lock:
+            self._plan_generation += 1
+            return self._plan_generation
+        
+    def _on_plan_built(self, future, swap_at, callback, generation):
+        """
+        Hand a finished background plan over to the control loop.
+        """
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            print(f"Error building plan: {error}")
+            return
+        
+        plan = future.result()
+        if self.is_following:
+            self._queue_plan(plan, swap_at, callback, generation)
+            return
+        
+        # Not running: nothing to swap against, apply right away
+        with self._plan_lock:
+            if generation != self._plan_generation:
+                return
+            self._pending_plan = None
+        self._apply_plan(plan)
+        print(f"Plan applied: {len(plan.path_list)} segments")
+        if callback is not None:
+            callback(plan)
+        
+    def _queue_plan(self, plan, swap_at, callback, generation):
+        """
+        Leave a plan for the control thread to swap in at the requested point.
+        A newer plan replaces one that is still waiting.
+        """
+        with self._plan_lock:
+            if generation != self._plan_generation:
+                return
+            self._pending_plan = (plan, swap_at, callback)
+        
+    def _swap_pending_plan(self, at_boundary):
+        """
+        Swap in the pending plan if it is waiting for this point. Control thread only.
+        
+        Args:
+            at_boundary: True when called on completing a segment, False at the start of a tick
+            
+        Returns:
+            True if a plan was swapped in
+        """
+        with self._plan_lock:
+            pending = self._pending_plan
+            if pending is None or (pending[1] == 'next_segment') != at_boundary:
+                return False
+            self._pending_plan = None
+        
+        plan, swap_at, callback = pending
+        if at_boundary:
+            self._apply_plan(plan)
+        else:
+            # Continue from the closest point of the new route
+            pose = self._pose.read()
+            path_index, path_progress = plan.route.find_nearest(pose.x, pose.y)
+            self._apply_plan(plan, path_index, path_progress)
+            
+        print(f"Swapped in new plan ({swap_at}): {len(plan.path_list)} segments, "
+              f"continuing at segment {self.current_path_index + 1}")
+        if callback is not None:
+            try:
+                callback(plan)
+            except Exception as e:
+                print(f"Error in plan callback: {e}")
+        return True
+        
+    def _apply_plan(self, plan, path_index=0, path_progress=0):
+        """
+        Make a plan the active one and set the position along it.
+        """
+        self.plan = plan
+        self.current_path_index = path_index
+        self.path_progress = path_progress
+        self._reset_module_optimizer()
+        self._publish_path_state()
+        
     def start_following(self, base_speed=0.5):
         """
         Start following the set paths.
@@ -101,15 +458,21 @@ class PathHandler:
         Returns:
             True if started successfully, False otherwise
         """
-        if not self.path_list:
-            print("Error: No paths defined")
-            return False
-            
         if self.is_following:
             print("Already following path")
             return False
             
+        # A plan queued while the previous run was ending is taken over now
+        if self._pending_plan is not None:
+            self._swap_pending_plan(at_boundary=self._pending_plan[1] == 'next_segment')
+            
+        if not self.path_list:
+            print("Error: No paths defined")
+            return False
+            
         self.base_speed = base_speed
+        self.segment_events.reset()
+        self._reset_module_optimizer()
         self.is_following = True
         self.stop_event.clear()
         
@@ -134,14 +497,14 @@ class PathHandler:
         # Signal the thread to stop
         self.stop_event.set()
         
-        # Wait for the thread to end
-        if self.control_thread:
+        # Wait for the thread to end (unless we are being called from it)
+        if self.control_thread and self.control_thread is not threading.current_thread():
             self.control_thread.join(timeout=2.0)
             
         # Stop all motors
         for motor_id in self.speed_motors:
             try:
-                wheelControl.set_wheel_speed(motor_id, 0)
+                self.motor_backend.set_wheel_speed(motor_id, 0, self.motor_namespace)
             except Exception as e:
                 print(f"Error stopping motor {motor_id}: {e}")
                 
@@ -156,227 +519,473 @@ class PathHandler:
         """
         print("Path following control loop started")
         
-        while not self.stop_event.is_set():
-            try:
-                # Start time for loop timing
-                loop_start = time.time()
+        self.scheduler.run(self._control_tick, self.stop_event)
+        
+        stats = self.scheduler.get_stats()
+        print(f"Path following control loop ended: {stats['ticks']} ticks, "
+              f"{stats['missed_deadlines']} missed deadlines, "
+              f"worst loop time {stats['worst_loop_time'] * 1000:.2f} ms")
+        
+    def _control_tick(self):
+        """
+        Run a single iteration of the control loop.
+        
+        Returns:
+            False when the loop should end, True otherwise
+        """
+        telemetry = self.telemetry
+        if telemetry is not None:
+            tick_start = time.perf_counter()
+            
+        running = True
+        try:
+            # Swap in a plan built in the background
+            if self._pending_plan is not None:
+                self._swap_pending_plan(at_boundary=False)
                 
-                # Handle the current path
-                if self.current_path_index < len(self.path_list):
-                    self._handle_current_path()
-                else:
-                    # End of all paths
-                    print("Reached end of all paths")
-                    self.stop_following()
-                    break
-                    
-                # Sleep to maintain update frequency
-                elapsed = time.time() - loop_start
-                if elapsed < self.update_interval:
-                    time.sleep(self.update_interval - elapsed)
-                    
-            except Exception as e:
-                print(f"Error in control loop: {e}")
-                # Continue running despite errors
+            # Handle the current path
+            if self.current_path_index < len(self.path_list):
+                self._handle_current_path()
+            else:
+                # End of all paths
+                print("Reached end of all paths")
+                self.stop_following()
+                running = False
                 
-        print("Path following control loop ended")
+        except Exception as e:
+            print(f"Error in control loop: {e}")
+            # Continue running despite errors
+            
+        if telemetry is not None and self._last_pose is not None:
+            pose = self._last_pose
+            telemetry.record(self.clock(), pose.timestamp, pose.x, pose.y, pose.orientation,
+                             self.path_progress, self.current_path_index,
+                             self.commanded_angles, self.commanded_speeds,
+                             time.perf_counter() - tick_start)
+            
+        return running
+        
+    def step(self):
+        """
+        Run one control tick on the calling thread instead of the control loop thread.
+        Used to drive the handler from a simulation or a telemetry replay; base_speed
+        is taken from the base_speed attribute.
+        
+        Returns:
+            False once the end of the route has been reached, True otherwise
+        """
+        return self._control_tick()
         
     def _handle_current_path(self):
         """
         Handle the current path segment based on its type.
         Updates path progress and wheel controls accordingly.
         """
-        current_path = self.path_list[self.current_path_index]
+        segment = self.segments[self.current_path_index]
+        
+        # Stage timing is only taken when profiling is enabled
+        profiler = self.profiler
+        timed = profiler.enabled
+        if timed:
+            clock = profiler.clock
+            t0 = clock()
+        
+        # Take one consistent pose snapshot for the whole tick
+        pose = self._pose.read()
+        self._last_pose = pose
+        if self.pose_predictor is not None:
+            pose = self._predict_pose(pose)
         
         # Update path progress based on current position
-        self._update_path_progress(current_path)
+        self._update_path_progress(segment, pose)
+        
+        if self.transition_mode == 'blend':
+            # Switch on remaining arc length and keep going on the next segment in this same tick
+            while self._segment_end_due() and (1 - self.path_progress) * segment.length <= self.switch_distance:
+                print(f"Completed path segment {self.current_path_index + 1}/{len(self.path_list)}")
+                self._advance_to_next_path()
+                if self.current_path_index >= len(self.segments):
+                    return
+                segment = self.segments[self.current_path_index]
+                self._update_path_progress(segment, pose)
+                
+        self._publish_path_state()
+        if timed:
+            t1 = clock()
+            profiler.record("update_path_progress", t0, t1)
         
         # Check if we've reached the end of this path segment
-        if self.path_progress >= 0.98:
+        if self.transition_mode == 'stop' and self._segment_end_due() and self.path_progress >= 0.98:
             print(f"Completed path segment {self.current_path_index + 1}/{len(self.path_list)}")
             self._advance_to_next_path()
             return
             
-        # Calculate current target orientation
-        target_orientation = self.initial_orientation + self.path_progress * (self.final_orientation - self.initial_orientation)
+        # Calculate current target orientation, interpolated over the route as in the wheel paths
+        target_orientation = self.initial_orientation + self._get_route_progress() * (self.final_orientation - self.initial_orientation)
         
         # Calculate path direction based on path type
-        path_direction = self._calculate_path_direction(current_path)
+        path_direction = self._calculate_path_direction(segment, pose)
+        if self.transition_mode == 'blend':
+            path_direction = self._blend_direction(segment, path_direction, pose)
+        if timed:
+            t2 = clock()
+            profiler.record("calculate_path_direction", t1, t2)
         
         # Set wheel angles based on path type and direction
-        self._set_wheel_angles(current_path, path_direction, target_orientation)
+        self._set_wheel_angles(segment, path_direction, target_orientation, pose)
+        if timed:
+            t3 = clock()
+            profiler.record("set_wheel_angles", t2, t3)
         
         # Set wheel speeds based on calculated ratios
         self._set_wheel_speeds()
+        if timed:
+            t4 = clock()
+            profiler.record("set_wheel_speeds", t3, t4)
+            profiler.record("handle_current_path", t0, t4)
         
-    def _update_path_progress(self, current_path):
+    def _predict_pose(self, pose):
         """
-        Update the progress along the current path based on current position.
+        Estimate the pose at the time the next commands take effect.
         
         Args:
-            current_path: The current Path object being followed
-        """
-        x, y = self.current_position
-        
-        if current_path.path_type == 'line':
-            # For straight line paths
-            start_x, start_y = current_path.start_point
-            end_x, end_y = current_path.end_point
-            
-            # Calculate direction vector
-            dx = end_x - start_x
-            dy = end_y - start_y
-            path_length = math.sqrt(dx**2 + dy**2)
-            
-            # Normalize direction
-            if path_length > 0:
-                dx /= path_length
-                dy /= path_length
-            
-            # Calculate progress along line (dot product with normalized direction)
-            t = ((x - start_x) * dx + (y - start_y) * dy) / path_length
-            self.path_progress = max(0, min(1, t))
-            
-        else:  # curve path
-            center_x, center_y = current_path.circle_center
-            radius = current_path.radius
-            start_angle = current_path.start_angle
-            end_angle = current_path.end_angle
-            
-            # Vector from center to current position
-            dx = x - center_x
-            dy = y - center_y
-            
-            # Current angle in the circle
-            current_angle = math.atan2(dy, dx)
+            pose: Latest tracked PoseSnapshot
             
-            # Normalize angle for progress calculation
-            if end_angle > start_angle:
-                # Moving counter-clockwise
-                while current_angle < start_angle:
-                    current_angle += 2 * math.pi
-                while current_angle > end_angle:
-                    current_angle -= 2 * math.pi
-            else:
-                # Moving clockwise
-                while current_angle > start_angle:
-                    current_angle -= 2 * math.pi
-                while current_angle < end_angle:
-                    current_angle += 2 * math.pi
+        Returns:
+            PoseSnapshot extrapolated to now plus the actuation latency
+        """
+        # Feed each tracked pose to the predictor once
+        if pose.sequence != self._predicted_sequence:
+            self._predicted_sequence = pose.sequence
+            self.pose_predictor.update(pose)
             
-            # Calculate progress
-            angular_progress = (current_angle - start_angle) / (end_angle - start_angle)
-            self.path_progress = max(0, min(1, angular_progress))
+        target_time = self.clock() + self.actuation_latency
+        x, y, orientation = self.pose_predictor.predict(target_time)
+        return pose._replace(x=x, y=y, orientation=orientation, timestamp=target_time)
+    
+    def _update_path_progress(self, segment, pose):
+        """
+        Update the progress along the current path based on current position.
+        
+        Args:
+            segment: CompiledSegment of the current path
+            pose: PoseSnapshot to project onto the path
+        """
+        self.path_progress = segment.progress_at(pose.x, pose.y)
     
-    def _calculate_path_direction(self, path):
+    def _calculate_path_direction(self, segment, pose):
         """
         Calculate the direction of motion along the current path at the current progress.
         
         Args:
-            path: Current Path object
+            segment: CompiledSegment of the current path
+            pose: PoseSnapshot used for the current position
             
         Returns:
             Direction angle in degrees (0-360)
         """
-        if path.path_type == 'line':
-            # For line paths, direction is constant
-            start_x, start_y = path.start_point
-            end_x, end_y = path.end_point
-            dx = end_x - start_x
-            dy = end_y - start_y
-            return math.degrees(math.atan2(dy, dx)) % 360
-            
-        else:  # curve path
-            # For curve paths, direction is tangent to the circle
-            center_x, center_y = path.circle_center
-            current_x, current_y = self.current_position
-            
-            # Vector from center to current position
-            dx = current_x - center_x
-            dy = current_y - center_y
+        if self.tracking_mode == 'lookahead':
+            return self._calculate_lookahead_direction(pose)
             
-            # Center angle (pointing from center to current position)
-            center_angle = math.degrees(math.atan2(dy, dx))
+        # Constant heading for lines, tangent to the circle for curves
+        return segment.direction_at(pose.x, pose.y)
+    
+    def _blend_direction(self, segment, path_direction, pose):
+        """
+        Pre-steer toward the next segment's heading when approaching a junction,
+        and ease out of the previous one just after it. With tangent tracking the
+        direction is also corrected against the cross-track error, so the robot comes
+        back onto the path after cutting a junction.
+        
+        Args:
+            segment: CompiledSegment of the current path
+            path_direction: Direction of motion on the current segment in degrees
+            pose: PoseSnapshot used for the current position
             
-            # Direction depends on clockwise/counter-clockwise movement
-            is_clockwise = path.end_angle < path.start_angle
+        Returns:
+            Blended direction angle in degrees (0-360)
+        """
+        direction = self.route.blend_direction(self.current_path_index, self.path_progress,
+                                               path_direction, self.blend_distance)
+        # Look-ahead tracking already corrects the cross-track error
+        if self.tracking_mode == 'lookahead':
+            return direction
+        self.cross_track_error = segment.cross_track_error(pose.x, pose.y)
+        direction += cross_track_correction(self.cross_track_error, self.blend_distance)
+        return direction % 360
+    
+    def _calculate_lookahead_direction(self, pose):
+        """
+        Calculate the steering direction toward a point lookahead_distance ahead on the route,
+        corrected by cross-track error feedback.
+        
+        Args:
+            pose: PoseSnapshot used for the current position
             
-            if is_clockwise:
-                # For clockwise movement, tangent is -90° from center angle
-                return (center_angle - 90) % 360
-            else:
-                # For counter-clockwise movement, tangent is +90° from center angle
-                return (center_angle + 90) % 360
+        Returns:
+            Direction angle in degrees (0-360)
+        """
+        index = self.current_path_index
+        distance, cross_track_error, tangent = self.route.project(index, pose.x, pose.y)
+        self.cross_track_error = cross_track_error
+        
+        # Pure pursuit: head for the look-ahead point on the route. The point stays on the
+        # current segment, otherwise it would pull the robot across the junction before the
+        # switch; in blend mode the junction is rounded by the blended heading instead.
+        target_distance = min(distance + self.lookahead_distance, self.route.distance_at_progress(index, 1.0))
+        target_x, target_y = self.route.point_at(target_distance)
+        dx = target_x - pose.x
+        dy = target_y - pose.y
+        if math.hypot(dx, dy) < 1e-6:
+            return tangent
+        pursuit = math.degrees(math.atan2(dy, dx))
+        
+        # Heading error relative to the path tangent, plus extra pull back onto the line,
+        # limited so that some motion along the path always remains
+        heading_error = wrap_angle(pursuit - tangent)
+        correction = self.heading_gain * heading_error - self.cross_track_gain * cross_track_error
+        limit = self.MAX_TRACKING_CORRECTION
+        correction = max(-limit, min(limit, correction))
+        
+        return (tangent + correction) % 360
     
-    def _set_wheel_angles(self, path, path_direction, target_orientation):
+    def _set_wheel_angles(self, segment, path_direction, target_orientation, pose):
         """
-        Set the wheel angles based on path type and current position.
-        Adjusts angles based on robot orientation to maintain correct world direction.
+        Set each wheel's angle from the plan's steering table at the current route progress.
+        The table holds the tangents of the wheel paths, so the wheels steer for the planned
+        rotation; tracking corrections of the direction and the orientation error are
+        added with the rigid-body model. The module optimizer then picks the shorter
+        steering direction and limits the steering rate.
         
         Args:
-            path: Current Path object
+            segment: CompiledSegment of the current path
             path_direction: Current direction of motion in degrees
             target_orientation: Target robot orientation in degrees
+            pose: PoseSnapshot used for the current orientation
         """
-        # Calculate adjusted wheel angles (world to robot frame)
-        adjusted_angle = (path_direction - self.current_orientation) % 360
+        planned_direction, planned_angles, ratios = self.steering_table.lookup(self._get_route_progress())
+        
+        # Planned wheel motion per unit of center distance, turned by the tracking correction
+        # of the direction and taken into the robot frame
+        rotation = np.radians(planned_angles + (path_direction - planned_direction) - pose.orientation)
+        wheel_vx = ratios * np.cos(rotation)
+        wheel_vy = ratios * np.sin(rotation)
+        
+        # Rotate toward the target orientation when the robot is off its planned orientation
+        correction = math.radians(self.orientation_gain * wrap_angle(target_orientation - pose.orientation) / self.robot_width)
+        correction_vx, correction_vy = self.kinematics.wheel_velocities(0.0, 0.0, correction)
+        wheel_vx = wheel_vx + correction_vx
+        wheel_vy = wheel_vy + correction_vy
+        
+        angles = np.mod(np.degrees(np.arctan2(wheel_vy, wheel_vx)), 360)
+        speeds = np.hypot(wheel_vx, wheel_vy)
+        fastest = speeds.max()
         
-        # Set all wheel angles
-        for motor_id in self.angle_motors:
+        # Set each wheel angle, flipped and rate limited by the module optimizer
+        for index, motor_id in enumerate(self.angle_motors):
+            share = float(speeds[index] / fastest) if fastest > 0 else 1.0
+            angle, share = self.module_optimizer.command(index, float(angles[index]), share, self.update_interval)
+            self.commanded_angles[index] = angle
+            self._wheel_speed_shares[index] = share
             try:
-                wheelControl.set_wheel_angle(motor_id, adjusted_angle)
+                self.motor_backend.set_wheel_angle(motor_id, angle, self.motor_namespace)
             except Exception as e:
                 print(f"Error setting angle for motor {motor_id}: {e}")
     
     def _set_wheel_speeds(self):
         """
-        Set wheel speeds based on the calculated speed ratios at current progress.
+        Set wheel speeds: the fastest wheel runs at base_speed and the level is shared
+        between the wheels as the rigid-body model requires (negative for flipped modules).
+        When wheel limits are configured, the fastest wheel runs at the planned velocity
+        profile's path speed and each share is converted through that wheel's own limit.
         """
         try:
-            # Get wheel speeds at current progress
-            speeds = self.speed_calculator.get_speed_at_progress(self.path_progress, self.base_speed)
-            normalized_speeds = self.speed_calculator.normalize_speeds(speeds, -1.0, 1.0)
+            progress = self._get_route_progress()
+            if self.velocity_profile is not None:
+                # Planned path speed already respects the wheel limits, so no normalization
+                shares = dict(zip(self.speed_motors, self._wheel_speed_shares))
+                commands = self.velocity_profile.get_commands_for_shares(progress, shares, self.base_speed)
+                speeds = [commands[motor_id] for motor_id in self.speed_motors]
+            else:
+                # Get wheel speeds at current progress, with the fastest wheel at base speed
+                speeds = self.speed_calculator.get_speed_at_progress(progress, self.base_speed)
+                normalized_speeds = self.speed_calculator.normalize_speeds(speeds, -self.base_speed, self.base_speed)
+                
+                # The fastest wheel runs at the planned level
+                level = max(abs(speed) for speed in normalized_speeds.values()) if normalized_speeds else 0
+                speeds = [level * share for share in self._wheel_speed_shares]
             
             # Set speeds for each motor
-            for motor_id, speed in normalized_speeds.items():
-                wheelControl.set_wheel_speed(motor_id, speed)
+            for index, motor_id in enumerate(self.speed_motors):
+                speed = speeds[index]
+                self.commanded_speeds[index] = speed
+                self.motor_backend.set_wheel_speed(motor_id, speed, self.motor_namespace)
                 
         except Exception as e:
             print(f"Error setting wheel speeds: {e}")
     
+    def _get_route_progress(self):
+        """
+        Get progress along the whole route (0 to 1), with each segment taking an
+        equal share as in the sampled wheel paths.
+        """
+        return (self.current_path_index + self.path_progress) / len(self.path_list)
+    
+    def _segment_end_due(self):
+        """
+        Check whether the end of the current segment can be near, firing the segment
+        approach events that are due. The end is predicted when a segment starts and
+        re-predicted every tick from the measured progress.
+        
+        Returns:
+            True when the switch test should run this tick
+        """
+        events = self.segment_events
+        now = self.clock()
+        key = (self.plan, self.base_speed)
+        if events.segment_index != self.current_path_index or self._segment_events_key != key:
+            events.schedule(self.current_path_index, now, self._predict_segment_end(now),
+                            self.path_progress, self._switch_progress(self.segments[self.current_path_index]))
+            self._segment_events_key = key
+        return events.update(now, self.path_progress)
+    
+    def _switch_progress(self, segment):
+        """
+        Progress along a segment at which it is completed: 0.98 when stopping at
+        junctions, switch_distance before its end when blending.
+        """
+        if self.transition_mode == 'blend':
+            return 1 - self.switch_distance / segment.length if segment.length > 0 else 0
+        return 0.98
+    
+    def _predict_segment_end(self, now):
+        """
+        Predict when the current segment's switch point is reached, from the planned
+        time along the velocity profile at the current base speed.
+        
+        Args:
+            now: Current time in seconds
+            
+        Returns:
+            Predicted time in seconds, or None without a velocity profile
+        """
+        profile = self.velocity_profile
+        if profile is None or self.base_speed <= 0:
+            return None
+        
+        segment = self.segments[self.current_path_index]
+        switch_progress = max(self._switch_progress(segment), self.path_progress)
+        
+        route_switch = (self.current_path_index + switch_progress) / len(self.path_list)
+        remaining = profile.get_time_at_progress(route_switch) - profile.get_time_at_progress(self._get_route_progress())
+        return now + remaining / self.base_speed
+    
+    def add_segment_listener(self, callback, lead_time=0.0):
+        """
+        Register a callback for segment events.
+        
+        Args:
+            callback: Function called with a SegmentEvent: 'approach' lead_time before the
+                      predicted end of each segment (with a velocity profile), and
+                      'transition' when a segment has been completed
+            lead_time: Seconds before the predicted segment end for the 'approach' event
+        """
+        self.segment_events.add_listener(callback, lead_time)
+    
+    def remove_segment_listener(self, callback):
+        """
+        Unregister a segment event callback.
+        """
+        self.segment_events.remove_listener(callback)
+    
     def _advance_to_next_path(self):
         """
         Advance to the next path in the sequence.
         """
         self.current_path_index += 1
         self.path_progress = 0
+        self.segment_events.crossed(self.current_path_index - 1, self.clock())
+        
+        # A plan waiting for the next segment boundary takes over from here
+        if self._pending_plan is not None and self._swap_pending_plan(at_boundary=True):
+            return
+            
+        self._publish_path_state()
         
         # If we're at the end of all paths, stop following
         if self.current_path_index >= len(self.path_list):
             print("Reached end of path list")
             self.stop_following()
             
+    def enable_profiling(self, enabled=True, reset=True):
+        """
+        Enable or disable per-stage timing of the control loop at runtime.
+        
+        Args:
+            enabled: True to start timing stages, False to stop
+            reset: Discard previously recorded samples when enabling
+        """
+        if enabled and reset:
+            self.profiler.reset()
+        self.profiler.enabled = enabled
+        
+    def dump_trace(self, filename):
+        """
+        Write the recorded stage timings as a Chrome trace-event JSON file.
+        
+        Args:
+            filename: Output file path
+            
+        Returns:
+            Number of span events written
+        """
+        return self.profiler.dump_chrome_trace(filename)
+        
+    def _publish_path_state(self):
+        """
+        Publish the current path index and progress as one snapshot for other threads.
+        """
+        self._path_state.publish(path_index=self.current_path_index,
+                                 path_progress=self.path_progress,
+                                 timestamp=self.clock())
+            
     def get_status(self):
         """
         Get the current status of path following.
+        Pose and path progress are each read from a consistent snapshot.
         
         Returns:
             Dictionary with current status information
         """
+        pose = self._pose.read()
+        path_state = self._path_state.read()
         status = {
             "is_following": self.is_following,
-            "current_position": self.current_position,
-            "current_orientation": self.current_orientation,
-            "current_path_index": self.current_path_index,
-            "path_progress": self.path_progress,
+            "current_position": (pose.x, pose.y),
+            "current_orientation": pose.orientation,
+            "current_path_index": path_state.path_index,
+            "path_progress": path_state.path_progress,
+            "route_distance": self.route.distance_at_progress(path_state.path_index, path_state.path_progress),
+            "route_length": self.route.total_length,
             "total_paths": len(self.path_list),
+            "tracking_mode": self.tracking_mode,
+            "cross_track_error": self.cross_track_error,
+            "loop_timing": self.scheduler.get_stats(),
         }
         
+        # Add per-stage timing percentiles if profiling is enabled
+        if self.profiler.enabled:
+            status["stage_timing"] = self.profiler.get_percentiles()
+        
         # Add additional information if paths are set
         if self.path_list:
             path_types = [path.path_type for path in self.path_list]
             status["path_types"] = path_types
             
+        if self.velocity_profile is not None:
+            # Route time of the planned profile at base_speed 1.0
+            status["planned_duration"] = self.velocity_profile.total_time
+            
         return status
 
 
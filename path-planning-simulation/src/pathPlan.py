@@ -0,0 +1,81 @@
+from segmentGeometry import compile_segments
+from routeTable import RouteTable
+from wheelPathGenerator import WheelPathGenerator
+from wheel_speed_calculator import WheelSpeedCalculator
+from velocityPlanner import VelocityPlanner
+
+
+class PathPlan:
+    """
+    Everything PathHandler derives from a path list: compiled segments, route table,
+    wheel paths, steering table, speed ratios and the optional velocity profile.
+
+    A plan is built completely before it is used and never modified afterwards,
+    so it can be built on another thread or process and swapped in as a unit.
+    """
+
+    def __init__(self, path_list, initial_orientation, final_orientation,
+                 wheel_path_generator, velocity_planner=None):
+        """
+        Build the plan.
+
+        Args:
+            path_list: List of Path objects to follow in sequence (may be empty)
+            initial_orientation: Starting orientation in degrees
+            final_orientation: Target ending orientation in degrees
+            wheel_path_generator: WheelPathGenerator for the robot's dimensions
+            velocity_planner: Optional VelocityPlanner for a speed profile
+        """
+        self.path_list = list(path_list)
+        self.initial_orientation = initial_orientation
+        self.final_orientation = final_orientation
+
+        self.segments = compile_segments(self.path_list)
+        self.route = RouteTable(self.segments)
+
+        self.wheel_paths = {}
+        self.steering_table = None
+        self.speed_calculator = None
+        self.wheel_speed_ratios = {}
+        self.velocity_profile = None
+
+        if self.path_list:
+            # Generate wheel paths for speed calculation
+            self.wheel_paths = wheel_path_generator.generate_wheel_paths(
+                self.path_list, initial_orientation, final_orientation)
+
+            # Per-wheel steering angles from the path and rotation tangents
+            self.steering_table = wheel_path_generator.generate_steering_table(
+                self.path_list, initial_orientation, final_orientation)
+
+            # Calculate wheel speeds
+            self.speed_calculator = WheelSpeedCalculator(self.wheel_paths)
+            self.wheel_speed_ratios = self.speed_calculator.calculate_speed_ratios()
+
+            # Plan the center speed profile against the wheel limits
+            if velocity_planner is not None:
+                self.velocity_profile = velocity_planner.plan(self.wheel_paths)
+
+
+def build_plan(path_list, initial_orientation, final_orientation, robot_width, robot_height,
+               max_wheel_speed=None, max_wheel_accel=None):
+    """
+    Build a PathPlan from plain arguments, so it can run in a worker process.
+
+    Args:
+        path_list: List of Path objects to follow in sequence
+        initial_orientation: Starting orientation in degrees
+        final_orientation: Target ending orientation in degrees
+        robot_width: Width of the robot chassis
+        robot_height: Height of the robot chassis
+        max_wheel_speed: Wheel speed limit for the velocity planner (optional)
+        max_wheel_accel: Wheel acceleration limit for the velocity planner (optional)
+
+    Returns:
+        PathPlan
+    """
+    velocity_planner = None
+    if max_wheel_speed is not None and max_wheel_accel is not None:
+        velocity_planner = VelocityPlanner(max_wheel_speed, max_wheel_accel)
+    return PathPlan(path_list, initial_orientation, final_orientation,
+                    WheelPathGenerator(robot_width, robot_height), velocity_planner)
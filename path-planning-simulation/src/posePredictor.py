@@ -0,0 +1,107 @@
+import math
+
+
+class PosePredictor:
+    """
+    Extrapolates the robot pose between tracking updates.
+
+    Velocities are estimated from consecutive timestamped poses and smoothed
+    with an exponential filter. Two motion models are available:
+        'constant_velocity'  - straight-line extrapolation of the position
+        'constant_turn_rate' - the velocity vector keeps turning at its current rate,
+                               which follows arcs without cutting inside them
+    The body orientation is extrapolated at its own measured rate in both models.
+    """
+
+    MODELS = ('constant_velocity', 'constant_turn_rate')
+
+    def __init__(self, model='constant_velocity', smoothing=0.5, max_extrapolation=0.25):
+        """
+        Initialize the predictor.
+
+        Args:
+            model: 'constant_velocity' or 'constant_turn_rate'
+            smoothing: Weight of each new velocity measurement (1.0 = no smoothing)
+            max_extrapolation: Longest time in seconds a pose is extrapolated forward
+        """
+        if model not in self.MODELS:
+            raise ValueError(f"Unknown prediction model: {model}")
+
+        self.model = model
+        self.smoothing = smoothing
+        self.max_extrapolation = max_extrapolation
+        self.reset()
+
+    def reset(self):
+        """
+        Forget all previous measurements.
+        """
+        self.last_pose = None
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        self.turn_rate = 0.0         # rad/s, rotation of the velocity vector
+        self.orientation_rate = 0.0  # deg/s, rotation of the robot body
+        self._last_course = None
+        self._last_interval = 0.0
+
+    def update(self, pose):
+        """
+        Feed a new measured pose.
+
+        Args:
+            pose: PoseSnapshot (x, y, orientation, timestamp)
+        """
+        last = self.last_pose
+        self.last_pose = pose
+        if last is None:
+            return
+
+        dt = pose.timestamp - last.timestamp
+        if dt <= 0:
+            return
+        self._last_interval = dt
+
+        alpha = self.smoothing
+        self.velocity_x += alpha * ((pose.x - last.x) / dt - self.velocity_x)
+        self.velocity_y += alpha * ((pose.y - last.y) / dt - self.velocity_y)
+
+        orientation_change = (pose.orientation - last.orientation + 180) % 360 - 180
+        self.orientation_rate += alpha * (orientation_change / dt - self.orientation_rate)
+
+        if self.model == 'constant_turn_rate':
+            course = math.atan2(self.velocity_y, self.velocity_x)
+            if self._last_course is not None and (self.velocity_x or self.velocity_y):
+                course_change = (course - self._last_course + math.pi) % (2 * math.pi) - math.pi
+                self.turn_rate += alpha * (course_change / dt - self.turn_rate)
+            self._last_course = course
+
+    def predict(self, timestamp):
+        """
+        Predict the pose at a given time.
+
+        Args:
+            timestamp: Time to predict for, on the same clock as the pose timestamps
+
+        Returns:
+            Tuple (x, y, orientation), or None if no pose has been received
+        """
+        pose = self.last_pose
+        if pose is None:
+            return None
+
+        dt = max(0.0, min(self.max_extrapolation, timestamp - pose.timestamp))
+        orientation = (pose.orientation + self.orientation_rate * dt) % 360
+
+        if self.model == 'constant_turn_rate' and abs(self.turn_rate) > 1e-6:
+            # Integrate a velocity vector rotating at turn_rate
+            speed = math.hypot(self.velocity_x, self.velocity_y)
+            # The finite-difference velocity is the chord direction, half an interval behind the last pose
+            course = math.atan2(self.velocity_y, self.velocity_x) + self.turn_rate * self._last_interval / 2
+            turned = course + self.turn_rate * dt
+            x = pose.x + speed / self.turn_rate * (math.sin(turned) - math.sin(course))
+            y = pose.y + speed / self.turn_rate * (math.cos(course) - math.cos(turned))
+        else:
+            x = pose.x + self.velocity_x * dt
+            y = pose.y + self.velocity_y * dt
+
+        return x, y, orientation
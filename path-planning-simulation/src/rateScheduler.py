@@ -0,0 +1,197 @@
+import time
+
+
+class RateScheduler:
+    """
+    Fixed-rate loop scheduler driven by absolute deadlines on a monotonic clock.
+
+    Each tick is scheduled at start_time + n * period rather than "now + period",
+    so sleep error never accumulates into drift and wall-clock jumps have no effect.
+    Overruns are counted instead of being silently absorbed.
+
+    Overrun policies:
+        'skip'     - drop the missed ticks and resume on the next future deadline
+        'catch_up' - run the missed ticks back to back until the schedule is met
+    """
+
+    OVERRUN_POLICIES = ('skip', 'catch_up')
+
+    def __init__(self, frequency, overrun_policy='skip', spin_threshold=0.0005,
+                 max_catch_up=10, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize the scheduler.
+
+        Args:
+            frequency: Loop rate in Hz
+            overrun_policy: 'skip' or 'catch_up'
+            spin_threshold: Final part of each wait (seconds) that is busy-waited
+                instead of slept, to tighten jitter at high rates. 0 disables spinning.
+            max_catch_up: Maximum number of ticks 'catch_up' will run late before
+                resynchronizing to the current time
+            clock: Monotonic time source returning seconds
+            sleep: Sleep function taking seconds. With a custom clock or sleep (e.g. a
+                simulated clock), all waiting goes through sleep and nothing is
+                busy-waited; stop_event is only checked between sleeps.
+        """
+        if frequency <= 0:
+            raise ValueError("frequency must be positive")
+        if overrun_policy not in self.OVERRUN_POLICIES:
+            raise ValueError(f"Unknown overrun policy: {overrun_policy}")
+
+        self.frequency = frequency
+        self.period = 1.0 / frequency
+        self.overrun_policy = overrun_policy
+        self.spin_threshold = spin_threshold
+        self.max_catch_up = max_catch_up
+        self.clock = clock
+        self.sleep = sleep
+        # Waiting on a stop event and spinning only make sense against real time
+        self._real_time = clock is time.monotonic and sleep is time.sleep
+
+        self.reset()
+
+    def reset(self):
+        """
+        Reset the schedule and all timing statistics for a new run.
+        """
+        self.start_time = None
+        self.next_deadline = None
+        self.tick_count = 0
+        self.missed_deadlines = 0
+        self.skipped_ticks = 0
+        self.worst_loop_time = 0.0
+        self.total_loop_time = 0.0
+        self.max_jitter = 0.0
+        self.total_jitter = 0.0
+        self._missed_until = None
+
+    def start(self):
+        """
+        Anchor the schedule at the current time. The first tick is due immediately.
+        """
+        self.reset()
+        self.start_time = self.clock()
+        self.next_deadline = self.start_time
+
+    def wait_next(self, stop_event=None):
+        """
+        Block until the next deadline is due.
+
+        Args:
+            stop_event: Optional threading.Event; waiting is abandoned when it is set
+
+        Returns:
+            Time the tick actually started, or None if stop_event was set
+        """
+        if self.next_deadline is None:
+            self.start()
+
+        deadline = self.next_deadline
+        now = self.clock()
+        remaining = deadline - now
+
+        if not self._real_time:
+            # Injected time: one sleep is expected to advance the clock to the deadline
+            if stop_event is not None and stop_event.is_set():
+                return None
+            if remaining > 0:
+                self.sleep(remaining)
+                now = max(self.clock(), deadline)
+        else:
+            # Coarse sleep, leaving the last spin_threshold seconds to a busy-wait
+            if remaining > self.spin_threshold:
+                if stop_event is not None:
+                    if stop_event.wait(remaining - self.spin_threshold):
+                        return None
+                else:
+                    self.sleep(remaining - self.spin_threshold)
+                now = self.clock()
+
+            while now < deadline:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                now = self.clock()
+
+        # Jitter is how late the tick starts relative to its deadline
+        jitter = now - deadline
+        self.total_jitter += jitter
+        if jitter > self.max_jitter:
+            self.max_jitter = jitter
+
+        return now
+
+    def tick_done(self, tick_start):
+        """
+        Record the end of a tick and schedule the next deadline.
+
+        Args:
+            tick_start: Value returned by wait_next() for this tick
+        """
+        now = self.clock()
+        loop_time = now - tick_start
+        self.tick_count += 1
+        self.total_loop_time += loop_time
+        if loop_time > self.worst_loop_time:
+            self.worst_loop_time = loop_time
+
+        self.next_deadline += self.period
+
+        # Deadlines that have already passed are overruns
+        if now > self.next_deadline:
+            behind = int((now - self.next_deadline) / self.period) + 1
+
+            # While catching up, deadlines already counted as missed are not counted again
+            first_uncounted = self.next_deadline
+            if self._missed_until is not None and self._missed_until >= first_uncounted:
+                first_uncounted = self._missed_until + self.period
+            if now > first_uncounted:
+                newly_missed = int((now - first_uncounted) / self.period) + 1
+                self.missed_deadlines += newly_missed
+                self._missed_until = first_uncounted + (newly_missed - 1) * self.period
+
+            if self.overrun_policy == 'skip' or behind > self.max_catch_up:
+                # Resume on the first deadline that is still in the future
+                self.next_deadline += behind * self.period
+                self.skipped_ticks += behind
+            # 'catch_up' keeps the deadline in the past so the next ticks run immediately
+
+    def run(self, tick, stop_event):
+        """
+        Call tick() at the scheduled rate until stop_event is set or tick() returns False.
+
+        Args:
+            tick: Callable executed once per period
+            stop_event: threading.Event used to end the loop
+        """
+        self.start()
+
+        while not stop_event.is_set():
+            tick_start = self.wait_next(stop_event)
+            if tick_start is None:
+                break
+
+            keep_running = tick()
+            self.tick_done(tick_start)
+
+            if keep_running is False:
+                break
+
+    def get_stats(self):
+        """
+        Get the timing statistics for the current run.
+
+        Returns:
+            Dictionary with loop timing information (times in seconds)
+        """
+        ticks = self.tick_count
+        return {
+            "frequency": self.frequency,
+            "overrun_policy": self.overrun_policy,
+            "ticks": ticks,
+            "missed_deadlines": self.missed_deadlines,
+            "skipped_ticks": self.skipped_ticks,
+            "worst_loop_time": self.worst_loop_time,
+            "mean_loop_time": self.total_loop_time / ticks if ticks else 0.0,
+            "max_jitter": self.max_jitter,
+            "mean_jitter": self.total_jitter / ticks if ticks else 0.0,
+        }
@@ -1,7 +1,103 @@
 import pygame
 import math
+import numpy as np
+from collections import OrderedDict
+
+
+class WheelSpriteCache:
+    """
+    Bounded LRU cache of rotated wheel sprites, keyed by wheel size, color and angle
+    quantized to angle_step degrees. Drawing a cached wheel is a single blit.
+    """
+
+    def __init__(self, max_size=2048, angle_step=1.0):
+        """
+        :param max_size: Maximum number of cached sprites
+        :param angle_step: Angle quantization in degrees
+        """
+        self.max_size = max_size
+        self.angle_step = angle_step
+        self._sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, width, height, color, angle_degrees):
+        """
+        Get the wheel sprite for an angle, rendering it on a miss.
+        :param width: Wheel width (short side)
+        :param height: Wheel height (long side)
+        :param color: Wheel color
+        :param angle_degrees: Angle in degrees
+        :return: Rotated pygame Surface, centered on the wheel center
+        """
+        bins = int(round(360 / self.angle_step))
+        angle_bin = int(round(angle_degrees / self.angle_step)) % bins
+        key = (width, height, tuple(color), angle_bin)
+
+        sprite = self._sprites.get(key)
+        if sprite is not None:
+            self._sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self._render(width, height, color, angle_bin * self.angle_step)
+        self._sprites[key] = sprite
+        if len(self._sprites) > self.max_size:
+            self._sprites.popitem(last=False)
+        return sprite
+
+    def prewarm(self, width, height, color):
+        """
+        Render the sprites of all angle bins for a wheel size and color.
+        :param width: Wheel width (short side)
+        :param height: Wheel height (long side)
+        :param color: Wheel color
+        """
+        bins = int(round(360 / self.angle_step))
+        for angle_bin in range(bins):
+            self.get(width, height, color, angle_bin * self.angle_step)
+
+    def clear(self):
+        """Drop all cached sprites."""
+        self._sprites.clear()
+
+    def __len__(self):
+        return len(self._sprites)
+
+    @staticmethod
+    def _render(width, height, color, angle_degrees):
+        # Create wheel surface with margin for rotation
+        max_dim = max(width, height) * 2
+        wheel_surface = pygame.Surface((max_dim, max_dim), pygame.SRCALPHA)
+        
+        # Draw wheel on surface - short side is width, long side is height
+        # At angle=0, the wheel will be horizontal with width as short side
+        wheel_rect = pygame.Rect(max_dim//2 - width//2, max_dim//2 - height//2, width, height)
+        pygame.draw.rect(wheel_surface, color, wheel_rect)
+        
+        # Add direction indicator line pointing in the same direction as short side
+        center = (max_dim//2, max_dim//2)
+        # Make indicator shorter - reduced extension from wheel edge
+        indicator_end = (center[0], center[1] - width//2 + 2)  # Reduced from 5 to 2
+        pygame.draw.line(wheel_surface, (255, 0, 0), center, indicator_end, 2)
+        
+        # Invert the rotation to match expected behavior (counter-clockwise)
+        return pygame.transform.rotate(wheel_surface, -angle_degrees)
+
 
 class Robot:
+    # Wheel sprites shared by all robots
+    wheel_sprites = WheelSpriteCache()
+
+    # Colors of the orientation markers at the center of each side
+    side_colors = (
+        (255, 100, 100),  # Red for top
+        (100, 255, 100),  # Green for right
+        (100, 100, 255),  # Blue for bottom
+        (255, 255, 0),    # Yellow for left
+    )
+
     def __init__(self, x, y, width, height, wheel_width, wheel_height, body_color, wheel_color):
         self.x = x
         self.y = y
@@ -14,96 +110,104 @@ class Robot:
         self.orientation = 0  # Add this line to track robot body orientation
         # Initialize wheels to face up (90 degrees)
         self.wheel_angles = {1: 270, 3: 270, 5: 270, 7: 270}
+        
+        # Transformed drawing points, kept until the pose or size changes
+        self._frame_key = None
+        self._frame_points = None
+        self._shape_key = None
+        self._local_points = None
 
     def draw(self, screen):
-        # Calculate corner positions based on orientation
-        corners = self._get_rotated_corners()
+        """
+        Draw the robot.
+        :param screen: Pygame surface to draw on
+        :return: Rect covering everything drawn
+        """
+        corners, triangles, wheel_positions = self._get_frame_points()
         
         # Draw robot body
-        pygame.draw.polygon(screen, self.body_color, corners)
+        rect = pygame.draw.polygon(screen, self.body_color, corners)
         
         # Draw colored triangles at the center of each side to identify orientation
-        triangle_size = 15
+        for color, triangle in zip(self.side_colors, triangles):
+            pygame.draw.polygon(screen, color, triangle)
+
+        # Draw wheels
+        wheel_rects = []
+        for motor_id, (wheel_x, wheel_y) in zip((1, 3, 5, 7), wheel_positions):
+            # Angle is relative to robot body, so add robot orientation
+            total_angle = (self.wheel_angles[motor_id] + self.orientation) % 360
+            wheel_rects.append(self._draw_rotated_wheel(screen, wheel_x, wheel_y, self.wheel_width,
+                                                        self.wheel_height, total_angle, self.wheel_color))
+        
+        return rect.unionall(wheel_rects)
+
+    def _get_frame_points(self):
+        """
+        Screen positions of the body corners, side marker triangles and wheels.
+        All points are transformed with one rotation matrix in a single pass, and the
+        result is kept until the pose or the size of the robot changes.
+        :return: Tuple (corners, triangles, wheel_positions) of (x, y) lists
+        """
+        key = (self.x, self.y, self.orientation, self.width, self.height)
+        if key == self._frame_key:
+            return self._frame_points
+        
+        if key[3:] != self._shape_key:
+            self._local_points = self._build_local_points()
+            self._shape_key = key[3:]
         
-        # Define colors for each side
-        side_colors = {
-            "top": (255, 100, 100),     # Red for top
-            "right": (100, 255, 100),   # Green for right
-            "bottom": (100, 100, 255),  # Blue for bottom
-            "left": (255, 255, 0)       # Yellow for left
-        }
-        
-        # Calculate midpoints of each side based on rotated corners
-        side_centers = {
-            "top": ((corners[0][0] + corners[1][0]) / 2, (corners[0][1] + corners[1][1]) / 2),      # Top middle (between top-left and top-right)
-            "right": ((corners[1][0] + corners[2][0]) / 2, (corners[1][1] + corners[2][1]) / 2),    # Right middle
-            "bottom": ((corners[2][0] + corners[3][0]) / 2, (corners[2][1] + corners[3][1]) / 2),   # Bottom middle
-            "left": ((corners[3][0] + corners[0][0]) / 2, (corners[3][1] + corners[0][1]) / 2)      # Left middle
-        }
-        
-        # Get angle for each side (perpendicular to the side)
         rad_angle = math.radians(self.orientation)
+        cos_a, sin_a = math.cos(rad_angle), math.sin(rad_angle)
+        rotation = np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+        points = (self._local_points @ rotation + (self.x, self.y)).tolist()
         
-        # Calculate the outward direction for each side based on the robot's orientation
-        side_angles = {
-            "top": rad_angle - math.pi/2,        # Top points upward (negative y)
-            "right": rad_angle,                  # Right points rightward (positive x)
-            "bottom": rad_angle + math.pi/2,     # Bottom points downward (positive y)
-            "left": rad_angle + math.pi,         # Left points leftward (negative x)
-        }
-
-        # Draw triangles at each side center, pointing outward but positioned closer to center
-        for side, center in side_centers.items():
-            angle = side_angles[side]
-            
-            # Move triangle starting position inward towards robot center
-            inward_offset = self.width / 4  # Move triangle 1/4 of the way toward center
-            
-            # Calculate new starting position
-            center_angle = angle + math.pi  # Opposite direction (toward center)
-            adjusted_center_x = center[0] + inward_offset * math.cos(center_angle)
-            adjusted_center_y = center[1] + inward_offset * math.sin(center_angle)
-            
-            # Calculate the tip of the triangle (pointing outward from adjusted center)
-            tip_x = adjusted_center_x + triangle_size * math.cos(angle)
-            tip_y = adjusted_center_y + triangle_size * math.sin(angle)
-            
-            # Calculate the perpendicular angle for the base of the triangle
-            perp_angle = angle + math.pi/2
-            
-            # Calculate the base points of the triangle
-            base1_x = adjusted_center_x + (triangle_size/2) * math.cos(perp_angle)
-            base1_y = adjusted_center_y + (triangle_size/2) * math.sin(perp_angle)
-            
-            base2_x = adjusted_center_x - (triangle_size/2) * math.cos(perp_angle)
-            base2_y = adjusted_center_y - (triangle_size/2) * math.sin(perp_angle)
-            
-            # Draw triangle
-            pygame.draw.polygon(screen, side_colors[side], [
-                (tip_x, tip_y),
-                (base1_x, base1_y),
-                (base2_x, base2_y)
-            ])
+        corners = [tuple(point) for point in points[0:4]]
+        triangles = [[tuple(point) for point in points[i:i + 3]] for i in range(4, 16, 3)]
+        wheel_positions = [tuple(point) for point in points[16:20]]
+        
+        self._frame_key = key
+        self._frame_points = (corners, triangles, wheel_positions)
+        return self._frame_points
 
-        # Draw wheels
-        for motor_id in [1, 3, 5, 7]:
-            # Get wheel position
-            wheel_x, wheel_y = self._get_wheel_position(motor_id)
-            
-            # Get wheel angle - this is relative to robot body
-            angle = self.wheel_angles[motor_id]
-            
-            # Calculate wheel dimensions
-            wheel_length = self.wheel_width
-            wheel_width = self.wheel_height
-            
-            # Calculate wheel corner points with rotation
-            # Angle is relative to robot body, so add robot orientation
-            total_angle = (angle + self.orientation) % 360
-            rad_angle = math.radians(total_angle)
-            
-            # Calculate rotated wheel corners
-            self._draw_rotated_wheel(screen, wheel_x, wheel_y, wheel_length, wheel_width, total_angle, self.wheel_color)
+    def _build_local_points(self):
+        """
+        Body corners, side marker triangles and wheel positions relative to the robot
+        center at orientation 0, one point per row.
+        """
+        half_width = self.width / 2
+        half_height = self.height / 2
+        triangle_size = 15
+        
+        # Corners: top-left, top-right, bottom-right, bottom-left
+        corners = [(-half_width, -half_height), (half_width, -half_height),
+                   (half_width, half_height), (-half_width, half_height)]
+        
+        # Triangles at each side center, pointing outward but moved a quarter of the
+        # width toward the center: tip, then the two base points
+        sides = [
+            ((0, -half_height), (0, -1)),  # top points upward (negative y)
+            ((half_width, 0), (1, 0)),     # right points rightward (positive x)
+            ((0, half_height), (0, 1)),    # bottom points downward (positive y)
+            ((-half_width, 0), (-1, 0)),   # left points leftward (negative x)
+        ]
+        inward_offset = self.width / 4
+        triangles = []
+        for (center_x, center_y), (out_x, out_y) in sides:
+            base_x = center_x - inward_offset * out_x
+            base_y = center_y - inward_offset * out_y
+            perp_x, perp_y = -out_y, out_x
+            triangles += [
+                (base_x + triangle_size * out_x, base_y + triangle_size * out_y),
+                (base_x + triangle_size / 2 * perp_x, base_y + triangle_size / 2 * perp_y),
+                (base_x - triangle_size / 2 * perp_x, base_y - triangle_size / 2 * perp_y),
+            ]
+        
+        # Wheels: 1 top-left, 3 top-right, 5 bottom-left, 7 bottom-right
+        wheels = [(-half_width, -half_height), (half_width, -half_height),
+                  (-half_width, half_height), (half_width, half_height)]
+        
+        return np.array(corners + triangles + wheels, dtype=float)
 
     def _draw_rotated_wheel(self, screen, x, y, width, height, angle_degrees, color):
         """
@@ -115,28 +219,20 @@ class Robot:
         :param height: Wheel height (long side)
         :param angle_degrees: Angle in degrees (0-360)
         :param color: Wheel color
+        :return: Rect of the blitted wheel
         """
-        # Create wheel surface with margin for rotation
-        max_dim = max(width, height) * 2
-        wheel_surface = pygame.Surface((max_dim, max_dim), pygame.SRCALPHA)
-        
-        # Draw wheel on surface - short side is width, long side is height
-        # At angle=0, the wheel will be horizontal with width as short side
-        wheel_rect = pygame.Rect(max_dim//2 - width//2, max_dim//2 - height//2, width, height)
-        pygame.draw.rect(wheel_surface, color, wheel_rect)
-        
-        # Add direction indicator line pointing in the same direction as short side
-        center = (max_dim//2, max_dim//2)
-        # Make indicator shorter - reduced extension from wheel edge
-        indicator_end = (center[0], center[1] - width//2 + 2)  # Reduced from 5 to 2
-        pygame.draw.line(wheel_surface, (255, 0, 0), center, indicator_end, 2)
-        
-        # Invert the rotation to match expected behavior (counter-clockwise)
-        rotated_surface = pygame.transform.rotate(wheel_surface, -angle_degrees)
+        # Cached sprite for this size, color and (quantized) angle
+        rotated_surface = self.wheel_sprites.get(width, height, color, angle_degrees)
         
         # Blit to screen at correct position
         blit_rect = rotated_surface.get_rect(center=(x, y))
-        screen.blit(rotated_surface, blit_rect)
+        return screen.blit(rotated_surface, blit_rect)
+    
+    def prewarm_wheel_sprites(self):
+        """
+        Render this robot's wheel sprites for all angles up front, e.g. at startup.
+        """
+        self.wheel_sprites.prewarm(self.wheel_width, self.wheel_height, self.wheel_color)
     
     def set_wheel_angle(self, wheel_id, angle):
         """
@@ -155,34 +251,10 @@ class Robot:
             self.set_wheel_angle(wheel_id, angle)
 
     def _get_rotated_corners(self):
-        # Calculate center and corner positions
-        half_width = self.width / 2
-        half_height = self.height / 2
-        
-        # Define corners relative to center
-        corners_rel = [
-            (-half_width, -half_height),  # top-left
-            (half_width, -half_height),   # top-right
-            (half_width, half_height),    # bottom-right
-            (-half_width, half_height)    # bottom-left
-        ]
-        
-        # Rotate corners based on robot orientation
-        rad_angle = math.radians(self.orientation)
-        rotated_corners = []
-        
-        for x_rel, y_rel in corners_rel:
-            # Rotate point
-            x_rot = x_rel * math.cos(rad_angle) - y_rel * math.sin(rad_angle)
-            y_rot = x_rel * math.sin(rad_angle) + y_rel * math.cos(rad_angle)
-            
-            # Translate back to screen coordinates
-            x_screen = self.x + x_rot
-            y_screen = self.y + y_rot
-            
-            rotated_corners.append((x_screen, y_screen))
-        
-        return rotated_corners
+        """
+        Screen positions of the body corners (top-left, top-right, bottom-right, bottom-left).
+        """
+        return self._get_frame_points()[0]
 
     def _get_wheel_position(self, wheel_id):
         """
@@ -194,30 +266,4 @@ class Robot:
         Returns:
             Tuple (x, y) with wheel position
         """
-        # Calculate half dimensions
-        half_width = self.width / 2
-        half_height = self.height / 2
-        
-        # Define wheel positions relative to center (before rotation)
-        wheel_offsets = {
-            1: (-half_width, -half_height),  # top-left
-            3: (half_width, -half_height),   # top-right
-            5: (-half_width, half_height),    # bottom-left
-            7: (half_width, half_height)     # bottom-right
-        }
-        
-        # Get offset for this wheel
-        x_offset, y_offset = wheel_offsets[wheel_id]
-        
-        # Apply rotation based on robot orientation
-        rad_angle = math.radians(self.orientation)
-        
-        # Rotate offset
-        rotated_x = x_offset * math.cos(rad_angle) - y_offset * math.sin(rad_angle)
-        rotated_y = x_offset * math.sin(rad_angle) + y_offset * math.cos(rad_angle)
-        
-        # Calculate final wheel position
-        wheel_x = self.x + rotated_x
-        wheel_y = self.y + rotated_y
-        
-        return (wheel_x, wheel_y)
\ No newline at end of file
+        return self._get_frame_points()[2][(wheel_id - 1) // 2]
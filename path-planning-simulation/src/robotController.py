@@ -1,22 +1,62 @@
 import math
 import time
 from collections import defaultdict
+from segmentGeometry import compile_segments
+from routeTable import RouteTable, cross_track_correction
+from swerveKinematics import SwerveKinematics, body_to_world, WHEEL_IDS
+from moduleOptimizer import optimize_module_angle, step_toward_angle
+from segmentEvents import SegmentEventScheduler
+
+MOVEMENT_SPEED = 100  # Wheel speed in distance per second at speed command 1.0
 
 class RobotController:
-    def __init__(self, robot):
+    def __init__(self, robot, transition_mode='stop', blend_distance=None, switch_distance=None, telemetry=None,
+                 clock=time.time, fixed_timestep=None, substeps=1, max_steering_speed=None):
         """
         Initialize the robot controller with 8 motors.
         Motors 1,3,5,7 control wheel orientation (0-360 degrees)
         Motors 2,4,6,8 control wheel speed (-1 to 1)
+        :param robot: Robot being controlled
+        :param transition_mode: 'stop' reconfigures the wheels at 98% segment progress,
+                                'blend' pre-steers toward the next segment and switches on
+                                remaining arc length without stopping
+        :param blend_distance: Blending distance on each side of a junction (defaults to robot width)
+        :param switch_distance: Remaining arc length at which blend mode switches segments
+                                (defaults to 5% of robot width)
+        :param telemetry: Optional TelemetryRecorder receiving one record per move_robot call
+        :param clock: Function returning the current time in seconds (default time.time);
+                      a virtual clock makes the movement independent of wall time
+        :param fixed_timestep: Seconds advanced per move_robot/step call, ignoring the clock
+                               (None integrates the measured time between calls)
+        :param substeps: Integration sub-steps per update
+        :param max_steering_speed: Steering motor speed in degrees per second; the wheels turn
+                                   toward their commanded angles at this rate (None turns instantly)
         """
+        if transition_mode not in ('stop', 'blend'):
+            raise ValueError(f"Unknown transition mode: {transition_mode}")
+        if substeps < 1:
+            raise ValueError("substeps must be at least 1")
         self.robot = robot
+        self.kinematics = SwerveKinematics(robot.width, robot.height)
         self.moving = False
-        self.last_update_time = time.time()
+        self.clock = clock
+        self.last_update_time = clock()
+        
+        # Fixed timestep integration
+        self.fixed_timestep = fixed_timestep
+        self.substeps = substeps
+        self.sim_time = 0.0
         
         # Initialize motor states
         self.wheel_angles = {1: 0, 3: 0, 5: 0, 7: 0}  # Orientation motors (degrees)
         self.wheel_speeds = {2: 0, 4: 0, 6: 0, 8: 0}  # Speed motors (-1 to 1)
         
+        # Steering: each module turns the short way to its target and drives reversed
+        # when flipped by 180°
+        self.max_steering_speed = max_steering_speed
+        self.steering_targets = {1: 0, 3: 0, 5: 0, 7: 0}
+        self.wheel_directions = {1: 1, 3: 1, 5: 1, 7: 1}
+        
         # Wheel positions (top-left, top-right, bottom-left, bottom-right)
         self.wheel_positions = {
             1: "top-left",
@@ -27,8 +67,24 @@ class RobotController:
         
         # Path following state
         self.path_list = []
+        self.segments = []  # CompiledSegment records, one per path
         self.current_path_index = 0
         self.path_progress = 0  # 0 to 1 progress along current path
+        self.route = RouteTable([])
+        self.route_distance = 0  # Distance along the whole route
+        
+        # Segment transition settings
+        self.transition_mode = transition_mode
+        self.blend_distance = blend_distance if blend_distance is not None else robot.width
+        self.switch_distance = switch_distance if switch_distance is not None else 0.05 * robot.width
+        
+        # Predicted segment ends: the switch test only runs near them, and listeners are notified
+        self.segment_events = SegmentEventScheduler()
+        
+        # Telemetry, with the wheel commands copied in place each update
+        self.telemetry = telemetry
+        self._telemetry_angles = [0.0] * 4
+        self._telemetry_speeds = [0.0] * 4
         
     def set_paths(self, path_list):
         """
@@ -36,15 +92,23 @@ class RobotController:
         :param path_list: List of Path objects
         """
         self.path_list = path_list
+        self.segments = compile_segments(path_list)
+        self.route = RouteTable(self.segments)
         self.current_path_index = 0
         self.path_progress = 0
+        self.route_distance = 0
         
     def set_wheel_angle(self, motor_id, angle):
         """Set the angle of a wheel orientation motor."""
         if motor_id in self.wheel_angles:
-            self.wheel_angles[motor_id] = angle % 360
-            # Also update the robot's wheel angle
-            self.robot.set_wheel_angle(motor_id, angle)
+            # Flip the module if that needs less steering, driving it in reverse
+            target, direction = optimize_module_angle(angle, 1, self.wheel_angles[motor_id])
+            self.steering_targets[motor_id] = target
+            self.wheel_directions[motor_id] = direction
+            if self.max_steering_speed is None:
+                self.wheel_angles[motor_id] = target
+                # Also update the robot's wheel angle
+                self.robot.set_wheel_angle(motor_id, target)
     
     def set_wheel_speed(self, motor_id, speed):
         """Set the speed of a wheel speed motor."""
@@ -61,6 +125,13 @@ class RobotController:
         for motor_id in self.wheel_speeds:
             self.set_wheel_speed(motor_id, speed)
     
+    def steer_toward(self, direction):
+        """
+        Point all wheels in a world direction, compensating the robot orientation.
+        :param direction: Direction of travel in world degrees
+        """
+        self.set_all_wheel_angles(direction - self.robot.orientation)
+    
     def follow_paths(self):
         """
         Initialize path following without actually moving the robot.
@@ -74,40 +145,24 @@ class RobotController:
         self.current_path_index = 0
         self.path_progress = 0
         self.moving = True
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
+        self.segment_events.reset()
         
         # Configure wheels for the first path
-        current_path = self.path_list[self.current_path_index]
-        self._configure_initial_wheels(current_path)
+        self._configure_initial_wheels(self.segments[self.current_path_index])
         
         return True
 
-    def _configure_initial_wheels(self, path):
+    def _configure_initial_wheels(self, segment):
         """
         Configure wheels for the initial path segment.
+        :param segment: CompiledSegment of the path
         """
-        if path.path_type == 'line':
-            # For straight line, set orientation
-            start_x, start_y = path.start_point
-            end_x, end_y = path.end_point
-            dx = end_x - start_x
-            dy = end_y - start_y
-            line_angle = (math.degrees(math.atan2(dy, dx))) % 360
-            self.set_all_wheel_angles(line_angle)
-        else:  # curve
-            # Set wheels tangent to the curve at the starting point
-            center_x, center_y = path.circle_center
-            start_angle = path.start_angle
-            start_x = center_x + path.radius * math.cos(start_angle)
-            start_y = center_y + path.radius * math.sin(start_angle)
-            dx = center_x - start_x
-            dy = center_y - start_y
-            center_angle = (math.degrees(math.atan2(dy, dx))) % 360
-            tangent_angle = (center_angle + 90) % 360
-            self.set_all_wheel_angles(tangent_angle)
+        # Line heading, or the tangent at the start of the curve
+        self.steer_toward(segment.start_heading)
         
         # Set initial speed based on path velocity
-        velocity = path.velocity if path.velocity is not None else 0.5
+        velocity = segment.path.velocity if segment.path.velocity is not None else 0.5
         self.set_all_wheel_speeds(velocity)
 
     def update_path_following(self):
@@ -117,97 +172,98 @@ class RobotController:
         if not self.path_list or self.current_path_index >= len(self.path_list):
             return False
         
-        current_path = self.path_list[self.current_path_index]
+        segment = self.segments[self.current_path_index]
         current_x, current_y = self.robot.x, self.robot.y
         
-        # Get velocity for current path
-        velocity = current_path.velocity if current_path.velocity is not None else 0.5
+        # Project the position onto the precomputed segment
+        self.path_progress = segment.progress_at(current_x, current_y)
         
-        # Handle specific path types
-        if current_path.path_type == 'line':
-            # For line paths - code remains the same
-            start_x, start_y = current_path.start_point
-            end_x, end_y = current_path.end_point
-            
-            # Calculate direction vector
-            dx = end_x - start_x
-            dy = end_y - start_y
-            path_length = math.sqrt(dx**2 + dy**2)
-            
-            # Normalize direction
-            if path_length > 0:
-                dx /= path_length
-                dy /= path_length
-            
-            # Calculate progress along line
-            t = ((current_x - start_x) * dx + (current_y - start_y) * dy) / path_length
-            self.path_progress = max(0, min(1, t))
-            
-            # Check if reached end of path
-            if self.path_progress >= 0.98:
-                self._advance_to_next_path()
-                return True
-            
-        else:  # curve path - this is where the fix is needed
-            center_x, center_y = current_path.circle_center
-            radius = current_path.radius
-            start_angle = current_path.start_angle
-            end_angle = current_path.end_angle
-            
-            # Vector from center to current position
-            dx = current_x - center_x
-            dy = current_y - center_y
-            
-            # Current angle in the circle
-            current_angle = math.atan2(dy, dx)
-            
-            # Normalize angle for progress calculation
-            if end_angle > start_angle:
-                while current_angle < start_angle:
-                    current_angle += 2 * math.pi
-                while current_angle > end_angle:
-                    current_angle -= 2 * math.pi
-            else:
-                while current_angle > start_angle:
-                    current_angle -= 2 * math.pi
-                while current_angle < end_angle:
-                    current_angle += 2 * math.pi
-            
-            # Calculate progress
-            self.path_progress = (current_angle - start_angle) / (end_angle - start_angle)
-            self.path_progress = max(0, min(1, self.path_progress))
-            
-            # Check if reached end of path
-            if abs(self.path_progress - 1.0) < 0.02:
-                self._advance_to_next_path()
+        if self.transition_mode == 'blend':
+            return self._update_blended_following(segment, current_x, current_y)
+        
+        # Check if reached end of path
+        if self._segment_end_due() and self.path_progress >= 0.98:
+            self._advance_to_next_path()
+            return True
+        
+        if not segment.is_line:
+            # Set wheel angles to follow the tangent direction of the curve
+            self.steer_toward(segment.direction_at(current_x, current_y))
+        
+        return True
+
+    def _update_blended_following(self, segment, current_x, current_y):
+        """
+        Blend mode update: switch segments on remaining arc length and steer
+        continuously through junctions instead of reconfiguring the wheels.
+        """
+        while self._segment_end_due() and (1 - self.path_progress) * segment.length <= self.switch_distance:
+            self._advance_to_next_path(reconfigure=False)
+            if self.current_path_index >= len(self.path_list):
+                self.route_distance = self.route.total_length
                 return True
-            
-            # Calculate tangent direction for curve
-            # The tangent is perpendicular to the radius vector
-            # For counter-clockwise movement: tangent = 90° clockwise from center angle
-            # For clockwise movement: tangent = 90° counter-clockwise from center angle
-            center_angle = math.degrees(math.atan2(dy, dx))
-            
-            # Determine if we're moving clockwise or counter-clockwise
-            is_clockwise = end_angle < start_angle
-            
-            if is_clockwise:
-                # For clockwise movement, tangent is -90° from center angle
-                tangent_angle = (center_angle - 90) % 360
-            else:
-                # For counter-clockwise movement, tangent is +90° from center angle
-                tangent_angle = (center_angle + 90) % 360
-            
-            # Set wheel angles to follow the tangent direction
-            self.set_all_wheel_angles(tangent_angle)
+            segment = self.segments[self.current_path_index]
+            self.path_progress = segment.progress_at(current_x, current_y)
+        
+        self.route_distance = self.route.distance_at_progress(self.current_path_index, self.path_progress)
         
+        # Steer along the segment, blending headings near the junctions and
+        # pulling back onto the path against the cross-track error
+        direction = segment.direction_at(current_x, current_y)
+        direction = self.route.blend_direction(self.current_path_index, self.path_progress,
+                                               direction, self.blend_distance)
+        direction += cross_track_correction(segment.cross_track_error(current_x, current_y), self.blend_distance)
+        self.steer_toward(direction)
+        
+        velocity = segment.path.velocity if segment.path.velocity is not None else 0.5
+        self.set_all_wheel_speeds(velocity)
         return True
 
-    def _advance_to_next_path(self):
+    def add_segment_listener(self, callback, lead_time=0.0):
+        """
+        Register a callback for segment events (see SegmentEventScheduler).
+        :param callback: Function called with a SegmentEvent
+        :param lead_time: Seconds before the predicted segment end for the 'approach' event
+        """
+        self.segment_events.add_listener(callback, lead_time)
+    
+    def remove_segment_listener(self, callback):
+        """Unregister a segment event callback."""
+        self.segment_events.remove_listener(callback)
+    
+    def _current_time(self):
+        """Simulated time with a fixed timestep, clock time otherwise."""
+        return self.sim_time if self.fixed_timestep is not None else self.clock()
+    
+    def _segment_end_due(self):
+        """
+        Check whether the end of the current segment can be near, firing the approach
+        events that are due. The end is predicted from the wheel speed when a segment
+        starts and re-predicted every update from the measured progress.
+        :return: True when the switch test should run this update
+        """
+        events = self.segment_events
+        now = self._current_time()
+        if events.segment_index != self.current_path_index:
+            segment = self.segments[self.current_path_index]
+            if self.transition_mode == 'blend':
+                switch_progress = 1 - self.switch_distance / segment.length if segment.length > 0 else 0
+            else:
+                switch_progress = 0.98
+            remaining = max(switch_progress - self.path_progress, 0) * segment.length
+            velocity = segment.path.velocity if segment.path.velocity is not None else 0.5
+            speed = min(abs(velocity), 1) * MOVEMENT_SPEED
+            events.schedule(self.current_path_index, now, now + remaining / speed if speed > 0 else None,
+                            self.path_progress, switch_progress)
+        return events.update(now, self.path_progress)
+    
+    def _advance_to_next_path(self, reconfigure=True):
         """
         Advance to the next path in the sequence and configure wheels accordingly.
+        :param reconfigure: Reset the wheels for the new path (False when blending)
         """
         self.current_path_index += 1
+        self.segment_events.crossed(self.current_path_index - 1, self._current_time())
         
         # Check if we're at the end of all paths
         if self.current_path_index >= len(self.path_list):
@@ -217,56 +273,99 @@ class RobotController:
         
         # Reset progress and configure wheels for the new path
         self.path_progress = 0
-        next_path = self.path_list[self.current_path_index]
-        self._configure_initial_wheels(next_path)
+        if reconfigure:
+            self._configure_initial_wheels(self.segments[self.current_path_index])
 
     def move_robot(self):
         """
         Moves the robot based on current wheel angles and speeds.
         If path following is active, updates the path following logic first.
+        With a fixed timestep this advances exactly one step regardless of the clock.
         """
         if not self.moving:
             return
         
+        if self.fixed_timestep is not None:
+            self.step()
+            return
+        
         # Calculate delta time
-        current_time = time.time()
+        current_time = self.clock()
         delta_time = current_time - self.last_update_time
         self.last_update_time = current_time
         
+        self._advance(delta_time, current_time)
+
+    def step(self, n=1):
+        """
+        Advance the simulation by n fixed timesteps, independent of the wall clock.
+        The same inputs always give the same trajectory.
+        :param n: Number of steps
+        :return: Number of steps taken (fewer than n if the robot stopped moving)
+        """
+        if self.fixed_timestep is None:
+            raise ValueError("step() requires a fixed_timestep")
+        
+        for taken in range(n):
+            if not self.moving:
+                return taken
+            self.sim_time += self.fixed_timestep
+            self._advance(self.fixed_timestep, self.sim_time)
+        return n
+
+    def _advance(self, delta_time, timestamp):
+        """
+        Run path following once and integrate the movement over delta_time.
+        :param delta_time: Time to advance in seconds
+        :param timestamp: Time recorded in telemetry for this update
+        """
+        telemetry = self.telemetry
+        if telemetry is not None:
+            tick_start = time.perf_counter()
+        
         # Update path following if active
         if self.path_list and self.current_path_index < len(self.path_list):
             self.update_path_following()
         
-        # ACTUAL PHYSICS-BASED MOVEMENT - pure wheel-based movement
-        # Calculate the resultant movement vector based on all wheels
-        dx = 0
-        dy = 0
+        # Wheel commands are held for the whole update; integrate in sub-steps
+        sub_dt = delta_time / self.substeps
+        for _ in range(self.substeps):
+            self._integrate(sub_dt)
         
-        # Process each wheel pair (orientation motor, speed motor)
-        for orientation_motor, position in self.wheel_positions.items():
-            speed_motor = orientation_motor + 1
-            angle_rad = math.radians(self.wheel_angles[orientation_motor])
-            speed = self.wheel_speeds[speed_motor]
-            
-            # Calculate this wheel's contribution to movement
-            wheel_dx = speed * math.cos(angle_rad)
-            wheel_dy = speed * math.sin(angle_rad)
-            
-            # Add to resultant movement
-            dx += wheel_dx
-            dy += wheel_dy
-        
-        # Average the movement contributions from all wheels
-        num_wheels = len(self.wheel_positions)
-        if num_wheels > 0:
-            dx /= num_wheels
-            dy /= num_wheels
-        
-        # Apply velocity scaling
-        movement_speed = 100  # Base speed factor
-        dx *= movement_speed * delta_time
-        dy *= movement_speed * delta_time
-        
-        # Update robot position
-        self.robot.x += dx
-        self.robot.y += dy
\ No newline at end of file
+        if telemetry is not None:
+            telemetry.record(timestamp, timestamp, self.robot.x, self.robot.y, self.robot.orientation,
+                             self.path_progress, self.current_path_index,
+                             self._telemetry_angles, self._telemetry_speeds,
+                             time.perf_counter() - tick_start)
+
+    def _integrate(self, delta_time):
+        """
+        Move the robot for delta_time with the current wheel angles and speeds.
+        The body twist is the least-squares fit of the four wheel velocities, so
+        differing wheel angles or speeds rotate the robot.
+        :param delta_time: Integration step in seconds
+        """
+        # Steering motors turn toward their targets at the limited rate
+        if self.max_steering_speed is not None:
+            max_step = self.max_steering_speed * delta_time
+            for wheel_id in WHEEL_IDS:
+                angle = step_toward_angle(self.wheel_angles[wheel_id], self.steering_targets[wheel_id], max_step)
+                self.wheel_angles[wheel_id] = angle
+                self.robot.set_wheel_angle(wheel_id, angle)
+        
+        for index, wheel_id in enumerate(WHEEL_IDS):
+            self._telemetry_angles[index] = self.wheel_angles[wheel_id]
+            self._telemetry_speeds[index] = self.wheel_speeds[wheel_id + 1] * self.wheel_directions[wheel_id]
+        
+        # Wheel angles are relative to the robot body
+        vx, vy, omega = self.kinematics.forward(self._telemetry_angles,
+                                                [speed * MOVEMENT_SPEED for speed in self._telemetry_speeds])
+        
+        # Rotate the body velocity into the world at the orientation at the middle of the step
+        half_turn = math.degrees(float(omega)) * delta_time / 2
+        world_vx, world_vy = body_to_world(float(vx), float(vy), self.robot.orientation + half_turn)
+        
+        # Update robot pose
+        self.robot.x += float(world_vx) * delta_time
+        self.robot.y += float(world_vy) * delta_time
+        self.robot.orientation = (self.robot.orientation + 2 * half_turn) % 360
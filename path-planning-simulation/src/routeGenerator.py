@@ -0,0 +1,241 @@
+import json
+import math
+import random
+from path import Path
+
+# Default area routes are generated in (the demo window size)
+WIDTH, HEIGHT = 800, 600
+
+
+def generate_u_shaped_path(center_x, center_y, radius=200, straight_length=200, velocity=1.0):
+    """
+    Generate a U-shaped path with three segments: line down, curve, line up.
+    Starting from top right going counter-clockwise.
+    
+    Args:
+        center_x: Center X coordinate for the path
+        center_y: Center Y coordinate for the path
+        radius: Radius of the curve part
+        straight_length: Length of straight segments
+        velocity: Speed for all path segments
+    
+    Returns:
+        Tuple of (path_list, path_points, segment_points, control_points, curve_center)
+    """
+    # Define three parts of the U-shaped path (starting from top right)
+    # 1. First straight line (top right going down)
+    line1_start = (center_x + radius, center_y - straight_length)
+    line1_end = (center_x + radius, center_y)
+
+    # 2. Curve at the bottom (half circle) - going from right to left
+    curve_center = (center_x, center_y)
+    start_angle = 0         # Starting from right (0 radians, 0 degrees)
+    end_angle = math.pi     # Ending left (π radians, 180 degrees)
+
+    # 3. Second straight line (going back up left)
+    line2_start = (center_x - radius, center_y)
+    line2_end = (center_x - radius, center_y - straight_length)
+
+    # Create path objects with velocities
+    line1_path = Path('line', start_point=line1_start, end_point=line1_end, velocity=velocity)
+    curve_path = Path('curve', circle_center=curve_center, radius=radius, 
+                      start_angle=start_angle, end_angle=end_angle, velocity=velocity)
+    line2_path = Path('line', start_point=line2_start, end_point=line2_end, velocity=velocity)
+
+    # Combine paths in order
+    path_list = [line1_path, curve_path, line2_path]
+
+    # Generate points for visualization
+    line1_points = line1_path.generate_path(50)
+    curve_points = curve_path.generate_path(100)
+    line2_points = line2_path.generate_path(50)
+
+    # Combine all path points for drawing
+    path_points = line1_points + curve_points + line2_points
+    segment_points = [line1_points, curve_points, line2_points]
+    
+    # Store control points for visualization
+    control_points = [line1_start, line1_end, line2_start, line2_end]
+    
+    return path_list, path_points, segment_points, control_points, curve_center
+
+
+def generate_random_path(num_segments=5, margin=100, min_velocity=0.3, max_velocity=1.0,
+                         width=WIDTH, height=HEIGHT, rng=random):
+    """
+    Generate a random path with specified number of segments that are properly connected.
+    
+    Args:
+        num_segments: Number of path segments to create
+        margin: Margin from screen edges
+        min_velocity: Minimum velocity for path segments
+        max_velocity: Maximum velocity for path segments
+        width: Width of the area the path stays in
+        height: Height of the area the path stays in
+        rng: Random number source, e.g. random.Random(seed) for a reproducible path
+    
+    Returns:
+        Tuple of (path_list, control_points, segment_points)
+    """
+    path_list = []
+    segment_points = []
+    
+    # Generate first control point
+    start_x = rng.randint(margin, width - margin)
+    start_y = rng.randint(margin, height - margin)
+    current_point = (start_x, start_y)
+    
+    # List to store all control points (including intermediate ones for visualization)
+    control_points = [current_point]
+    
+    for i in range(num_segments):
+        # Randomly choose between line and curve
+        if rng.random() < 0.6:  # 60% chance for line
+            # Generate end point for this line segment
+            end_x = rng.randint(margin, width - margin)
+            end_y = rng.randint(margin, height - margin)
+            end_point = (end_x, end_y)
+            
+            # Create line segment
+            velocity = rng.uniform(min_velocity, max_velocity)
+            line_path = Path('line', start_point=current_point, end_point=end_point, 
+                           velocity=velocity)
+            path_list.append(line_path)
+            
+            # Generate points for visualization
+            line_points = line_path.generate_path(50)
+            segment_points.append(line_points)
+            
+            # Update current point for next segment
+            current_point = end_point
+            control_points.append(current_point)
+            
+        else:  # 40% chance for curve
+            # Generate end point for this curve segment
+            end_x = rng.randint(margin, width - margin)
+            end_y = rng.randint(margin, height - margin)
+            end_point = (end_x, end_y)
+            
+            # Calculate a reasonable center point for the curve that connects current_point to end_point
+            # First find the midpoint between current and end
+            mid_x = (current_point[0] + end_point[0]) / 2
+            mid_y = (current_point[1] + end_point[1]) / 2
+            
+            # Add some perpendicular offset from the midpoint to create a curved path
+            # Calculate the direction vector from current to end
+            dx = end_point[0] - current_point[0]
+            dy = end_point[1] - current_point[1]
+            
+            # Calculate perpendicular direction (rotate 90 degrees)
+            perpendicular_x = -dy
+            perpendicular_y = dx
+            
+            # Normalize and scale
+            length = math.sqrt(perpendicular_x**2 + perpendicular_y**2)
+            if length > 0:
+                perpendicular_x /= length
+                perpendicular_y /= length
+            
+            # Apply random offset in perpendicular direction
+            offset = rng.randint(50, 150) * (1 if rng.random() < 0.5 else -1)
+            center_x = mid_x + perpendicular_x * offset
+            center_y = mid_y + perpendicular_y * offset
+            
+            # Calculate radius based on distances
+            radius = math.sqrt((center_x - current_point[0])**2 + (center_y - current_point[1])**2)
+            
+            # Calculate angles from center to start and end points
+            start_angle = math.atan2(current_point[1] - center_y, current_point[0] - center_x)
+            end_angle = math.atan2(end_point[1] - center_y, end_point[0] - center_x)
+            
+            # Create curve segment
+            velocity = rng.uniform(min_velocity, max_velocity)
+            curve_path = Path('curve', circle_center=(center_x, center_y), radius=radius,
+                             start_angle=start_angle, end_angle=end_angle, 
+                             velocity=velocity)
+            path_list.append(curve_path)
+            
+            # Generate points for visualization
+            curve_points = curve_path.generate_path(50)
+            segment_points.append(curve_points)
+            
+            # Add the circle center to control points for visualization
+            control_points.append((center_x, center_y))
+            
+            # Update current point for next segment
+            current_point = end_point
+            control_points.append(current_point)
+    
+    return path_list, control_points, segment_points
+
+
+def path_to_dict(path):
+    """
+    Convert a Path object into a JSON-serializable dictionary.
+    
+    Args:
+        path: Path object
+    
+    Returns:
+        Dictionary with the path type, geometry and velocity
+    """
+    if path.path_type == 'line':
+        data = {'type': 'line', 'start_point': list(path.start_point), 'end_point': list(path.end_point)}
+    else:
+        data = {'type': 'curve', 'circle_center': list(path.circle_center), 'radius': path.radius,
+                'start_angle': path.start_angle, 'end_angle': path.end_angle}
+    if path.velocity is not None:
+        data['velocity'] = path.velocity
+    return data
+
+
+def path_from_dict(data):
+    """
+    Create a Path object from a dictionary made by path_to_dict.
+    
+    Args:
+        data: Dictionary with the path type, geometry and optional velocity
+    
+    Returns:
+        Path object
+    """
+    if data['type'] == 'line':
+        return Path('line', start_point=tuple(data['start_point']), end_point=tuple(data['end_point']),
+                    velocity=data.get('velocity'))
+    if data['type'] == 'curve':
+        return Path('curve', circle_center=tuple(data['circle_center']), radius=data['radius'],
+                    start_angle=data['start_angle'], end_angle=data['end_angle'],
+                    velocity=data.get('velocity'))
+    raise ValueError(f"Unknown path type: {data['type']}")
+
+
+def save_routes(filename, routes):
+    """
+    Save routes to a JSON route file.
+    
+    Args:
+        filename: Output file path
+        routes: List of routes, each a list of Path objects
+    """
+    with open(filename, 'w') as f:
+        json.dump([[path_to_dict(path) for path in route] for route in routes], f, indent=2)
+
+
+def load_routes(filename):
+    """
+    Load routes from a JSON route file.
+    
+    The file holds a list of routes, each a list of path dictionaries
+    (see path_to_dict). A file with a single route may hold just its list of paths.
+    
+    Args:
+        filename: Route file path
+    
+    Returns:
+        List of routes, each a list of Path objects
+    """
+    with open(filename) as f:
+        data = json.load(f)
+    if data and isinstance(data[0], dict):
+        data = [data]
+    return [[path_from_dict(item) for item in route] for route in data]
@@ -0,0 +1,207 @@
+import math
+from bisect import bisect_right
+
+
+class RouteTable:
+    """
+    Arc-length table of a whole route built from CompiledSegment records.
+
+    Each segment gets the route distance at which it starts, so any route distance
+    can be mapped back to a segment and a point in O(log n) without sampling.
+    """
+
+    def __init__(self, segments):
+        """
+        Build the table.
+
+        Args:
+            segments: List of CompiledSegment records in route order
+        """
+        self.segments = segments
+        self.segment_starts = []
+        total = 0.0
+        for segment in segments:
+            self.segment_starts.append(total)
+            total += segment.length
+        self.total_length = total
+
+    def locate(self, distance):
+        """
+        Find the segment containing a route distance.
+
+        Args:
+            distance: Distance along the route (clamped to the route)
+
+        Returns:
+            Tuple (segment_index, distance_within_segment)
+        """
+        if not self.segments:
+            return 0, 0.0
+        distance = max(0.0, min(self.total_length, distance))
+        index = max(0, bisect_right(self.segment_starts, distance) - 1)
+        # Skip zero length segments at the same offset
+        while index > 0 and self.segments[index].length == 0 and distance <= self.segment_starts[index]:
+            index -= 1
+        return index, distance - self.segment_starts[index]
+
+    def point_at(self, distance):
+        """
+        Point on the route at a given distance from the route start.
+
+        Args:
+            distance: Distance along the route
+
+        Returns:
+            (x, y) point
+        """
+        index, local = self.locate(distance)
+        return self.segments[index].point_at_distance(local)
+
+    def heading_at(self, distance):
+        """
+        Direction of travel at a given distance from the route start.
+
+        Args:
+            distance: Distance along the route
+
+        Returns:
+            Direction angle in degrees (0-360)
+        """
+        index, local = self.locate(distance)
+        return self.segments[index].heading_at_distance(local)
+
+    def project(self, segment_index, x, y):
+        """
+        Project a position onto a segment of the route.
+
+        Args:
+            segment_index: Index of the segment being followed
+            x: Position x
+            y: Position y
+
+        Returns:
+            Tuple (route_distance, cross_track_error, tangent_heading_degrees)
+        """
+        segment = self.segments[segment_index]
+        local = segment.progress_at(x, y) * segment.length
+        return (self.segment_starts[segment_index] + local,
+                segment.cross_track_error(x, y),
+                segment.heading_at_distance(local))
+
+    def turn_angle(self, segment_index):
+        """
+        Heading change at the junction after a segment.
+
+        Args:
+            segment_index: Index of the segment before the junction
+
+        Returns:
+            Signed turn in degrees (-180 to 180), 0 after the last segment
+        """
+        if segment_index + 1 >= len(self.segments):
+            return 0.0
+        return wrap_angle(self.segments[segment_index + 1].start_heading - self.segments[segment_index].end_heading)
+
+    def blend_direction(self, segment_index, progress, direction, blend_distance, max_turn=90.0):
+        """
+        Blend the direction of travel across the junctions of a segment.
+
+        Within blend_distance of the end of the segment the direction is steered
+        toward the next segment's start heading, reaching the halfway heading at
+        the junction. Within blend_distance of the start it eases out of the
+        previous segment's end heading, so the heading is continuous through
+        the junction. Junctions turning more than max_turn are not blended, as
+        cutting them would take the robot far off the path.
+
+        Args:
+            segment_index: Index of the segment being followed
+            progress: Progress along that segment (0 to 1)
+            direction: Direction of travel on the segment in degrees
+            blend_distance: Distance on each side of a junction over which to blend
+            max_turn: Largest heading change in degrees at a blended junction
+
+        Returns:
+            Blended direction in degrees (0-360)
+        """
+        if blend_distance <= 0:
+            return direction
+
+        segment = self.segments[segment_index]
+        travelled = progress * segment.length
+        distance_to_go = segment.length - travelled
+
+        if (segment_index + 1 < len(self.segments) and distance_to_go < blend_distance
+                and abs(self.turn_angle(segment_index)) <= max_turn):
+            other_heading = self.segments[segment_index + 1].start_heading
+            weight = 0.5 * (1 - distance_to_go / blend_distance)
+        elif segment_index > 0 and travelled < blend_distance and abs(self.turn_angle(segment_index - 1)) <= max_turn:
+            other_heading = self.segments[segment_index - 1].end_heading
+            weight = 0.5 * (1 - travelled / blend_distance)
+        else:
+            return direction
+
+        return (direction + weight * wrap_angle(other_heading - direction)) % 360
+
+    def find_nearest(self, x, y):
+        """
+        Find the segment closest to a position.
+
+        Args:
+            x: Position x
+            y: Position y
+
+        Returns:
+            Tuple (segment_index, progress_within_segment), or (0, 0.0) for an empty route
+        """
+        best_index, best_progress, best_distance = 0, 0.0, float('inf')
+        for index, segment in enumerate(self.segments):
+            progress = segment.progress_at(x, y)
+            px, py = segment.point_at_distance(progress * segment.length)
+            distance = (px - x)**2 + (py - y)**2
+            # Strictly closer only, so the earlier segment wins at a junction
+            if distance < best_distance:
+                best_index, best_progress, best_distance = index, progress, distance
+        return best_index, best_progress
+
+    def distance_at_progress(self, segment_index, progress):
+        """
+        Route distance of a point given by segment index and progress.
+
+        Args:
+            segment_index: Segment index
+            progress: Progress along the segment (0 to 1)
+
+        Returns:
+            Distance along the route
+        """
+        if segment_index >= len(self.segments):
+            return self.total_length
+        return self.segment_starts[segment_index] + progress * self.segments[segment_index].length
+
+
+def wrap_angle(angle):
+    """
+    Wrap an angle in degrees to the range [-180, 180).
+
+    Args:
+        angle: Angle in degrees
+
+    Returns:
+        Wrapped angle in degrees
+    """
+    return (angle + 180) % 360 - 180
+
+
+def cross_track_correction(cross_track_error, approach_distance):
+    """
+    Steering correction back onto a path, aiming at the path approach_distance ahead.
+
+    Args:
+        cross_track_error: Signed distance from the path, positive to the left of the
+                           direction of travel (as CompiledSegment.cross_track_error)
+        approach_distance: Distance along the path over which the error is closed
+
+    Returns:
+        Correction in degrees to add to the direction of travel (-90 to 90)
+    """
+    return -math.degrees(math.atan2(cross_track_error, approach_distance))
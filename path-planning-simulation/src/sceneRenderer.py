@@ -0,0 +1,115 @@
+import numpy as np
+import pygame
+
+
+def decimate_polyline(points):
+    """
+    Reduce a polyline to screen resolution: consecutive points that fall into the
+    same pixel are dropped, keeping the first and last point.
+
+    Args:
+        points: (N, 2) array-like of x, y coordinates
+
+    Returns:
+        (M, 2) array of the kept points
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) <= 2:
+        return points
+    pixels = np.floor(points)
+    keep = np.empty(len(points), dtype=bool)
+    keep[0] = True
+    keep[1:] = np.any(pixels[1:] != pixels[:-1], axis=1)
+    keep[-1] = True
+    return points[keep]
+
+
+def draw_polyline(surface, color, points, width=1, antialias=False):
+    """
+    Draw a sampled path as one polyline, decimated to screen resolution first so the
+    cost follows the pixels covered rather than the number of samples.
+
+    Args:
+        surface: Pygame surface to draw on
+        color: Line color
+        points: (N, 2) array-like of x, y coordinates
+        width: Line width in pixels (antialiased lines are always 1 pixel wide)
+        antialias: Draw with pygame.draw.aalines
+
+    Returns:
+        Rect covering the line, or None when there was nothing to draw
+    """
+    points = decimate_polyline(points)
+    if len(points) == 0:
+        return None
+    if len(points) == 1:
+        return pygame.draw.circle(surface, color, points[0], max(width // 2, 1))
+    if antialias:
+        return pygame.draw.aalines(surface, color, False, points)
+    return pygame.draw.lines(surface, color, False, points, width)
+
+
+class SceneRenderer:
+    """
+    Draws a scene as a cached static background plus a moving foreground.
+
+    The static content (routes, wheel paths, legends, instructions) is drawn once into
+    a background surface and only redrawn after invalidate(), e.g. when the plan changes.
+    Each frame, the rectangles the foreground covered in the previous frame are restored
+    from the background, the foreground is drawn, and only those rectangles and the new
+    ones are sent to the display.
+    """
+
+    def __init__(self, screen, draw_background, fill_color=(255, 255, 255)):
+        """
+        Args:
+            screen: Surface to render to (normally the display surface)
+            draw_background: Function drawing the static content onto a surface
+            fill_color: Background color under the static content
+        """
+        self.screen = screen
+        self.draw_background = draw_background
+        self.fill_color = fill_color
+        self.background = None
+        self._previous_rects = []
+
+    def invalidate(self):
+        """
+        Redraw the static background on the next frame.
+        """
+        self.background = None
+
+    def _rebuild(self):
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(self.fill_color)
+        self.draw_background(background)
+        self.background = background
+
+    def render(self, draw_foreground):
+        """
+        Render one frame and update the changed parts of the display.
+
+        Args:
+            draw_foreground: Function drawing the moving content onto the screen and
+                             returning the list of rectangles it drew into
+
+        Returns:
+            List of rectangles that changed this frame
+        """
+        screen = self.screen
+        full_redraw = self.background is None
+        if full_redraw:
+            self._rebuild()
+            screen.blit(self.background, (0, 0))
+        else:
+            # Erase the previous foreground
+            for rect in self._previous_rects:
+                screen.blit(self.background, rect, rect)
+
+        rects = [pygame.Rect(rect) for rect in draw_foreground(screen) or [] if rect is not None]
+        dirty_rects = [screen.get_rect()] if full_redraw else self._previous_rects + rects
+        self._previous_rects = rects
+
+        if screen is pygame.display.get_surface():
+            pygame.display.update(dirty_rects)
+        return dirty_rects
@@ -0,0 +1,153 @@
+from collections import namedtuple
+
+# kind is 'approach' (lead_time before the predicted end of segment_index) or
+# 'transition' (segment_index has just been completed)
+SegmentEvent = namedtuple('SegmentEvent', ['kind', 'segment_index', 'time', 'predicted_time'])
+
+
+class SegmentEventScheduler:
+    """
+    Predicted segment boundary crossings with listener callbacks.
+
+    The controller schedules the predicted time at which the current segment will be
+    completed, then calls update() with the measured progress every tick. update()
+    re-predicts the crossing from the progress rate measured since scheduling, fires
+    the 'approach' events that are due and tells the controller whether to test for
+    the crossing: from check_window (or check_fraction of the time left at scheduling,
+    if larger) before the predicted time onward, and always once the measured progress
+    has reached the switch point, so a robot running ahead of the prediction is never
+    held on a segment. Without a prediction the crossing is tested every tick.
+    crossed() fires the 'transition' events once the controller has switched segments.
+    """
+
+    def __init__(self, check_window=0.25, check_fraction=0.2):
+        """
+        Args:
+            check_window: Seconds before the predicted crossing from which it is tested
+            check_fraction: Fraction of the time left at scheduling from which it is tested,
+                            when that is earlier (allows for prediction errors on long segments)
+        """
+        self.check_window = check_window
+        self.check_fraction = check_fraction
+        self._listeners = []  # (callback, lead_time) pairs
+
+        self.segment_index = None  # Segment the prediction was made for
+        self.predicted_time = None  # Predicted time of its end, None when unknown
+        self.switch_progress = 1.0  # Segment progress at which the segment is completed
+        self._margin = 0.0  # Time before the predicted crossing from which it is tested
+        self._start = None  # (time, progress) at scheduling, for the measured progress rate
+        self._approaches = []  # (lead_time, callback) not yet fired for this segment, earliest first
+
+    def reset(self):
+        """
+        Drop the current prediction, e.g. when following restarts.
+        """
+        self.segment_index = None
+        self.predicted_time = None
+        self.switch_progress = 1.0
+        self._start = None
+        self._approaches = []
+
+    def add_listener(self, callback, lead_time=0.0):
+        """
+        Register a callback for segment events.
+
+        Args:
+            callback: Function called with a SegmentEvent
+            lead_time: Seconds before the predicted end of a segment at which the
+                       'approach' event is sent (e.g. for pre-steering)
+        """
+        self._listeners.append((callback, lead_time))
+        if self.predicted_time is not None:
+            self._approaches.append((lead_time, callback))
+            self._approaches.sort(key=lambda approach: -approach[0])
+
+    def remove_listener(self, callback):
+        """
+        Unregister a callback.
+
+        Args:
+            callback: Function passed to add_listener
+        """
+        self._listeners = [(cb, lead) for cb, lead in self._listeners if cb is not callback]
+        self._approaches = [(lead, cb) for lead, cb in self._approaches if cb is not callback]
+
+    def schedule(self, segment_index, now, predicted_time=None, progress=0.0, switch_progress=1.0):
+        """
+        Set the predicted end of the current segment.
+
+        Args:
+            segment_index: Index of the current segment
+            now: Current time in seconds
+            predicted_time: Predicted time of the segment's end (None when unknown)
+            progress: Measured progress along the segment (0 to 1)
+            switch_progress: Progress along the segment at which it is completed
+        """
+        self.segment_index = segment_index
+        self.predicted_time = predicted_time
+        self.switch_progress = switch_progress
+        if predicted_time is None:
+            self._start = None
+            self._approaches = []
+            return
+
+        self._margin = max(self.check_window, self.check_fraction * (predicted_time - now))
+        self._start = (now, progress)
+        self._approaches = sorted(((lead_time, callback) for callback, lead_time in self._listeners),
+                                  key=lambda approach: -approach[0])
+
+    def update(self, now, progress=None):
+        """
+        Re-predict the crossing from the measured progress and fire the approach
+        events that are due.
+
+        Args:
+            now: Current time in seconds
+            progress: Measured progress along the segment (0 to 1), None when unknown
+
+        Returns:
+            True when the controller should test for the segment's end this tick
+        """
+        if self.predicted_time is None:
+            return True
+        if progress is not None:
+            if progress >= self.switch_progress:
+                self.predicted_time = min(self.predicted_time, now)
+            else:
+                start_time, start_progress = self._start
+                if progress > start_progress and now > start_time:
+                    rate = (progress - start_progress) / (now - start_time)
+                    self.predicted_time = now + (self.switch_progress - progress) / rate
+
+        approaches = self._approaches
+        while approaches and self.predicted_time - approaches[0][0] <= now:
+            _, callback = approaches.pop(0)
+            self._notify(callback, SegmentEvent('approach', self.segment_index, now, self.predicted_time))
+        return now >= self.predicted_time - self._margin
+
+    def crossed(self, segment_index, now):
+        """
+        Report that a segment has been completed and fire the transition events.
+
+        Args:
+            segment_index: Index of the completed segment
+            now: Current time in seconds
+        """
+        predicted_time = self.predicted_time if segment_index == self.segment_index else None
+
+        # Approaches that were not due yet are sent now, so each listener sees both events
+        approaches = self._approaches
+        self._approaches = []
+        for _, callback in approaches:
+            self._notify(callback, SegmentEvent('approach', segment_index, now, predicted_time))
+
+        self.reset()
+        for callback, _ in self._listeners:
+            self._notify(callback, SegmentEvent('transition', segment_index, now, predicted_time))
+
+    @staticmethod
+    def _notify(callback, event):
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"Error in segment {event.kind} callback: {e}")
@@ -0,0 +1,272 @@
+import math
+import numpy as np
+
+TWO_PI = 2 * math.pi
+
+# Segment table column layout (one row per path segment)
+SEG_TYPE, SEG_SX, SEG_SY, SEG_UX, SEG_UY, SEG_LENGTH, SEG_HEADING, SEG_CX, SEG_CY, SEG_A0, SEG_A1 = range(11)
+SEG_COLUMNS = 11
+LINE, CURVE = 0, 1
+
+
+class CompiledSegment:
+    """
+    Precomputed geometric constants of one Path segment.
+
+    Everything that depends only on the segment (length, unit direction, heading,
+    arc direction and angular span) is computed once when the paths are set, so the
+    per-tick projection only does the position-dependent part.
+    """
+
+    __slots__ = (
+        'path', 'path_type', 'is_line', 'length',
+        'start_x', 'start_y', 'end_x', 'end_y',
+        'unit_x', 'unit_y', 'inv_length', 'heading',
+        'center_x', 'center_y', 'radius', 'start_angle', 'end_angle',
+        'arc_sign', 'angular_span', 'inv_span', 'tangent_offset',
+        'start_heading', 'end_heading',
+    )
+
+    def __init__(self, path):
+        """
+        Compile a Path object.
+
+        Args:
+            path: Path object ('line' or 'curve')
+        """
+        self.path = path
+        self.path_type = path.path_type
+        self.is_line = path.path_type == 'line'
+
+        if self.is_line:
+            self.start_x, self.start_y = path.start_point
+            self.end_x, self.end_y = path.end_point
+            dx = self.end_x - self.start_x
+            dy = self.end_y - self.start_y
+            self.length = math.sqrt(dx**2 + dy**2)
+
+            # Unit direction, pre-divided by the length so progress is a single dot product
+            if self.length > 0:
+                self.unit_x = dx / self.length
+                self.unit_y = dy / self.length
+                self.inv_length = 1.0 / self.length
+            else:
+                self.unit_x = self.unit_y = self.inv_length = 0.0
+
+            self.heading = math.degrees(math.atan2(dy, dx)) % 360
+            self.start_heading = self.end_heading = self.heading
+
+            self.center_x = self.center_y = self.radius = 0.0
+            self.start_angle = self.end_angle = 0.0
+            self.arc_sign = 0
+            self.angular_span = self.inv_span = 0.0
+            self.tangent_offset = 0.0
+
+        else:  # curve
+            self.center_x, self.center_y = path.circle_center
+            self.radius = path.radius
+            self.start_angle = path.start_angle
+            self.end_angle = path.end_angle
+
+            # +1 when the angle increases along the arc, -1 when it decreases
+            self.angular_span = self.end_angle - self.start_angle
+            self.arc_sign = 1 if self.angular_span >= 0 else -1
+            self.inv_span = 1.0 / self.angular_span if self.angular_span != 0 else 0.0
+            self.length = abs(self.angular_span) * self.radius
+
+            # Tangent is +90° from the center angle for increasing angles, -90° otherwise
+            self.tangent_offset = 90.0 * self.arc_sign
+            self.start_heading = (math.degrees(self.start_angle) + self.tangent_offset) % 360
+            self.end_heading = (math.degrees(self.end_angle) + self.tangent_offset) % 360
+
+            self.start_x = self.center_x + self.radius * math.cos(self.start_angle)
+            self.start_y = self.center_y + self.radius * math.sin(self.start_angle)
+            self.end_x = self.center_x + self.radius * math.cos(self.end_angle)
+            self.end_y = self.center_y + self.radius * math.sin(self.end_angle)
+
+            self.unit_x = self.unit_y = self.inv_length = 0.0
+            self.heading = self.start_heading
+
+    def unwrap_angle(self, angle):
+        """
+        Bring an angle around the curve center into the arc's parameter range.
+        Angles outside the arc are assigned to the nearer end, so a position just
+        past the end of the arc does not wrap around to its start.
+
+        Args:
+            angle: Angle in radians from atan2
+
+        Returns:
+            Equivalent angle measured from start_angle in the direction of travel
+        """
+        # Angle travelled from the start, 0 to 2*pi
+        offset = ((angle - self.start_angle) * self.arc_sign) % TWO_PI
+        if offset > abs(self.angular_span) and TWO_PI - offset < offset - abs(self.angular_span):
+            offset -= TWO_PI  # Before the start
+        return self.start_angle + self.arc_sign * offset
+
+    def progress_at(self, x, y):
+        """
+        Project a position onto the segment.
+
+        Args:
+            x: Position x
+            y: Position y
+
+        Returns:
+            Progress along the segment, clamped to 0..1
+        """
+        if self.is_line:
+            t = ((x - self.start_x) * self.unit_x + (y - self.start_y) * self.unit_y) * self.inv_length
+        else:
+            angle = self.unwrap_angle(math.atan2(y - self.center_y, x - self.center_x))
+            t = (angle - self.start_angle) * self.inv_span
+        return max(0, min(1, t))
+
+    def direction_at(self, x, y):
+        """
+        Direction of motion along the segment at the given position.
+
+        Args:
+            x: Position x
+            y: Position y
+
+        Returns:
+            Direction angle in degrees (0-360)
+        """
+        if self.is_line:
+            return self.heading
+        center_angle = math.degrees(math.atan2(y - self.center_y, x - self.center_x))
+        return (center_angle + self.tangent_offset) % 360
+
+    def point_at_distance(self, distance):
+        """
+        Point on the segment at a given arc length from its start.
+
+        Args:
+            distance: Arc length from the segment start (clamped to the segment)
+
+        Returns:
+            (x, y) point
+        """
+        distance = max(0.0, min(self.length, distance))
+        if self.is_line:
+            return (self.start_x + self.unit_x * distance, self.start_y + self.unit_y * distance)
+        angle = self.start_angle + self.arc_sign * distance / self.radius if self.radius else self.start_angle
+        return (self.center_x + self.radius * math.cos(angle), self.center_y + self.radius * math.sin(angle))
+
+    def heading_at_distance(self, distance):
+        """
+        Direction of travel at a given arc length from the segment start.
+
+        Args:
+            distance: Arc length from the segment start (clamped to the segment)
+
+        Returns:
+            Direction angle in degrees (0-360)
+        """
+        if self.is_line:
+            return self.heading
+        distance = max(0.0, min(self.length, distance))
+        angle = self.start_angle + self.arc_sign * distance / self.radius if self.radius else self.start_angle
+        return (math.degrees(angle) + self.tangent_offset) % 360
+
+    def cross_track_error(self, x, y):
+        """
+        Signed distance from the segment's line or circle.
+
+        Args:
+            x: Position x
+            y: Position y
+
+        Returns:
+            Distance, positive when the position is to the left of the direction of travel
+            (rotated +90° in the atan2 angle convention)
+        """
+        if self.is_line:
+            return self.unit_x * (y - self.start_y) - self.unit_y * (x - self.start_x)
+        distance = math.sqrt((x - self.center_x)**2 + (y - self.center_y)**2)
+        return self.arc_sign * (self.radius - distance)
+
+
+def compile_segments(path_list):
+    """
+    Compile a list of Path objects into CompiledSegment records.
+
+    Args:
+        path_list: List of Path objects
+
+    Returns:
+        List of CompiledSegment, one per path
+    """
+    return [CompiledSegment(path) for path in path_list]
+
+
+def build_segment_table(path_list):
+    """
+    Convert Path objects into rows of a segment table.
+
+    Args:
+        path_list: List of Path objects
+
+    Returns:
+        numpy array of shape (len(path_list), SEG_COLUMNS)
+    """
+    table = np.zeros((len(path_list), SEG_COLUMNS))
+    for row, segment in zip(table, compile_segments(path_list)):
+        row[SEG_TYPE] = LINE if segment.is_line else CURVE
+        row[SEG_SX], row[SEG_SY] = segment.start_x, segment.start_y
+        row[SEG_UX], row[SEG_UY] = segment.unit_x, segment.unit_y
+        row[SEG_LENGTH] = segment.length
+        row[SEG_HEADING] = segment.heading
+        row[SEG_CX], row[SEG_CY] = segment.center_x, segment.center_y
+        row[SEG_A0], row[SEG_A1] = segment.start_angle, segment.end_angle
+    return table
+
+
+def project_onto_segments(seg, x, y):
+    """
+    Project many positions onto their segments at once.
+
+    Args:
+        seg: (n, SEG_COLUMNS) segment table rows, one per position
+        x: (n,) position x
+        y: (n,) position y
+
+    Returns:
+        Tuple of (n,) arrays (progress clamped to 0..1, direction of motion in degrees,
+        cross-track error, positive to the left of the direction of travel)
+    """
+    is_line = seg[:, SEG_TYPE] == LINE
+
+    # Line projection: distance along the unit direction over the segment length
+    length = np.where(seg[:, SEG_LENGTH] > 0, seg[:, SEG_LENGTH], 1.0)
+    t_line = ((x - seg[:, SEG_SX]) * seg[:, SEG_UX] + (y - seg[:, SEG_SY]) * seg[:, SEG_UY]) / length
+
+    # Curve projection: angle travelled around the center from the start, with angles
+    # outside the arc assigned to the nearer end
+    start_angle = seg[:, SEG_A0]
+    end_angle = seg[:, SEG_A1]
+    current_angle = np.arctan2(y - seg[:, SEG_CY], x - seg[:, SEG_CX])
+    counter_clockwise = end_angle > start_angle
+    arc_sign = np.where(counter_clockwise, 1.0, -1.0)
+    abs_span = np.abs(end_angle - start_angle)
+    offset = np.mod((current_angle - start_angle) * arc_sign, 2 * math.pi)
+    before_start = (offset > abs_span) & (2 * math.pi - offset < offset - abs_span)
+    offset = np.where(before_start, offset - 2 * math.pi, offset)
+    t_curve = offset / np.where(abs_span > 0, abs_span, 1.0)
+
+    progress = np.clip(np.where(is_line, t_line, t_curve), 0, 1)
+
+    # Direction of motion: segment heading for lines, tangent for curves
+    center_angle = np.degrees(current_angle)
+    tangent = np.where(counter_clockwise, center_angle + 90, center_angle - 90)
+    direction = np.where(is_line, seg[:, SEG_HEADING], tangent)
+
+    # Cross-track error: signed offset from the line, or from the circle through the start point
+    line_error = seg[:, SEG_UX] * (y - seg[:, SEG_SY]) - seg[:, SEG_UY] * (x - seg[:, SEG_SX])
+    radius = np.hypot(seg[:, SEG_SX] - seg[:, SEG_CX], seg[:, SEG_SY] - seg[:, SEG_CY])
+    curve_error = np.where(counter_clockwise, 1.0, -1.0) * (radius - np.hypot(x - seg[:, SEG_CX], y - seg[:, SEG_CY]))
+    cross_track_error = np.where(is_line, line_error, curve_error)
+
+    return progress, direction, cross_track_error
@@ -0,0 +1,193 @@
+import io
+import math
+import time
+from contextlib import redirect_stdout
+from robot import Robot
+from robotController import RobotController
+from pathHandler import PathHandler
+
+SATURATION_LEVEL = 0.999  # Wheel speed command counted as saturated
+
+
+class VirtualClock:
+    """
+    Simulated time source. Callable like time.monotonic, but only moves when advanced.
+    """
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        """
+        Move the clock forward.
+
+        Args:
+            dt: Time step in seconds
+
+        Returns:
+            The new time
+        """
+        self.now += dt
+        return self.now
+
+
+class SimulatedMotors:
+    """
+    In-process motor backend: passes PathHandler's motor commands to a RobotController
+    instead of writing them to Redis. Same interface as the wheelControl module.
+    """
+
+    def __init__(self, controller):
+        """
+        Args:
+            controller: RobotController whose wheels receive the commands
+        """
+        self.controller = controller
+
+    def set_wheel_angle(self, wheel_id, angle, namespace=None):
+        self.controller.set_wheel_angle(wheel_id, angle)
+
+    def set_wheel_speed(self, wheel_id, speed, namespace=None):
+        self.controller.set_wheel_speed(wheel_id, speed)
+
+
+class SimulationHarness:
+    """
+    Runs PathHandler headless in closed loop with the RobotController kinematics.
+
+    Each control tick publishes the simulated robot pose to the handler, runs one
+    handler tick, advances the virtual clock by the control interval and moves the
+    robot one fixed timestep with RobotController.step. No Redis, display or
+    sleeping is involved, so a route runs as fast as the CPU allows.
+    """
+
+    def __init__(self, path_list, robot_width=120, robot_height=120, initial_orientation=0,
+                 final_orientation=0, base_speed=0.5, control_frequency=100, substeps=1,
+                 start_position=None, max_steering_speed=None, **handler_options):
+        """
+        Set up the simulated robot, controller and path handler.
+
+        Args:
+            path_list: List of Path objects to follow
+            robot_width: Width of the robot chassis
+            robot_height: Height of the robot chassis
+            initial_orientation: Starting orientation in degrees
+            final_orientation: Target ending orientation in degrees
+            base_speed: Base speed scaling factor (0.0 to 1.0)
+            control_frequency: Control ticks per simulated second
+            substeps: Kinematics integration sub-steps per control tick
+            start_position: (x, y) start of the robot (defaults to the start of the first path)
+            max_steering_speed: Steering speed limit in degrees per second, for both the simulated
+                                steering motors and PathHandler's steering commands
+            **handler_options: Further PathHandler options (tracking_mode, transition_mode, ...)
+        """
+        self.clock = VirtualClock()
+        self.dt = 1.0 / control_frequency
+
+        if start_position is None:
+            start_position = path_list[0].get_point(0) if path_list else (0, 0)
+        self.robot = Robot(start_position[0], start_position[1], robot_width, robot_height,
+                           10, 20, (0, 0, 255), (0, 0, 0))
+        self.robot.orientation = initial_orientation
+
+        self.controller = RobotController(self.robot, fixed_timestep=self.dt, substeps=substeps,
+                                          max_steering_speed=max_steering_speed)
+        self.motors = SimulatedMotors(self.controller)
+        self.handler = PathHandler(robot_width, robot_height, control_frequency,
+                                   clock=self.clock, motor_backend=self.motors,
+                                   max_steering_speed=max_steering_speed, **handler_options)
+        self.handler.set_paths(path_list, initial_orientation, final_orientation)
+        self.handler.base_speed = base_speed
+
+        self.trajectory = []
+
+    def run(self, max_time=120.0, record_trajectory=False, quiet=True):
+        """
+        Run the route until it is completed or max_time of simulated time has passed.
+
+        Args:
+            max_time: Simulated time limit in seconds
+            record_trajectory: Keep (time, x, y, orientation) of every tick in self.trajectory
+            quiet: Suppress the handler's progress messages
+
+        Returns:
+            Dictionary with the run results
+        """
+        wall_start = time.perf_counter()
+        output = io.StringIO() if quiet else None
+        if quiet:
+            with redirect_stdout(output):
+                ticks, completed, max_error, saturated = self._run(max_time, record_trajectory)
+        else:
+            ticks, completed, max_error, saturated = self._run(max_time, record_trajectory)
+
+        return {
+            "completed": completed,
+            "simulated_time": self.clock.now,
+            "ticks": ticks,
+            "wall_time": time.perf_counter() - wall_start,
+            "final_position": (self.robot.x, self.robot.y),
+            "final_orientation": self.robot.orientation,
+            "max_cross_track_error": max_error,
+            "wheel_saturation": saturated / ticks if ticks else 0.0,
+        }
+
+    def _run(self, max_time, record_trajectory):
+        """
+        Closed loop: pose -> PathHandler tick -> motors -> kinematics.
+
+        Returns:
+            Tuple (ticks, completed, max_cross_track_error, saturated_ticks)
+        """
+        clock = self.clock
+        robot = self.robot
+        handler = self.handler
+        controller = self.controller
+        trajectory = self.trajectory
+
+        controller.moving = True
+
+        ticks = 0
+        max_error = 0.0
+        saturated = 0
+        end_time = clock() + max_time
+        while clock() < end_time:
+            handler.set_position(robot.x, robot.y, robot.orientation)
+            if not handler.step():
+                return ticks, True, max_error, saturated
+            ticks += 1
+            if max(abs(speed) for speed in handler.commanded_speeds) >= SATURATION_LEVEL:
+                saturated += 1
+
+            index = handler.current_path_index
+            if index < len(handler.segments):
+                error = abs(handler.segments[index].cross_track_error(robot.x, robot.y))
+                if error > max_error:
+                    max_error = error
+
+            clock.advance(self.dt)
+            controller.step()
+            if record_trajectory:
+                trajectory.append((clock(), robot.x, robot.y, robot.orientation))
+
+        return ticks, False, max_error, saturated
+
+
+if __name__ == "__main__":
+    from path import Path
+
+    # Same route as the PathHandler example: a line followed by a half circle
+    line_path = Path('line', start_point=(0, 0), end_point=(1000, 0), velocity=0.5)
+    curve_path = Path('curve', circle_center=(1500, 0), radius=500,
+                      start_angle=math.pi, end_angle=0, velocity=0.5)
+
+    harness = SimulationHarness([line_path, curve_path], final_orientation=90)
+    result = harness.run()
+
+    print(f"Completed: {result['completed']} in {result['simulated_time']:.2f} s simulated "
+          f"({result['ticks']} ticks, {result['wall_time'] * 1000:.1f} ms wall time)")
+    print(f"Final position ({result['final_position'][0]:.1f}, {result['final_position'][1]:.1f}), "
+          f"max cross-track error {result['max_cross_track_error']:.2f}")
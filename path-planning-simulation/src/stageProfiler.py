@@ -0,0 +1,112 @@
+import os
+import json
+import time
+import threading
+from collections import deque, defaultdict
+
+
+class StageProfiler:
+    """
+    Lightweight per-stage timer for the control loop hot path.
+
+    Callers take timestamps with profiler.clock() around each stage and hand them
+    to record(). Durations are kept in a rolling window per stage for percentile
+    reporting, and every span is also kept (bounded) so a whole run can be dumped
+    as a Chrome trace-event file (chrome://tracing, Perfetto).
+    When disabled, callers skip timing entirely so the cost is a single flag check.
+    """
+
+    def __init__(self, window_size=1000, max_trace_events=200000, clock=time.perf_counter):
+        """
+        Initialize the profiler (disabled by default).
+
+        Args:
+            window_size: Number of recent samples per stage used for percentiles
+            max_trace_events: Maximum number of spans kept for trace export
+            clock: High resolution time source returning seconds
+        """
+        self.window_size = window_size
+        self.max_trace_events = max_trace_events
+        self.clock = clock
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        """
+        Discard all recorded samples and trace events.
+        """
+        self.samples = defaultdict(lambda: deque(maxlen=self.window_size))
+        self.trace_events = deque(maxlen=self.max_trace_events)
+
+    def record(self, stage, start, end):
+        """
+        Record one execution of a stage.
+
+        Args:
+            stage: Stage name
+            start: Start timestamp from self.clock()
+            end: End timestamp from self.clock()
+        """
+        duration = end - start
+        self.samples[stage].append(duration)
+        self.trace_events.append((stage, start, duration, threading.get_ident()))
+
+    def get_percentiles(self, percentiles=(50, 90, 99)):
+        """
+        Get rolling percentiles of stage durations.
+
+        Args:
+            percentiles: Percentiles to report
+
+        Returns:
+            Dictionary mapping stage names to {"count", "pXX"..., "max"} in milliseconds
+        """
+        result = {}
+        for stage, samples in list(self.samples.items()):
+            durations = sorted(samples)
+            if not durations:
+                continue
+
+            stats = {"count": len(durations)}
+            for p in percentiles:
+                index = min(int(round(p / 100 * (len(durations) - 1))), len(durations) - 1)
+                stats[f"p{p}"] = durations[index] * 1000
+            stats["max"] = durations[-1] * 1000
+            result[stage] = stats
+
+        return result
+
+    def dump_chrome_trace(self, filename, process_name="PathHandler"):
+        """
+        Write all recorded spans as a Chrome trace-event JSON file.
+
+        Args:
+            filename: Output file path
+            process_name: Name shown for the process in the trace viewer
+
+        Returns:
+            Number of span events written
+        """
+        pid = os.getpid()
+        events = [{
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {"name": process_name},
+        }]
+
+        for stage, start, duration, thread_id in list(self.trace_events):
+            events.append({
+                "name": stage,
+                "cat": "control_loop",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": thread_id,
+            })
+
+        with open(filename, 'w') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+        return len(events) - 1
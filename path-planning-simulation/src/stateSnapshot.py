@@ -0,0 +1,84 @@
+import threading
+from collections import namedtuple
+
+# Robot pose as published by the position tracking system
+PoseSnapshot = namedtuple('PoseSnapshot', ['x', 'y', 'orientation', 'timestamp', 'sequence'])
+
+# Path following progress as published by the control loop
+PathSnapshot = namedtuple('PathSnapshot', ['path_index', 'path_progress', 'timestamp', 'sequence'])
+
+
+class SnapshotBuffer:
+    """
+    Publishes immutable snapshots of shared state between threads.
+
+    The writer builds a complete new snapshot with the next sequence number and
+    publishes it with a single reference swap, so readers always see either the old
+    or the new snapshot, never a mix of the two. Neither read() nor publish() takes
+    a lock; publish() only synchronizes on the internal condition when a blocked
+    reader is waiting. Each buffer is meant to have a single writer thread.
+    """
+
+    def __init__(self, snapshot_type, **initial_fields):
+        """
+        Initialize the buffer with a first snapshot.
+
+        Args:
+            snapshot_type: namedtuple type with a trailing 'sequence' field
+            **initial_fields: Values for all other fields of the initial snapshot
+        """
+        self.snapshot_type = snapshot_type
+        self._condition = threading.Condition()
+        self._waiters = 0  # Readers blocked in wait_for_update
+        self._snapshot = snapshot_type(sequence=0, **initial_fields)
+
+    def publish(self, **fields):
+        """
+        Publish a new snapshot and wake up any blocked readers.
+
+        Args:
+            **fields: Values for all fields except 'sequence'
+
+        Returns:
+            The published snapshot
+        """
+        snapshot = self.snapshot_type(sequence=self._snapshot.sequence + 1, **fields)
+        self._snapshot = snapshot
+
+        # A reader registers before it checks the sequence, so one that is not counted
+        # yet will see the new snapshot without being notified
+        if self._waiters:
+            with self._condition:
+                self._condition.notify_all()
+        return snapshot
+
+    def read(self):
+        """
+        Get the latest snapshot without locking.
+
+        Returns:
+            The most recently published snapshot
+        """
+        return self._snapshot
+
+    def wait_for_update(self, after_sequence=None, timeout=None):
+        """
+        Block until a snapshot newer than after_sequence is published.
+
+        Args:
+            after_sequence: Sequence number already seen; defaults to the current one
+            timeout: Maximum time to wait in seconds (None waits forever)
+
+        Returns:
+            The new snapshot, or None if the timeout expired
+        """
+        with self._condition:
+            if after_sequence is None:
+                after_sequence = self._snapshot.sequence
+            self._waiters += 1
+            try:
+                updated = self._condition.wait_for(
+                    lambda: self._snapshot.sequence > after_sequence, timeout)
+            finally:
+                self._waiters -= 1
+            return self._snapshot if updated else None
@@ -0,0 +1,252 @@
+import os
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import copy
+import csv
+import io
+import itertools
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from routeGenerator import generate_random_path, load_routes
+from robot import Robot
+from robotController import RobotController
+from simulationHarness import SimulationHarness, SATURATION_LEVEL
+
+SIMULATORS = ('controller', 'handler')
+
+
+def run_controller_case(route, velocity, frequency, robot_size, max_time):
+    """
+    Simulate RobotController following a route with its own path logic.
+
+    Args:
+        route: List of Path objects
+        velocity: Factor applied to the path velocities
+        frequency: Update steps per simulated second
+        robot_size: Robot width and height
+        max_time: Simulated time limit in seconds
+
+    Returns:
+        Dictionary with the run results
+    """
+    # Scale the segment velocities on copies, leaving the shared route untouched
+    scaled = []
+    for path in route:
+        path = copy.copy(path)
+        path.velocity = (path.velocity if path.velocity is not None else 0.5) * velocity
+        scaled.append(path)
+
+    start_x, start_y = scaled[0].get_point(0)
+    robot = Robot(start_x, start_y, robot_size, robot_size, 10, 20, (0, 0, 255), (0, 0, 0))
+    controller = RobotController(robot, fixed_timestep=1.0 / frequency)
+    controller.set_paths(scaled)
+    controller.follow_paths()
+
+    ticks = 0
+    saturated = 0
+    max_error = 0.0
+    for _ in range(int(max_time * frequency)):
+        if not controller.moving:
+            break
+        index = controller.current_path_index
+        if index < len(controller.segments):
+            max_error = max(max_error, abs(controller.segments[index].cross_track_error(robot.x, robot.y)))
+        controller.step()
+        ticks += 1
+        if max(abs(speed) for speed in controller.wheel_speeds.values()) >= SATURATION_LEVEL:
+            saturated += 1
+
+    return {
+        "completed": not controller.moving,
+        "simulated_time": controller.sim_time,
+        "max_cross_track_error": max_error,
+        "wheel_saturation": saturated / ticks if ticks else 0.0,
+    }
+
+
+def run_handler_case(route, velocity, frequency, robot_size, max_time, handler_options=None):
+    """
+    Simulate PathHandler in closed loop with the RobotController kinematics.
+
+    Args:
+        route: List of Path objects
+        velocity: PathHandler base speed
+        frequency: Control ticks per simulated second
+        robot_size: Robot width and height
+        max_time: Simulated time limit in seconds
+        handler_options: Further PathHandler options, e.g. wheel limits for the velocity planner
+
+    Returns:
+        Dictionary with the run results
+    """
+    with redirect_stdout(io.StringIO()):
+        harness = SimulationHarness(route, robot_width=robot_size, robot_height=robot_size,
+                                    base_speed=velocity, control_frequency=frequency,
+                                    **(handler_options or {}))
+    return harness.run(max_time=max_time)
+
+
+def run_case(case):
+    """
+    Run one sweep case. Runs in a worker process.
+
+    Args:
+        case: Dictionary with route_id, route, simulator, velocity, frequency, robot_size, max_time
+              and optional handler_options
+
+    Returns:
+        Dictionary with the case parameters and its results
+    """
+    start = time.perf_counter()
+    try:
+        if case["simulator"] == 'handler':
+            result = run_handler_case(case["route"], case["velocity"], case["frequency"], case["robot_size"],
+                                      case["max_time"], case.get("handler_options"))
+        else:
+            result = run_controller_case(case["route"], case["velocity"], case["frequency"],
+                                         case["robot_size"], case["max_time"])
+        error = ""
+    except Exception as e:
+        result = {"completed": False, "simulated_time": float('nan'),
+                  "max_cross_track_error": float('nan'), "wheel_saturation": float('nan')}
+        error = str(e)
+
+    return {
+        "route_id": case["route_id"],
+        "simulator": case["simulator"],
+        "velocity": case["velocity"],
+        "frequency": case["frequency"],
+        "robot_size": case["robot_size"],
+        "completed": bool(result["completed"]),
+        "completion_time": result["simulated_time"] if result["completed"] else float('nan'),
+        "max_cross_track_error": result["max_cross_track_error"],
+        "wheel_saturation": result["wheel_saturation"],
+        "wall_time": time.perf_counter() - start,
+        "error": error,
+    }
+
+
+def build_cases(routes, simulator, velocities, frequencies, robot_sizes, max_time, handler_options=None):
+    """
+    Combine every route with every parameter setting.
+
+    Returns:
+        List of case dictionaries for run_case
+    """
+    return [{"route_id": route_id, "route": route, "simulator": simulator, "velocity": velocity,
+             "frequency": frequency, "robot_size": robot_size, "max_time": max_time,
+             "handler_options": handler_options}
+            for (route_id, route), velocity, frequency, robot_size
+            in itertools.product(enumerate(routes), velocities, frequencies, robot_sizes)]
+
+
+def aggregate(results):
+    """
+    Summarize the results per parameter setting.
+
+    Args:
+        results: List of run_case results
+
+    Returns:
+        List of summary rows, one per (velocity, frequency, robot_size)
+    """
+    groups = {}
+    for result in results:
+        key = (result["velocity"], result["frequency"], result["robot_size"])
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for (velocity, frequency, robot_size), group in sorted(groups.items()):
+        completed = [r for r in group if r["completed"]]
+        times = [r["completion_time"] for r in completed]
+        errors = [r["max_cross_track_error"] for r in group if r["max_cross_track_error"] == r["max_cross_track_error"]]
+        saturation = [r["wheel_saturation"] for r in group if r["wheel_saturation"] == r["wheel_saturation"]]
+        rows.append({
+            "velocity": velocity,
+            "frequency": frequency,
+            "robot_size": robot_size,
+            "runs": len(group),
+            "completed": len(completed) / len(group),
+            "mean_time": sum(times) / len(times) if times else float('nan'),
+            "max_time": max(times) if times else float('nan'),
+            "mean_error": sum(errors) / len(errors) if errors else float('nan'),
+            "max_error": max(errors) if errors else float('nan'),
+            "saturation": sum(saturation) / len(saturation) if saturation else float('nan'),
+        })
+    return rows
+
+
+def format_table(rows):
+    """
+    Format summary rows as a text table.
+    """
+    header = (f"{'velocity':>8} {'freq':>6} {'size':>6} {'runs':>5} {'done':>6} "
+              f"{'mean t':>8} {'max t':>8} {'mean err':>9} {'max err':>9} {'sat':>6}")
+    lines = [header, '-' * len(header)]
+    for row in rows:
+        lines.append(f"{row['velocity']:>8.2f} {row['frequency']:>6.0f} {row['robot_size']:>6.0f} "
+                     f"{row['runs']:>5} {row['completed']:>6.0%} "
+                     f"{row['mean_time']:>8.2f} {row['max_time']:>8.2f} "
+                     f"{row['mean_error']:>9.2f} {row['max_error']:>9.2f} {row['saturation']:>6.0%}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep headless path following simulations over routes and parameters")
+    parser.add_argument("--route-file", help="JSON route file (see routeGenerator.load_routes)")
+    parser.add_argument("--routes", type=int, default=20, help="Number of random routes when no route file is given")
+    parser.add_argument("--segments", type=int, default=5, help="Segments per random route")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random routes")
+    parser.add_argument("--simulator", choices=SIMULATORS, default='controller',
+                        help="'controller' runs RobotController alone, 'handler' runs PathHandler in closed loop")
+    parser.add_argument("--velocity", type=float, nargs='+', default=[1.0],
+                        help="Velocity scale (controller) or base speed (handler) values")
+    parser.add_argument("--frequency", type=float, nargs='+', default=[100.0], help="Update frequencies in Hz")
+    parser.add_argument("--robot-size", type=float, nargs='+', default=[80.0], help="Robot width/height values")
+    parser.add_argument("--max-wheel-speed", type=float,
+                        help="Handler: wheel speed at command 1.0, enables the velocity planner with --max-wheel-accel")
+    parser.add_argument("--max-wheel-accel", type=float, help="Handler: wheel acceleration limit")
+    parser.add_argument("--max-time", type=float, default=120.0, help="Simulated time limit per run in seconds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--csv", help="Write the per-run results to this CSV file")
+    args = parser.parse_args(argv)
+
+    if args.route_file:
+        routes = load_routes(args.route_file)
+    else:
+        rng = random.Random(args.seed)
+        routes = [generate_random_path(args.segments, rng=rng)[0] for _ in range(args.routes)]
+
+    handler_options = {}
+    if args.max_wheel_speed is not None and args.max_wheel_accel is not None:
+        handler_options = {"max_wheel_speed": args.max_wheel_speed, "max_wheel_accel": args.max_wheel_accel}
+
+    cases = build_cases(routes, args.simulator, args.velocity, args.frequency, args.robot_size,
+                        args.max_time, handler_options)
+    print(f"Running {len(cases)} simulations ({len(routes)} routes) on {args.workers} workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(cases) // (args.workers * 4))
+        results = list(executor.map(run_case, cases, chunksize=chunksize))
+    elapsed = time.perf_counter() - start
+
+    print(format_table(aggregate(results)))
+    failures = [r for r in results if r["error"]]
+    if failures:
+        print(f"{len(failures)} runs failed, first error: {failures[0]['error']}")
+    print(f"Finished in {elapsed:.2f} s")
+
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].keys()))
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"Wrote {len(results)} results to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
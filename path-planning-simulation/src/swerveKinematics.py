@@ -0,0 +1,117 @@
+import numpy as np
+
+WHEEL_IDS = (1, 3, 5, 7)
+
+
+class SwerveKinematics:
+    """
+    Rigid-body kinematics of a robot with four independently steered wheels.
+
+    Body twists are in the robot frame: vx, vy in distance per second and omega in
+    radians per second, positive in the direction of increasing angles (the same
+    sense as the robot orientation). Wheel angles are in degrees relative to the
+    robot body, wheel speeds in distance per second, both in wheel order 1,3,5,7.
+
+    A wheel at offset (rx, ry) moves at (vx - omega * ry, vy + omega * rx).
+    The inverse direction evaluates this for all wheels at once; the forward
+    direction solves the 8 wheel velocity components for the twist in the
+    least-squares sense, so slipping or inconsistent wheels average out.
+    """
+
+    def __init__(self, robot_width, robot_height):
+        """
+        Initialize the model for a robot's wheel layout.
+
+        Args:
+            robot_width: Width of the robot chassis (distance between wheels)
+            robot_height: Height of the robot chassis (distance between wheels)
+        """
+        self.robot_width = robot_width
+        self.robot_height = robot_height
+
+        # Wheel positions relative to center, same layout as WheelPathGenerator
+        self.offsets = np.array([
+            (-robot_width / 2, -robot_height / 2),  # 1: top-left
+            (robot_width / 2, -robot_height / 2),   # 3: top-right
+            (-robot_width / 2, robot_height / 2),   # 5: bottom-left
+            (robot_width / 2, robot_height / 2),    # 7: bottom-right
+        ])
+
+        # Wheel velocity components [vx1, vy1, vx3, vy3, ...] = matrix @ [vx, vy, omega]
+        matrix = np.zeros((8, 3))
+        matrix[0::2, 0] = 1
+        matrix[1::2, 1] = 1
+        matrix[0::2, 2] = -self.offsets[:, 1]
+        matrix[1::2, 2] = self.offsets[:, 0]
+        self.matrix = matrix
+        self._pseudo_inverse = np.linalg.pinv(matrix)
+
+    def wheel_velocities(self, vx, vy, omega):
+        """
+        Velocity vectors of the wheels for body twists.
+
+        Args:
+            vx: Body velocity x (scalar or array)
+            vy: Body velocity y (scalar or array)
+            omega: Body rotation rate in rad/s (scalar or array)
+
+        Returns:
+            Tuple (wheel_vx, wheel_vy) of arrays with a trailing axis of 4 wheels
+        """
+        vx = np.asarray(vx, dtype=float)[..., None]
+        vy = np.asarray(vy, dtype=float)[..., None]
+        omega = np.asarray(omega, dtype=float)[..., None]
+        return vx - omega * self.offsets[:, 1], vy + omega * self.offsets[:, 0]
+
+    def inverse(self, vx, vy, omega):
+        """
+        Wheel angles and speeds that produce body twists.
+
+        Args:
+            vx: Body velocity x (scalar or array)
+            vy: Body velocity y (scalar or array)
+            omega: Body rotation rate in rad/s (scalar or array)
+
+        Returns:
+            Tuple (angles, speeds) of arrays with a trailing axis of 4 wheels;
+            angles in degrees (0-360), speeds non-negative
+        """
+        wheel_vx, wheel_vy = self.wheel_velocities(vx, vy, omega)
+        angles = np.mod(np.degrees(np.arctan2(wheel_vy, wheel_vx)), 360)
+        return angles, np.hypot(wheel_vx, wheel_vy)
+
+    def forward(self, angles, speeds):
+        """
+        Body twists that best match wheel angles and speeds (least squares).
+
+        Args:
+            angles: Wheel angles in degrees, trailing axis of 4 wheels
+            speeds: Wheel speeds, trailing axis of 4 wheels
+
+        Returns:
+            Tuple (vx, vy, omega) of arrays with the leading shape of the inputs
+        """
+        radians = np.radians(np.asarray(angles, dtype=float))
+        speeds = np.asarray(speeds, dtype=float)
+        components = np.empty(np.broadcast(radians, speeds).shape[:-1] + (8,))
+        components[..., 0::2] = speeds * np.cos(radians)
+        components[..., 1::2] = speeds * np.sin(radians)
+        twist = components @ self._pseudo_inverse.T
+        return twist[..., 0], twist[..., 1], twist[..., 2]
+
+
+def body_to_world(vx, vy, orientation):
+    """
+    Rotate a robot frame velocity into the world frame.
+
+    Args:
+        vx: Velocity x in the robot frame
+        vy: Velocity y in the robot frame
+        orientation: Robot orientation in degrees
+
+    Returns:
+        Tuple (world_vx, world_vy)
+    """
+    theta = np.radians(orientation)
+    cos, sin = np.cos(theta), np.sin(theta)
+    return vx * cos - vy * sin, vx * sin + vy * cos
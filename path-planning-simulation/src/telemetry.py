@@ -0,0 +1,246 @@
+import mmap
+import struct
+import numpy as np
+
+# File header: magic, format version, record size, capacity, records written so far
+HEADER_FORMAT = struct.Struct('<4sHHIQ')
+HEADER_SIZE = 32  # HEADER_FORMAT padded to keep the records aligned
+MAGIC = b'PTLM'
+VERSION = 1
+
+# One control tick: tick time, pose measurement time, x, y, orientation, segment progress,
+# segment index, 4 wheel angles, 4 wheel speeds, loop time
+RECORD_FORMAT = struct.Struct('<6di4f4ff')
+
+RECORD_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('pose_time', '<f8'),
+    ('x', '<f8'),
+    ('y', '<f8'),
+    ('orientation', '<f8'),
+    ('progress', '<f8'),
+    ('segment_index', '<i4'),
+    ('angles', '<f4', (4,)),
+    ('speeds', '<f4', (4,)),
+    ('loop_time', '<f4'),
+])
+
+assert RECORD_DTYPE.itemsize == RECORD_FORMAT.size
+
+
+class TelemetryRecorder:
+    """
+    Writes fixed-size per-tick records into a memory-mapped ring buffer file.
+
+    The file is allocated once; each record is packed in place into the mapping,
+    so recording does not grow memory or issue write calls. When the buffer is
+    full the oldest records are overwritten. The header keeps the total number of
+    records written, which tells a reader where the ring starts.
+    """
+
+    def __init__(self, filename, capacity=65536):
+        """
+        Create (or overwrite) a telemetry file.
+
+        Args:
+            filename: Path of the telemetry file
+            capacity: Number of records kept before the oldest are overwritten
+        """
+        self.filename = filename
+        self.capacity = capacity
+        self.count = 0
+
+        size = HEADER_SIZE + capacity * RECORD_FORMAT.size
+        self._file = open(filename, 'w+b')
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._write_header()
+
+    def _write_header(self):
+        HEADER_FORMAT.pack_into(self._map, 0, MAGIC, VERSION, RECORD_FORMAT.size, self.capacity, self.count)
+
+    def record(self, timestamp, pose_time, x, y, orientation, progress, segment_index, angles, speeds, loop_time):
+        """
+        Append one record.
+
+        Args:
+            timestamp: Time of the control tick
+            pose_time: Measurement time of the pose used in the tick
+            x: Pose x
+            y: Pose y
+            orientation: Pose orientation in degrees
+            progress: Progress along the current segment (0 to 1)
+            segment_index: Index of the current segment
+            angles: Sequence of 4 commanded wheel angles in degrees
+            speeds: Sequence of 4 commanded wheel speeds (-1 to 1)
+            loop_time: Time spent computing the tick in seconds
+        """
+        offset = HEADER_SIZE + (self.count % self.capacity) * RECORD_FORMAT.size
+        RECORD_FORMAT.pack_into(self._map, offset, timestamp, pose_time, x, y, orientation, progress,
+                                segment_index, angles[0], angles[1], angles[2], angles[3],
+                                speeds[0], speeds[1], speeds[2], speeds[3], loop_time)
+        # Publish the record by bumping the count only after it is complete
+        self.count += 1
+        struct.pack_into('<Q', self._map, HEADER_FORMAT.size - 8, self.count)
+
+    def flush(self):
+        """
+        Flush the mapping to disk.
+        """
+        self._map.flush()
+
+    def close(self):
+        """
+        Flush and close the file.
+        """
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        self._map = None
+
+
+def read_telemetry(filename):
+    """
+    Read a telemetry file into a NumPy structured array (RECORD_DTYPE), oldest record first.
+
+    Args:
+        filename: Path of the telemetry file
+
+    Returns:
+        Structured array of the records still held in the ring buffer
+    """
+    with open(filename, 'rb') as f:
+        magic, version, record_size, capacity, count = HEADER_FORMAT.unpack(f.read(HEADER_FORMAT.size))
+
+    if magic != MAGIC:
+        raise ValueError(f"Not a telemetry file: {filename}")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Unsupported telemetry format version {version} (record size {record_size})")
+
+    stored = min(count, capacity)
+    records = np.fromfile(filename, dtype=RECORD_DTYPE, count=stored, offset=HEADER_SIZE)
+    if count > capacity:
+        # The ring has wrapped: the oldest record is the next one to be overwritten
+        start = count % capacity
+        records = np.concatenate((records[start:], records[:start]))
+    return records
+
+
+def export_csv(filename, csv_filename):
+    """
+    Export a telemetry file to CSV with one column per value.
+
+    Args:
+        filename: Path of the telemetry file
+        csv_filename: Path of the CSV file to write
+
+    Returns:
+        Number of records exported
+    """
+    records = read_telemetry(filename)
+    columns = ['time', 'pose_time', 'x', 'y', 'orientation', 'progress', 'segment_index']
+    header = columns + [f'angle_{i}' for i in range(4)] + [f'speed_{i}' for i in range(4)] + ['loop_time']
+
+    table = np.column_stack([records[name].astype(float) for name in columns] +
+                            [records['angles'].astype(float), records['speeds'].astype(float),
+                             records['loop_time'].astype(float)])
+    np.savetxt(csv_filename, table, delimiter=',', header=','.join(header), comments='', fmt='%.9g')
+    return len(records)
+
+
+class ReplayClock:
+    """
+    Clock that returns the time of the record being replayed.
+    """
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class CommandSink:
+    """
+    Motor backend that keeps the last command per motor instead of sending it anywhere.
+    Has the same set_wheel_angle/set_wheel_speed interface as the wheelControl module.
+    """
+
+    def __init__(self):
+        self.angles = {}
+        self.speeds = {}
+
+    def set_wheel_angle(self, wheel_id, angle, namespace=None):
+        self.angles[wheel_id] = angle
+
+    def set_wheel_speed(self, wheel_id, speed, namespace=None):
+        self.speeds[wheel_id] = speed
+
+
+def replay(filename, path_handler):
+    """
+    Feed the recorded poses back into a PathHandler, one control tick per record,
+    as fast as possible.
+
+    The handler must be created with clock=ReplayClock() and motor_backend=CommandSink()
+    (or any backend) and have the same paths set as in the recorded run. Ticks use the
+    recorded tick times, so pose prediction sees the same timing as the original run.
+    If the handler has a telemetry recorder, the replayed ticks are recorded too.
+
+    Args:
+        filename: Path of the telemetry file
+        path_handler: PathHandler to drive
+
+    Returns:
+        (n, 8) array of the replayed commands per tick: 4 wheel angles, then 4 wheel speeds,
+        in the same order as the recorded 'angles' and 'speeds' fields
+    """
+    records = read_telemetry(filename)
+    clock = path_handler.clock
+    commands = np.zeros((len(records), 8))
+    last_pose_time = None
+    ticks = 0
+
+    for record in records:
+        if isinstance(clock, ReplayClock):
+            clock.now = float(record['time'])
+
+        # Publish each measured pose once, so the handler sees the same pose updates
+        pose_time = float(record['pose_time'])
+        if pose_time != last_pose_time:
+            path_handler.set_position(float(record['x']), float(record['y']),
+                                      float(record['orientation']), timestamp=pose_time)
+            last_pose_time = pose_time
+
+        running = path_handler.step()
+        commands[ticks, :4] = path_handler.commanded_angles
+        commands[ticks, 4:] = path_handler.commanded_speeds
+        ticks += 1
+        if not running:
+            break
+
+    return commands[:ticks]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or export a path following telemetry file")
+    parser.add_argument("filename", help="Telemetry file")
+    parser.add_argument("--csv", help="Export the records to this CSV file")
+    args = parser.parse_args()
+
+    records = read_telemetry(args.filename)
+    print(f"{args.filename}: {len(records)} records")
+    if len(records):
+        duration = records['time'][-1] - records['time'][0]
+        loop_ms = records['loop_time'] * 1000
+        print(f"Duration {duration:.3f} s, segments {records['segment_index'].min()}-{records['segment_index'].max()}")
+        print(f"Loop time mean {loop_ms.mean():.3f} ms, p99 {np.percentile(loop_ms, 99):.3f} ms, "
+              f"max {loop_ms.max():.3f} ms")
+
+    if args.csv:
+        count = export_csv(args.filename, args.csv)
+        print(f"Exported {count} records to {args.csv}")
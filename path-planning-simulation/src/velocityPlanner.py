@@ -0,0 +1,254 @@
+import numpy as np
+
+
+class VelocityProfile:
+    """
+    Time-parametrized speed profile over the sampled wheel paths of a route.
+
+    The profile is indexed by the sample intervals of the wheel paths. Route
+    progress 0..1 maps linearly onto those intervals, the same way
+    WheelSpeedCalculator indexes its speed ratios.
+    """
+
+    def __init__(self, wheel_ids, wheel_speeds, wheel_commands, path_speeds, interval_times, max_wheel_speeds):
+        """
+        Args:
+            wheel_ids: Wheel IDs in row order
+            wheel_speeds: (wheels, intervals) array of wheel speeds in distance per second
+            wheel_commands: (wheels, intervals) array of motor commands (0 to 1)
+            path_speeds: (intervals,) array of fastest wheel speeds in each interval
+            interval_times: (intervals,) array of time spent in each interval
+            max_wheel_speeds: (wheels,) array of wheel speeds reached at motor command 1.0
+        """
+        self.wheel_ids = list(wheel_ids)
+        self.speed_motor_ids = [wheel_id + 1 for wheel_id in self.wheel_ids]
+        self.max_wheel_speeds = dict(zip(self.speed_motor_ids, (float(v) for v in max_wheel_speeds)))
+        self.wheel_speeds = wheel_speeds
+        self.wheel_commands = wheel_commands
+        self.path_speeds = path_speeds
+        self.interval_times = interval_times
+        self.cumulative_times = np.concatenate(([0.0], np.cumsum(interval_times)))
+        self.total_time = float(self.cumulative_times[-1])
+        self.interval_count = len(interval_times)
+
+    def _interval_at(self, progress):
+        """Interval index for a route progress value (0 to 1)."""
+        return min(max(int(progress * self.interval_count), 0), self.interval_count - 1)
+
+    def get_commands_at_progress(self, progress, base_speed=1.0):
+        """
+        Get the motor speed commands at a point along the route.
+
+        Args:
+            progress: Progress along the whole route (0 to 1)
+            base_speed: Scaling factor applied to the profile (1.0 runs at the limits)
+
+        Returns:
+            Dictionary mapping speed motor IDs to commands (-1 to 1)
+        """
+        if self.interval_count == 0:
+            return {motor_id: 0 for motor_id in self.speed_motor_ids}
+        commands = self.wheel_commands[:, self._interval_at(progress)]
+        return {motor_id: float(command) * base_speed
+                for motor_id, command in zip(self.speed_motor_ids, commands)}
+
+    def get_commands_for_shares(self, progress, shares, base_speed=1.0):
+        """
+        Convert wheel speed shares into motor commands at a point along the route.
+
+        The fastest wheel moves at the planned path speed and every other wheel at
+        its share of it, each converted through that wheel's own speed limit.
+
+        Args:
+            progress: Progress along the whole route (0 to 1)
+            shares: Dictionary mapping speed motor IDs to wheel speeds relative to the
+                    fastest wheel (negative for reversed wheels)
+            base_speed: Scaling factor applied to the profile (1.0 runs at the limits)
+
+        Returns:
+            Dictionary mapping speed motor IDs to commands (-1 to 1)
+        """
+        path_speed = self.get_path_speed_at_progress(progress) * base_speed
+        return {motor_id: max(-1.0, min(1.0, path_speed * share / self.max_wheel_speeds[motor_id]))
+                for motor_id, share in shares.items()}
+
+    def get_path_speed_at_progress(self, progress):
+        """
+        Get the planned speed of the fastest wheel at a point along the route.
+
+        Args:
+            progress: Progress along the whole route (0 to 1)
+
+        Returns:
+            Speed in distance units per second
+        """
+        if self.interval_count == 0:
+            return 0.0
+        return float(self.path_speeds[self._interval_at(progress)])
+
+    def get_time_at_progress(self, progress):
+        """
+        Get the planned time at which a point along the route is reached.
+
+        Args:
+            progress: Progress along the whole route (0 to 1)
+
+        Returns:
+            Time in seconds since the start of the route
+        """
+        if self.interval_count == 0:
+            return 0.0
+        position = min(max(progress, 0.0), 1.0) * self.interval_count
+        index = min(int(position), self.interval_count - 1)
+        fraction = position - index
+        return float(self.cumulative_times[index] + fraction * self.interval_times[index])
+
+
+class VelocityPlanner:
+    """
+    Plans the maximum feasible speed along a route given per-wheel limits.
+
+    The route is parametrized by the travel of the fastest wheel in each sample
+    interval, so every wheel moves at most as fast as the path parameter.
+    A forward pass limits how fast each wheel may speed up from one interval to
+    the next, a backward pass limits how fast it may slow down, and the passes
+    repeat until no interval speed changes.
+    """
+
+    def __init__(self, max_wheel_speed, max_wheel_accel, start_speed=0.0, end_speed=0.0, max_iterations=20):
+        """
+        Initialize the planner.
+
+        Args:
+            max_wheel_speed: Wheel speed (distance per second) reached at motor command 1.0,
+                             either one value for all wheels or a dict per wheel ID
+            max_wheel_accel: Maximum wheel acceleration (distance per second squared),
+                             either one value for all wheels or a dict per wheel ID
+            start_speed: Path speed at the start of the route
+            end_speed: Path speed at the end of the route
+            max_iterations: Maximum number of forward/backward pass pairs
+        """
+        self.max_wheel_speed = max_wheel_speed
+        self.max_wheel_accel = max_wheel_accel
+        self.start_speed = start_speed
+        self.end_speed = end_speed
+        self.max_iterations = max_iterations
+
+    @staticmethod
+    def _per_wheel(limit, wheel_ids):
+        """Expand a scalar or per-wheel dict limit into an array in wheel order."""
+        if isinstance(limit, dict):
+            return np.array([limit[wheel_id] for wheel_id in wheel_ids], dtype=float)
+        return np.full(len(wheel_ids), float(limit))
+
+    def plan(self, wheel_paths):
+        """
+        Plan the speed profile for a set of wheel paths.
+
+        Args:
+            wheel_paths: Dictionary mapping wheel IDs to lists of path points
+                         (as produced by WheelPathGenerator.generate_wheel_paths)
+
+        Returns:
+            VelocityProfile
+        """
+        wheel_ids = sorted(wheel_paths)
+        points = np.array([wheel_paths[wheel_id] for wheel_id in wheel_ids], dtype=float)
+        distances = np.hypot(*np.diff(points, axis=1).transpose(2, 0, 1))  # (wheels, intervals)
+        interval_count = distances.shape[1]
+
+        vmax = self._per_wheel(self.max_wheel_speed, wheel_ids)
+        amax = self._per_wheel(self.max_wheel_accel, wheel_ids)
+
+        # Path parameter step: travel of the fastest wheel in each interval.
+        # Each wheel moves at ratio * path speed within an interval.
+        step = distances.max(axis=0)
+        ratios = np.divide(distances, step, out=np.zeros_like(distances), where=step > 0)
+
+        # Speed limit of the path parameter in each interval
+        with np.errstate(divide='ignore'):
+            speed_limit = np.min(np.where(ratios > 0, vmax[:, None] / ratios, np.inf), axis=0)
+        speeds = np.where(np.isfinite(speed_limit), speed_limit, vmax.min())
+
+        # Zero length intervals (duplicated points at segment joins) take no time and are skipped
+        moving = [i for i in range(interval_count) if step[i] > 0]
+        if moving:
+            first, last = moving[0], moving[-1]
+            speeds[first] = min(speeds[first], self._speed_after(
+                np.full(len(wheel_ids), self.start_speed), amax, ratios[:, first], step[first]))
+            speeds[last] = min(speeds[last], self._speed_after(
+                np.full(len(wheel_ids), self.end_speed), amax, ratios[:, last], step[last]))
+
+        # Lowering a speed in one pass can break a wheel's constraint from the other
+        # direction when the wheel's ratio changes between intervals, so repeat until stable
+        for _ in range(self.max_iterations):
+            changed = False
+
+            # Forward pass: each wheel may only gain a_max * dt over the previous interval
+            for prev, i in zip(moving, moving[1:]):
+                dt = step[prev] / speeds[prev]
+                allowed = self._speed_change_limit(ratios[:, prev] * speeds[prev] + amax * dt, ratios[:, i])
+                if speeds[i] > allowed * (1 + 1e-9):
+                    speeds[i] = allowed
+                    changed = True
+
+            # Backward pass: each wheel may only lose a_max * dt going into the next interval
+            for i, following in zip(reversed(moving[:-1]), reversed(moving[1:])):
+                dt = step[following] / speeds[following]
+                allowed = self._speed_change_limit(ratios[:, following] * speeds[following] + amax * dt, ratios[:, i])
+                if speeds[i] > allowed * (1 + 1e-9):
+                    speeds[i] = allowed
+                    changed = True
+
+            if not changed:
+                break
+
+        interval_times = np.divide(step, speeds, out=np.zeros_like(step), where=speeds > 0)
+        wheel_speeds = ratios * speeds
+        wheel_commands = np.clip(wheel_speeds / vmax[:, None], 0.0, 1.0)
+
+        # Zero length intervals take no time, but the robot can still be looked up there
+        # at a segment join; give them the speeds of the previous moving interval
+        if moving:
+            source = np.maximum.accumulate(np.where(step > 0, np.arange(interval_count), -1))
+            source[source < 0] = moving[0]
+            wheel_speeds = wheel_speeds[:, source]
+            wheel_commands = wheel_commands[:, source]
+            speeds = speeds[source]
+
+        return VelocityProfile(wheel_ids, wheel_speeds, wheel_commands, speeds, interval_times, vmax)
+
+    @staticmethod
+    def _speed_change_limit(wheel_speed_limits, ratios):
+        """
+        Path speed at which the first wheel reaches its speed limit.
+
+        Args:
+            wheel_speed_limits: Maximum speed of each wheel
+            ratios: Wheel speed per unit of path speed in the interval
+
+        Returns:
+            Maximum path speed
+        """
+        active = ratios > 0
+        if not active.any():
+            return np.inf
+        return float(np.min(wheel_speed_limits[active] / ratios[active]))
+
+    @classmethod
+    def _speed_after(cls, boundary_speeds, amax, ratios, step):
+        """
+        Maximum path speed in an interval adjacent to a boundary speed,
+        accelerating uniformly over the interval: v^2 = v0^2 + 2 a s.
+
+        Args:
+            boundary_speeds: Wheel speeds at the boundary
+            amax: Maximum acceleration of each wheel
+            ratios: Wheel speed per unit of path speed in the interval
+            step: Path parameter length of the interval
+
+        Returns:
+            Maximum path speed
+        """
+        reachable = np.sqrt(boundary_speeds**2 + 2 * amax * ratios * step)
+        return cls._speed_change_limit(reachable, ratios)
@@ -10,21 +10,50 @@ redis_client = redis.Redis(host='localhost', port=6379, db=0)
 # Store active timers for each wheel
 wheel_timers = defaultdict(lambda: None)
 
-def set_wheel_speed(wheel_id, speed):
+def motor_key(kind, wheel_id, namespace=None):
+    """
+    Build the Redis key for a motor.
+    :param kind: 'speed' or 'angle'
+    :param wheel_id: ID of the motor
+    :param namespace: Optional per-robot prefix, e.g. 'robot7' -> 'robot7:speed_2'
+    :return: Redis key string
+    """
+    key = f'{kind}_{wheel_id}'
+    if namespace:
+        key = f'{namespace}:{key}'
+    return key
+
+def set_wheel_speed(wheel_id, speed, namespace=None):
     """
     Set the speed of a wheel in Redis.
     :param wheel_id: ID of the wheel(2,4,6,8)
     :param speed: Speed value (-1 to 1)
+    :param namespace: Optional per-robot key prefix
     """
-    redis_client.set(f'speed_{wheel_id}', speed)
+    redis_client.set(motor_key('speed', wheel_id, namespace), speed)
 
-def set_wheel_angle(wheel_id, angle):
+def set_wheel_angle(wheel_id, angle, namespace=None):
     """
     Set the angle of a wheel in Redis.  
     :param wheel_id: ID of the wheel(1,3,5,7)
     :param angle: Angle in degrees (0-360)
+    :param namespace: Optional per-robot key prefix
+    """
+    redis_client.set(motor_key('angle', wheel_id, namespace), angle)
+
+def send_motor_frames(frames):
+    """
+    Write the angle and speed commands of one or more robots in a single pipelined round trip.
+    :param frames: Iterable of (namespace, angles, speeds) where angles and speeds
+                   map motor IDs to values; namespace may be None
     """
-    redis_client.set(f'angle_{wheel_id}', angle)
+    pipe = redis_client.pipeline(transaction=False)
+    for namespace, angles, speeds in frames:
+        for wheel_id, angle in angles.items():
+            pipe.set(motor_key('angle', wheel_id, namespace), angle)
+        for wheel_id, speed in speeds.items():
+            pipe.set(motor_key('speed', wheel_id, namespace), speed)
+    pipe.execute()
 
 def set_timed_speed(wheel_id, speed, duration):
     """
@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from path import Path
 
 class WheelPathGenerator:
@@ -102,24 +103,127 @@ class WheelPathGenerator:
         
         return points
     
+    def generate_steering_table(self, center_path_list, initial_orientation, final_orientation, num_points=100):
+        """
+        Precompute each wheel's steering angle along the route from the analytic tangents
+        of the center path and the robot's rotation.
+        
+        The center path is evaluated in floating point rather than through Path.get_point,
+        whose integer pixels can repeat between neighbouring samples and would make the
+        center look stationary.
+        
+        Args:
+            center_path_list: List of Path objects for the robot's center
+            initial_orientation: Initial orientation of the robot in degrees
+            final_orientation: Final orientation of the robot in degrees
+            num_points: Samples per segment
+            
+        Returns:
+            SteeringTable, or None for an empty route
+        """
+        total_segments = len(center_path_list)
+        if total_segments == 0:
+            return None
+        offsets = np.array([self.wheel_offsets[wheel_id] for wheel_id in self.wheel_offsets], dtype=float)
+        t = np.linspace(0, 1, num_points)
+        
+        progress, directions, angles, ratios = [], [], [], []
+        for i, center_path in enumerate(center_path_list):
+            # Center velocity per unit of segment parameter t
+            if center_path.path_type == 'line':
+                center_step = np.tile(np.subtract(center_path.end_point, center_path.start_point,
+                                                  dtype=float), (num_points, 1))
+            else:
+                span = center_path.end_angle - center_path.start_angle
+                arc_angle = center_path.start_angle + span * t
+                center_step = center_path.radius * span * np.column_stack((-np.sin(arc_angle), np.cos(arc_angle)))
+            
+            # Orientation is interpolated linearly over the segment, as in generate_wheel_paths
+            start_orientation = initial_orientation + i / total_segments * (final_orientation - initial_orientation)
+            end_orientation = initial_orientation + (i + 1) / total_segments * (final_orientation - initial_orientation)
+            orientation = np.radians(start_orientation + t * (end_orientation - start_orientation))
+            turn_rate = math.radians(end_orientation - start_orientation)
+            
+            # Wheel velocity = center velocity + turn rate x rotated offset, shape (4, n, 2)
+            cos_o, sin_o = np.cos(orientation), np.sin(orientation)
+            rotated_x = offsets[:, :1] * cos_o - offsets[:, 1:] * sin_o
+            rotated_y = offsets[:, :1] * sin_o + offsets[:, 1:] * cos_o
+            wheel_step = np.stack((center_step[:, 0] - turn_rate * rotated_y,
+                                   center_step[:, 1] + turn_rate * rotated_x), axis=-1)
+            
+            center_distance = np.hypot(center_step[:, 0], center_step[:, 1])
+            wheel_distance = np.hypot(wheel_step[..., 0], wheel_step[..., 1])
+            
+            progress.append((i + t) / total_segments)
+            directions.append(np.arctan2(center_step[:, 1], center_step[:, 0]))
+            angles.append(np.arctan2(wheel_step[..., 1], wheel_step[..., 0]).T)
+            # Wheel distance per unit of center distance (1 for a zero-length segment)
+            ratios.append(np.divide(wheel_distance, center_distance, out=np.ones_like(wheel_distance),
+                                    where=center_distance > 0).T)
+        
+        # Unwrapped so that neighbouring samples interpolate across 0/360
+        return SteeringTable(np.concatenate(progress),
+                             np.degrees(np.unwrap(np.concatenate(directions))),
+                             np.degrees(np.unwrap(np.concatenate(angles), axis=0)),
+                             np.concatenate(ratios))
+    
     def draw_wheel_paths(self, screen, wheel_paths, colors):
         """
-        Draw the wheel paths on the screen.
+        Draw the wheel paths on the screen, one polyline per wheel.
         
         Args:
             screen: Pygame screen to draw on
-            wheel_paths: Dictionary mapping wheel IDs to lists of path points
+            wheel_paths: Dictionary mapping wheel IDs to lists or (N, 2) arrays of path points
             colors: Dictionary mapping wheel IDs to colors
         """
-        import pygame
+        from sceneRenderer import draw_polyline
         
         for wheel_id, points in wheel_paths.items():
             color = colors.get(wheel_id, (255, 255, 255))
+            draw_polyline(screen, color, points)
+
+
+class SteeringTable:
+    """
+    Steering angles of the wheels sampled along a route, interpolated by route progress.
+    
+    Each sample holds the center path direction, the direction of travel of each wheel
+    (the tangent of its wheel path) in world degrees, and each wheel's distance per unit
+    of center distance. Wheels are in order 1,3,5,7.
+    """
+    
+    def __init__(self, progress, directions, angles, ratios):
+        """
+        Args:
+            progress: (n,) route progress of the samples (0 to 1, non-decreasing)
+            directions: (n,) center path direction in degrees, unwrapped
+            angles: (n, 4) wheel directions in degrees, unwrapped per wheel
+            ratios: (n, 4) wheel distance per unit of center distance
+        """
+        self.progress = progress
+        self.directions = directions
+        self.angles = angles
+        self.ratios = ratios
+    
+    def lookup(self, progress):
+        """
+        Interpolate the table at a route progress.
+        
+        Args:
+            progress: Progress along the route (0 to 1)
             
-            for i in range(len(points) - 1):
-                pygame.draw.circle(
-                    screen, 
-                    color, 
-                    points[i], 
-                    1
-                )
\ No newline at end of file
+        Returns:
+            Tuple (direction, angles, ratios): center direction in degrees, (4,) wheel
+            directions in degrees (0-360) and (4,) distance ratios
+        """
+        # At a join the next segment's samples take over
+        high = int(np.searchsorted(self.progress, progress, side='right'))
+        high = min(max(high, 1), len(self.progress) - 1)
+        low = high - 1
+        span = self.progress[high] - self.progress[low]
+        weight = min(max((progress - self.progress[low]) / span, 0.0), 1.0) if span > 0 else 0.0
+        
+        direction = self.directions[low] + weight * (self.directions[high] - self.directions[low])
+        angles = self.angles[low] + weight * (self.angles[high] - self.angles[low])
+        ratios = self.ratios[low] + weight * (self.ratios[high] - self.ratios[low])
+        return float(direction % 360), np.mod(angles, 360), ratios
@@ -4,6 +4,7 @@ import math
 from path import Path
 from robot import Robot
 from wheelPathGenerator import WheelPathGenerator
+from sceneRenderer import SceneRenderer
 
 # Initialize Pygame
 pygame.init()
@@ -40,6 +41,7 @@ def create_straight_line_path():
 
 # Create a robot
 robot = Robot(100, HEIGHT // 2, ROBOT_WIDTH, ROBOT_HEIGHT, WHEEL_WIDTH, WHEEL_HEIGHT, GRAY, BLACK)
+robot.prewarm_wheel_sprites()
 
 # Create a wheel path generator
 wheel_path_generator = WheelPathGenerator(ROBOT_WIDTH, ROBOT_HEIGHT)
@@ -64,52 +66,29 @@ wheel_colors = {
 # Font for displaying info
 font = pygame.font.SysFont(None, 24)
 
-# Main loop
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_r:
-                # Change orientation
-                orientation = (orientation + 90) % 360
-                
-                # Regenerate wheel paths
-                wheel_paths = wheel_path_generator.generate_wheel_paths(path_list, 0, orientation)
-                
-            elif event.key == pygame.K_c:
-                # Toggle center position (start/end)
-                if robot.x == path_list[0].start_point[0]:
-                    robot.x, robot.y = path_list[0].end_point
-                else:
-                    robot.x, robot.y = path_list[0].start_point
-
-    # Clear screen
-    screen.fill(WHITE)
-    
+def draw_background(surface):
+    """
+    Draw the path, wheel paths, legend and instructions (static until the orientation changes).
+    """
     # Draw path
     start_x, start_y = path_list[0].start_point
     end_x, end_y = path_list[0].end_point
-    pygame.draw.line(screen, BLACK, (start_x, start_y), (end_x, end_y), 3)
+    pygame.draw.line(surface, BLACK, (start_x, start_y), (end_x, end_y), 3)
     
     # Draw center point markers at start and end
-    pygame.draw.circle(screen, PURPLE, (start_x, start_y), 5)
-    pygame.draw.circle(screen, PURPLE, (end_x, end_y), 5)
+    pygame.draw.circle(surface, PURPLE, (start_x, start_y), 5)
+    pygame.draw.circle(surface, PURPLE, (end_x, end_y), 5)
     
     # Draw wheel paths
-    wheel_path_generator.draw_wheel_paths(screen, wheel_paths, wheel_colors)
-    
-    # Draw the robot
-    robot.draw(screen)
+    wheel_path_generator.draw_wheel_paths(surface, wheel_paths, wheel_colors)
     
     # Draw legend for wheel paths
     y_offset = 20
     for wheel_id, color in wheel_colors.items():
         wheel_label = f"Wheel {wheel_id}"
         text_surface = font.render(wheel_label, True, BLACK)
-        pygame.draw.rect(screen, color, (20, y_offset, 20, 20))
-        screen.blit(text_surface, (50, y_offset + 5))
+        pygame.draw.rect(surface, color, (20, y_offset, 20, 20))
+        surface.blit(text_surface, (50, y_offset + 5))
         y_offset += 30
     
     # Display instructions
@@ -122,11 +101,36 @@ while running:
     y_offset = HEIGHT - 80
     for instruction in instructions:
         text_surface = font.render(instruction, True, BLACK)
-        screen.blit(text_surface, (20, y_offset))
+        surface.blit(text_surface, (20, y_offset))
         y_offset += 20
-    
-    # Update display
-    pygame.display.flip()
+
+# Static layer, redrawn only when the wheel paths change
+renderer = SceneRenderer(screen, draw_background, WHITE)
+
+# Main loop
+running = True
+while running:
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_r:
+                # Change orientation
+                orientation = (orientation + 90) % 360
+                
+                # Regenerate wheel paths
+                wheel_paths = wheel_path_generator.generate_wheel_paths(path_list, 0, orientation)
+                renderer.invalidate()
+                
+            elif event.key == pygame.K_c:
+                # Toggle center position (start/end)
+                if robot.x == path_list[0].start_point[0]:
+                    robot.x, robot.y = path_list[0].end_point
+                else:
+                    robot.x, robot.y = path_list[0].start_point
+
+    # Draw the robot over the static layer and update the changed areas of the display
+    renderer.render(lambda surface: [robot.draw(surface)])
     
     # Cap the frame rate
     clock.tick(60)
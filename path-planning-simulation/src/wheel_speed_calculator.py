@@ -51,6 +51,20 @@ class WheelSpeedCalculator:
             # Calculate scaled speeds
             self.wheel_speeds[wheel_id] = [d * scale_factor for d in distances]
         
+        # Segment joins repeat a point, leaving an interval in which no wheel moves.
+        # Give it the speeds of the neighbouring interval so the robot doesn't stall at the join.
+        wheel_ids = list(self.wheel_speeds)
+        count = len(self.wheel_speeds[wheel_ids[0]]) if wheel_ids else 0
+        moving = [i for i in range(count) if any(self.wheel_speeds[w][i] for w in wheel_ids)]
+        if moving:
+            source = moving[0]
+            for i in range(count):
+                if any(self.wheel_speeds[w][i] for w in wheel_ids):
+                    source = i
+                    continue
+                for wheel_id in wheel_ids:
+                    self.wheel_speeds[wheel_id][i] = self.wheel_speeds[wheel_id][source]
+        
         return self.wheel_speeds
     
     def get_speed_at_progress(self, progress, base_speed=1.0):
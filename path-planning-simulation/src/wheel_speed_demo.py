@@ -5,6 +5,7 @@ from path import Path
 from robot import Robot
 from wheelPathGenerator import WheelPathGenerator
 from wheel_speed_calculator import WheelSpeedCalculator
+from sceneRenderer import SceneRenderer
 
 # Add this function at the beginning of wheel_speed_demo.py, 
 # after imports but before creating the pygame window
@@ -70,6 +71,7 @@ def create_straight_line_path():
 
 # Create a robot
 robot = Robot(100, HEIGHT // 2, ROBOT_WIDTH, ROBOT_HEIGHT, WHEEL_WIDTH, WHEEL_HEIGHT, GRAY, BLACK)
+robot.prewarm_wheel_sprites()
 
 # Create a wheel path generator
 wheel_path_generator = WheelPathGenerator(ROBOT_WIDTH, ROBOT_HEIGHT)
@@ -105,6 +107,77 @@ base_speed = 0.5  # Base speed for animation
 # Font for displaying info
 font = pygame.font.SysFont(None, 24)
 
+def draw_background(surface):
+    """
+    Draw the path, wheel paths, legend and instructions (static until the target orientation changes).
+    """
+    # Draw path
+    start_x, start_y = path_list[0].start_point
+    end_x, end_y = path_list[0].end_point
+    pygame.draw.line(surface, BLACK, (start_x, start_y), (end_x, end_y), 3)
+    
+    # Draw center point markers at start and end
+    pygame.draw.circle(surface, PURPLE, (start_x, start_y), 5)
+    pygame.draw.circle(surface, PURPLE, (end_x, end_y), 5)
+    
+    # Draw wheel paths
+    wheel_path_generator.draw_wheel_paths(surface, wheel_paths, wheel_colors)
+    
+    # Draw legend for wheel paths
+    y_offset = 20
+    for wheel_id, color in wheel_colors.items():
+        wheel_label = f"Wheel {wheel_id}"
+        text_surface = font.render(wheel_label, True, BLACK)
+        pygame.draw.rect(surface, color, (20, y_offset, 20, 20))
+        surface.blit(text_surface, (50, y_offset + 5))
+        y_offset += 30
+    
+    # Display instructions
+    instructions = [
+        f"Initial Orientation: {initial_orientation}°",
+        f"Final Orientation: {final_orientation}°",
+        f"Base Speed: {base_speed:.2f}",
+        "Press SPACE to toggle animation",
+        "Press R to change target orientation",
+        "Press P to print speed tables"
+    ]
+    
+    y_offset = HEIGHT - 150
+    for instruction in instructions:
+        text_surface = font.render(instruction, True, BLACK)
+        surface.blit(text_surface, (20, y_offset))
+        y_offset += 20
+
+def draw_foreground(surface):
+    """
+    Draw the robot and, during animation, the current wheel speeds.
+    
+    Returns:
+        List of rects drawn into
+    """
+    rects = [robot.draw(surface)]
+    
+    # Display current wheel speeds during animation
+    if animate:
+        y_offset = 160
+        speed_title = "Current Wheel Speeds:"
+        text_surface = font.render(speed_title, True, BLACK)
+        rects.append(surface.blit(text_surface, (20, y_offset)))
+        y_offset += 25
+        
+        for wheel_id in sorted(wheel_colors.keys()):
+            speed_motor_id = wheel_id + 1
+            if speed_motor_id in normalized_speeds:
+                speed_text = f"Motor {speed_motor_id}: {normalized_speeds[speed_motor_id]:.2f}"
+                text_surface = font.render(speed_text, True, wheel_colors[wheel_id])
+                rects.append(surface.blit(text_surface, (30, y_offset)))
+                y_offset += 20
+    
+    return rects
+
+# Static layer, redrawn only when the wheel paths change
+renderer = SceneRenderer(screen, draw_background, WHITE)
+
 # Main loop
 running = True
 while running:
@@ -122,6 +195,7 @@ while running:
                 wheel_paths = wheel_path_generator.generate_wheel_paths(path_list, initial_orientation, final_orientation)
                 speed_calculator = WheelSpeedCalculator(wheel_paths)
                 wheel_speed_ratios = speed_calculator.calculate_speed_ratios()
+                renderer.invalidate()
                 
                 # Reset animation
                 animation_progress = 0
@@ -139,21 +213,6 @@ while running:
                 # Print speed ratios to console
                 print(speed_calculator.visualize_speeds(20))
 
-    # Clear screen
-    screen.fill(WHITE)
-    
-    # Draw path
-    start_x, start_y = path_list[0].start_point
-    end_x, end_y = path_list[0].end_point
-    pygame.draw.line(screen, BLACK, (start_x, start_y), (end_x, end_y), 3)
-    
-    # Draw center point markers at start and end
-    pygame.draw.circle(screen, PURPLE, (start_x, start_y), 5)
-    pygame.draw.circle(screen, PURPLE, (end_x, end_y), 5)
-    
-    # Draw wheel paths
-    wheel_path_generator.draw_wheel_paths(screen, wheel_paths, wheel_colors)
-    
     # Animate the robot
     if animate:
         # Update progress
@@ -196,52 +255,8 @@ while running:
         speeds = speed_calculator.get_speed_at_progress(animation_progress, base_speed)
         normalized_speeds = speed_calculator.normalize_speeds(speeds, -1.0, 1.0)
     
-    # Draw the robot
-    robot.draw(screen)
-    
-    # Draw legend for wheel paths
-    y_offset = 20
-    for wheel_id, color in wheel_colors.items():
-        wheel_label = f"Wheel {wheel_id}"
-        text_surface = font.render(wheel_label, True, BLACK)
-        pygame.draw.rect(screen, color, (20, y_offset, 20, 20))
-        screen.blit(text_surface, (50, y_offset + 5))
-        y_offset += 30
-    
-    # Display current wheel speeds during animation
-    if animate:
-        y_offset = 160
-        speed_title = "Current Wheel Speeds:"
-        text_surface = font.render(speed_title, True, BLACK)
-        screen.blit(text_surface, (20, y_offset))
-        y_offset += 25
-        
-        for wheel_id in sorted(wheel_colors.keys()):
-            speed_motor_id = wheel_id + 1
-            if speed_motor_id in normalized_speeds:
-                speed_text = f"Motor {speed_motor_id}: {normalized_speeds[speed_motor_id]:.2f}"
-                text_surface = font.render(speed_text, True, wheel_colors[wheel_id])
-                screen.blit(text_surface, (30, y_offset))
-                y_offset += 20
-    
-    # Display instructions
-    instructions = [
-        f"Initial Orientation: {initial_orientation}°",
-        f"Final Orientation: {final_orientation}°",
-        f"Base Speed: {base_speed:.2f}",
-        "Press SPACE to toggle animation",
-        "Press R to change target orientation",
-        "Press P to print speed tables"
-    ]
-    
-    y_offset = HEIGHT - 150
-    for instruction in instructions:
-        text_surface = font.render(instruction, True, BLACK)
-        screen.blit(text_surface, (20, y_offset))
-        y_offset += 20
-    
-    # Update display
-    pygame.display.flip()
+    # Draw the robot and speeds over the static layer and update the changed areas of the display
+    renderer.render(draw_foreground)
     
     # Cap the frame rate
     clock.tick(60)